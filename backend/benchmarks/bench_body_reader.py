@@ -0,0 +1,65 @@
+"""
+Micro-benchmark: bounded body reading in Fetcher.get.
+
+Compares the previous `content += chunk` loop against BoundedBodyReader on
+synthetic bodies close to the 5MB cap, reporting time and peak allocations.
+A body that arrives in one chunk is returned without copying on both paths.
+With 1MB chunks and no Content-Length the reader only matches the old loop
+(0.4-1.0x here): with so few chunks `+=` copies little, and appending to a
+bytearray that outgrows its allocation costs about the same.
+
+Run from the repo root:
+    python -m backend.benchmarks.bench_body_reader
+"""
+import time
+import tracemalloc
+from typing import Iterator, Optional
+
+from backend.fetcher import BoundedBodyReader, MAX_BODY_SIZE
+
+
+def chunk_stream(body: bytes, chunk_size: int) -> Iterator[bytes]:
+    for i in range(0, len(body), chunk_size):
+        yield body[i:i + chunk_size]
+
+
+def concat_read(chunks: Iterator[bytes]) -> Optional[bytes]:
+    """The previous safe_get loop."""
+    content = b''
+    for chunk in chunks:
+        content += chunk
+        if len(content) > MAX_BODY_SIZE:
+            return None
+    return content
+
+
+def measure(fn, repeat: int = 15):
+    best = float('inf')
+    peak = 0
+    for _ in range(repeat):
+        tracemalloc.start()
+        started = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - started)
+        peak = max(peak, tracemalloc.get_traced_memory()[1])
+        tracemalloc.stop()
+    return best, peak
+
+
+def main():
+    reader = BoundedBodyReader()
+    print(f"{'body':>8} {'chunk':>8} {'hint':>5} | {'concat ms':>10} {'peak MB':>8} | {'reader ms':>10} {'peak MB':>8} | speedup")
+    for body_mb in (1, 3, 4.9):
+        body = bytes(int(body_mb * 1024 * 1024))
+        for chunk_size in (1024 * 1024, 64 * 1024, 16 * 1024):
+            for hint in (True, False):
+                size_hint = len(body) if hint else None
+                old_t, old_peak = measure(lambda: concat_read(chunk_stream(body, chunk_size)))
+                new_t, new_peak = measure(lambda: reader.read(chunk_stream(body, chunk_size), size_hint))
+                print(f"{body_mb:>6}MB {chunk_size // 1024:>6}KB {str(hint):>5} | "
+                      f"{old_t * 1000:>10.2f} {old_peak / 2**20:>8.1f} | "
+                      f"{new_t * 1000:>10.2f} {new_peak / 2**20:>8.1f} | {old_t / new_t:>6.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,163 @@
+"""
+Benchmark: HTML extraction engines (bs4 / lxml / selectolax) on article pages.
+
+Reports pages/second per engine for full parses and for stop_early parses
+(head metadata + opening paragraphs only), and checks that every engine
+returns the same title, first paragraph and date as BeautifulSoup.
+
+By default it runs on saved article pages in backend/benchmarks/fixtures/,
+grouped by the text before the first '_' or '.' in their name
+(minuto30_1.html, elcolombiano_1.html, qhubomedellin_1.html, ...). No pages
+are shipped with the repo, so populate that directory (or pass --fixtures)
+with at least one saved article per source before drawing conclusions about
+real markup. Without any saved pages, or with --synthetic, it falls back to
+synthetic pages shaped like those sources (heavy <head>, navigation, inline
+scripts, long bodies, related-article rails) and says so in the output.
+
+Run from the repo root:
+    python -m backend.benchmarks.bench_html_engines [--fixtures DIR | --synthetic] [--pages N]
+"""
+import os
+import sys
+import time
+import random
+import argparse
+from typing import Dict, List
+
+from backend.html_parse import available_engines, parse_article_html
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures')
+
+PARAGRAPH_WORDS = ("la policía capturó en el barrio a alias el cabecilla de la banda que delinquía en la comuna "
+                   "según las autoridades el operativo se realizó en medellín tras meses de investigación y "
+                   "fueron incautadas armas dinero y estupefacientes").split()
+
+
+def _paragraphs(rng: random.Random, n: int) -> str:
+    return ''.join(f"<p>{' '.join(rng.choices(PARAGRAPH_WORDS, k=rng.randint(40, 90)))}.</p>\n" for _ in range(n))
+
+
+def _nav(rng: random.Random, n: int) -> str:
+    return ''.join(f'<li class="menu-item"><a href="/seccion/{i}">Sección {i}</a></li>' for i in range(n))
+
+
+def _scripts(rng: random.Random, n: int, size: int) -> str:
+    return ''.join(f"<script>window.__data{i} = '{'x' * size}';</script>\n" for i in range(n))
+
+
+def minuto30(rng: random.Random, i: int) -> str:
+    return f"""<!DOCTYPE html><html lang="es"><head><meta charset="utf-8">
+<title>Capturado alias {i} | Minuto30</title>
+<meta property="og:title" content="Capturado alias {i}">
+<meta property="article:published_time" content="2024-0{1 + i % 9}-1{i % 10}T08:30:00-05:00">
+{_scripts(rng, 12, 4000)}<style>{'.c{color:red}' * 400}</style></head>
+<body><header><ul class="menu">{_nav(rng, 80)}</ul></header>
+<div class="td-post-content"><h1 class="entry-title">Capturado alias {i} en Robledo</h1>
+<div class="entry-content">{_paragraphs(rng, 14)}</div></div>
+<aside>{_paragraphs(rng, 20)}</aside>{_scripts(rng, 10, 3000)}<footer>{_nav(rng, 60)}</footer></body></html>"""
+
+
+def elcolombiano(rng: random.Random, i: int) -> str:
+    return f"""<!DOCTYPE html><html lang="es"><head><meta charset="utf-8">
+<title>Golpe a la banda de {i} - El Colombiano</title>
+{_scripts(rng, 20, 5000)}</head>
+<body><nav>{_nav(rng, 150)}</nav>
+<article class="article"><h1>Golpe a la banda número {i} en la comuna 13</h1>
+<div class="byline"><time datetime="2024-0{1 + i % 9}-2{i % 8}T14:00:00Z">hace 2 horas</time></div>
+{_paragraphs(rng, 18)}</article>
+<section class="relacionadas">{_paragraphs(rng, 30)}</section>{_scripts(rng, 15, 2000)}</body></html>"""
+
+
+def qhubomedellin(rng: random.Random, i: int) -> str:
+    return f"""<!DOCTYPE html><html lang="es"><head><meta charset="utf-8">
+<title>Homicidio en Manrique {i} - Q'hubo Medellín</title>
+<meta property="article:published_time" content="2024-1{i % 3}-0{1 + i % 9}">
+{_scripts(rng, 8, 6000)}</head>
+<body><div id="top">{_nav(rng, 100)}</div>
+<main><h1>Homicidio en Manrique, caso {i}</h1><div class="content">{_paragraphs(rng, 10)}</div></main>
+<div class="widgets">{_paragraphs(rng, 25)}</div>{_scripts(rng, 12, 2500)}</body></html>"""
+
+
+SOURCES = {'minuto30': minuto30, 'elcolombiano': elcolombiano, 'qhubomedellin': qhubomedellin}
+
+
+def synthetic_fixtures(pages: int) -> Dict[str, List[str]]:
+    rng = random.Random(42)
+    return {name: [build(rng, i) for i in range(pages)] for name, build in SOURCES.items()}
+
+
+def load_fixtures(directory: str) -> Dict[str, List[str]]:
+    fixtures: Dict[str, List[str]] = {}
+    if not os.path.isdir(directory):
+        return fixtures
+    for name in sorted(os.listdir(directory)):
+        if not name.endswith(('.html', '.htm')):
+            continue
+        source = name.split('_')[0].split('.')[0]
+        with open(os.path.join(directory, name), 'rb') as f:
+            fixtures.setdefault(source, []).append(f.read().decode('utf-8', errors='replace'))
+    return fixtures
+
+
+def pages_per_second(pages: List[str], engine: str, stop_early: bool, repeat: int = 3) -> float:
+    best = float('inf')
+    for _ in range(repeat):
+        started = time.perf_counter()
+        for page in pages:
+            parse_article_html(page, engine=engine, stop_early=stop_early)
+        best = min(best, time.perf_counter() - started)
+    return len(pages) / best
+
+
+def check_parity(pages: List[str], engines: List[str]) -> List[str]:
+    mismatches = []
+    for page in pages:
+        reference = parse_article_html(page, engine='bs4')
+        for engine in engines:
+            for stop_early in (False, True):
+                got = parse_article_html(page, engine=engine, stop_early=stop_early)
+                for field in ('h1', 'title', 'first_paragraph', 'date'):
+                    if got[field] != reference[field]:
+                        mismatches.append(f"{engine} stop_early={stop_early} {field}: {got[field][:40]!r} != {reference[field][:40]!r}")
+    return mismatches
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--fixtures', default=FIXTURES_DIR, help='directory of saved article pages')
+    parser.add_argument('--synthetic', action='store_true', help='use synthetic pages even if saved ones exist')
+    parser.add_argument('--pages', type=int, default=30, help='synthetic pages per source')
+    args = parser.parse_args()
+
+    fixtures = {} if args.synthetic else load_fixtures(args.fixtures)
+    if fixtures:
+        print(f"Saved pages from {args.fixtures}: {', '.join(f'{k} ({len(v)})' for k, v in fixtures.items())}")
+        missing = [source for source in SOURCES if source not in fixtures]
+        if missing:
+            print(f"WARNING: no saved pages for {', '.join(missing)}")
+    else:
+        if not args.synthetic:
+            print(f"WARNING: no saved pages in {args.fixtures} - timing synthetic markup, not real source pages")
+        fixtures = synthetic_fixtures(args.pages)
+    engines = available_engines()
+    print(f"Engines installed: {', '.join(engines)}")
+
+    for source, pages in fixtures.items():
+        avg_kb = sum(len(p.encode('utf-8')) for p in pages) / len(pages) / 1024
+        print(f"\n{source}: {len(pages)} pages, {avg_kb:.0f}KB average")
+        print(f"  {'engine':<11} {'full pages/s':>13} {'stop_early pages/s':>19}")
+        baseline = None
+        for engine in reversed(engines):  # bs4 first, as the baseline
+            full = pages_per_second(pages, engine, stop_early=False)
+            early = pages_per_second(pages, engine, stop_early=True)
+            baseline = baseline or full
+            print(f"  {engine:<11} {full:>13.1f} {early:>19.1f}   ({full / baseline:.1f}x / {early / baseline:.1f}x vs bs4 full)")
+        mismatches = check_parity(pages[:10], [e for e in engines if e != 'bs4'])
+        print(f"  field parity with bs4: {'OK' if not mismatches else f'{len(mismatches)} mismatches'}")
+        for line in mismatches[:5]:
+            print(f"    {line}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,94 @@
+"""
+Micro-benchmark: barrio / comuna mention counting in Predictor.
+
+Compares the previous per-name `text_lower.count(name)` loops against the
+single Aho-Corasick pass of `Predictor._count_mentions` on synthetic
+headlines, checking that both give identical counts. Runs with the real
+combos_v2.csv gazetteer and with larger synthetic ones.
+
+Run from the repo root:
+    python -m backend.benchmarks.bench_zone_mentions [headlines]
+"""
+import sys
+import time
+import random
+from collections import Counter
+from typing import Dict, List
+
+from backend.data_loader import DataLoader
+from backend.predictor import Predictor
+
+FILLER = ("captura", "cabecilla", "alias", "policía", "operativo", "homicidio", "en", "el", "la", "de", "del",
+          "barrio", "sector", "noche", "hombre", "banda", "extorsión", "sicarios", "fiscalía", "hoy", "ayer")
+
+
+class SyntheticLoader:
+    """Barrio index with `extra` invented barrios spread over the real comunas."""
+
+    def __init__(self, base: List[Dict[str, str]], extra: int):
+        rng = random.Random(extra)
+        comunas = sorted({b['comuna_nombre'] for b in base}) or ["Popular"]
+        self.index = list(base) + [
+            {"barrio": f"{rng.choice(('La', 'El', 'San', 'Villa', 'Santa'))} {rng.choice(FILLER).title()} {n}",
+             "comuna_nombre": rng.choice(comunas), "comuna_numero": "0"}
+            for n in range(extra)
+        ]
+
+    def get_barrio_index(self):
+        return self.index
+
+
+def legacy_counts(predictor: Predictor, text: str):
+    """The previous implementation: one str.count per barrio, then one per comuna."""
+    text_lower = str(text).lower()
+    barrios = Counter()
+    for entry in predictor.barrio_index:
+        barrio = entry.get('barrio', '')
+        if not barrio:
+            continue
+        c = text_lower.count(str(barrio).lower())
+        if c > 0:
+            barrios[barrio] += c
+    comunas = {}
+    for comuna in predictor.comuna_set:
+        c = text_lower.count(comuna.lower())
+        if c > 0:
+            comunas[comuna] = c
+    return barrios, comunas
+
+
+def headlines(predictor: Predictor, n: int) -> List[str]:
+    rng = random.Random(7)
+    names = [b['barrio'] for b in predictor.barrio_index] + list(predictor.comuna_set)
+    out = []
+    for _ in range(n):
+        words = rng.choices(FILLER, k=rng.randint(8, 16))
+        for _ in range(rng.randint(0, 3)):
+            name = rng.choice(names)
+            words.insert(rng.randrange(len(words) + 1), name.upper() if rng.random() < 0.1 else name)
+        out.append(' '.join(words).capitalize())
+    return out
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    base = DataLoader().get_barrio_index()
+    print(f"{'barrios':>8} {'comunas':>8} {'headlines':>10} | {'str.count s':>11} | {'automaton s':>11} | speedup")
+    for extra in (0, 200, 1000):
+        predictor = Predictor(SyntheticLoader(base, extra))
+        texts = headlines(predictor, n)
+        started = time.perf_counter()
+        old = [legacy_counts(predictor, t) for t in texts]
+        old_t = time.perf_counter() - started
+        started = time.perf_counter()
+        new = [predictor._count_mentions(t) for t in texts]
+        new_t = time.perf_counter() - started
+        # Same counts in the same order (zone ties are broken by insertion order)
+        assert all(list(a[0].items()) == list(b[0].items()) and list(a[1].items()) == list(b[1].items())
+                   for a, b in zip(old, new)), "counts differ"
+        print(f"{len(predictor.barrio_index):>8} {len(predictor.comuna_set):>8} {n:>10} | "
+              f"{old_t:>11.2f} | {new_t:>11.2f} | {old_t / new_t:>6.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,161 @@
+import os
+import json
+import time
+import hashlib
+from typing import Dict, Any, List, Optional
+
+from .models import ScrapingConfig
+
+# Config fields that determine the query plan and what counts as relevant.
+# Fetch tuning (concurrency, rate limits, cache) may change between runs.
+QUERY_FIELDS = (
+    'target_organizations', 'local_combos', 'date_range_start', 'date_range_end',
+    'predictor_events', 'predictor_ranks', 'target_crimes',
+)
+
+
+def config_fingerprint(config: ScrapingConfig) -> str:
+    """Stable hash of the config fields that shape a scraping run."""
+    data = config.model_dump()
+    payload = {field: data.get(field) for field in QUERY_FIELDS}
+    return hashlib.sha1(json.dumps(payload, sort_keys=True, default=str).encode('utf-8')).hexdigest()
+
+
+class ScrapeCheckpoint:
+    """Periodic on-disk snapshot of a running scrape so it can resume after a restart.
+
+    Keeps the query plan, how many queries have already been searched, the URLs
+    those searches queued (with their priority), the URLs already extracted and
+    the records collected so far. Writes are atomic (temp file + rename) and
+    throttled to one every `interval_seconds` unless forced.
+    """
+
+    def __init__(self, path: str | None = None, interval_seconds: float = 15.0):
+        if path is None:
+            backend_dir = os.path.dirname(os.path.abspath(__file__))
+            path = os.path.join(backend_dir, "data", "scrape_checkpoint.json")
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.path = path
+        self.interval_seconds = interval_seconds
+        self.state: Dict[str, Any] = {}
+        self._processed: set = set()
+        self._last_save = 0.0
+        self._dirty = False
+
+    # --- Loading -----------------------------------------------------------
+
+    def load(self) -> Optional[Dict[str, Any]]:
+        """Read the checkpoint from disk, or None if there is no usable one."""
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                state = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if not isinstance(state, dict) or 'queries' not in state:
+            return None
+        return state
+
+    def exists(self) -> bool:
+        return os.path.exists(self.path)
+
+    def saved_config(self) -> Optional[ScrapingConfig]:
+        """Config of the checkpointed run, so it can be resumed after the process restarted."""
+        state = self.load()
+        if not state or not state.get('config'):
+            return None
+        try:
+            return ScrapingConfig(**state['config'])
+        except Exception:
+            return None
+
+    def summary(self) -> Optional[Dict[str, Any]]:
+        state = self.load()
+        if state is None:
+            return None
+        return {
+            "queries_total": len(state['queries']),
+            "queries_done": state.get('cursor', 0),
+            "pending_urls": len(state.get('pending', {})),
+            "processed_urls": len(state.get('processed', [])),
+            "collected": len(state.get('collected', [])),
+            "elapsed_seconds": round(state.get('elapsed', 0.0), 1),
+            "updated_at": state.get('updated_at'),
+        }
+
+    # --- Recording ---------------------------------------------------------
+
+    def start(self, config: ScrapingConfig, queries: List[str]):
+        """Begin checkpointing a fresh run."""
+        self.state = {
+            'fingerprint': config_fingerprint(config),
+            'config': config.model_dump(),
+            'queries': list(queries),
+            'cursor': 0,
+            'pending': {},
+            'processed': [],
+            'collected': [],
+            'elapsed': 0.0,
+            'updated_at': None,
+        }
+        self._processed = set()
+        self._dirty = True
+        self.save()
+
+    def resume(self, config: ScrapingConfig) -> Optional[Dict[str, Any]]:
+        """Adopt the on-disk checkpoint if it belongs to `config`; returns its state."""
+        state = self.load()
+        if state is None or state.get('fingerprint') != config_fingerprint(config):
+            return None
+        state.setdefault('pending', {})
+        state.setdefault('processed', [])
+        state.setdefault('collected', [])
+        self.state = state
+        self._processed = set(state['processed'])
+        return state
+
+    def is_processed(self, url: str) -> bool:
+        return url in self._processed
+
+    def mark_searched(self, cursor: int, urls: List[str], priority: int):
+        """Query number `cursor - 1` has been searched and its URLs queued."""
+        pending = self.state['pending']
+        for url in urls:
+            if url not in self._processed:
+                pending.setdefault(url, priority)
+        self.state['cursor'] = cursor
+        self._dirty = True
+
+    def mark_processed(self, url: str, record: Optional[Dict[str, Any]] = None):
+        """`url` has been extracted; `record` is set when it was kept."""
+        self.state['pending'].pop(url, None)
+        if url not in self._processed:
+            self._processed.add(url)
+            self.state['processed'].append(url)
+        if record is not None:
+            self.state['collected'].append(record)
+        self._dirty = True
+
+    def maybe_save(self, elapsed: float):
+        self.state['elapsed'] = elapsed
+        if self._dirty and time.time() - self._last_save >= self.interval_seconds:
+            self.save()
+
+    def save(self):
+        if not self.state:
+            return
+        self.state['updated_at'] = time.time()
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self.state, f, ensure_ascii=False, default=str)
+        os.replace(tmp_path, self.path)
+        self._last_save = time.time()
+        self._dirty = False
+
+    def clear(self):
+        """Drop the checkpoint once the run has completed."""
+        self.state = {}
+        self._processed = set()
+        try:
+            os.remove(self.path)
+        except OSError:
+            pass
@@ -0,0 +1,94 @@
+import re
+import html
+import zlib
+import threading
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+_HIDDEN_BLOCK_RE = re.compile(r'<(script|style|noscript|template|svg)\b.*?</\1\s*>', re.IGNORECASE | re.DOTALL)
+_COMMENT_RE = re.compile(r'<!--.*?-->', re.DOTALL)
+_TAG_RE = re.compile(r'<[^>]+>')
+_WORD_RE = re.compile(r'\w+', re.UNICODE)
+
+
+def visible_text(markup: str) -> str:
+    """Cheap visible-text approximation: drop scripts, styles, comments and tags."""
+    text = _COMMENT_RE.sub(' ', markup)
+    text = _HIDDEN_BLOCK_RE.sub(' ', text)
+    text = _TAG_RE.sub(' ', text)
+    return ' '.join(html.unescape(text).split())
+
+
+def shingles(text: str, size: int = 3) -> np.ndarray:
+    """Hashes (uint64) of the distinct word `size`-grams of `text`, lower-cased."""
+    words = _WORD_RE.findall(text.lower())
+    if len(words) < size:
+        return np.empty(0, dtype=np.uint64)
+    grams = {' '.join(words[i:i + size]) for i in range(len(words) - size + 1)}
+    return np.fromiter((zlib.crc32(g.encode('utf-8')) for g in grams), dtype=np.uint64, count=len(grams))
+
+
+class NearDuplicateIndex:
+    """MinHash signatures over word shingles with a banded LSH index.
+
+    `bands * rows` hash functions (multiply-shift over 64-bit words) give each
+    document a signature; documents sharing any band become candidates and are
+    confirmed by their estimated Jaccard similarity against `threshold`. With
+    the default 20 bands of 5 rows, pairs at 0.7 similarity collide with
+    probability ~0.97 and pairs below 0.4 rarely do. A 0.7 shingle Jaccard is
+    roughly one word in twenty rewritten, or the same story under different
+    site chrome.
+    """
+
+    def __init__(self, threshold: float = 0.7, bands: int = 20, rows: int = 5,
+                 shingle_size: int = 3, min_shingles: int = 20, seed: int = 1):
+        self.threshold = threshold
+        self.bands = bands
+        self.rows = rows
+        self.shingle_size = shingle_size
+        self.min_shingles = min_shingles
+        rng = np.random.default_rng(seed)
+        num_perm = bands * rows
+        self._a = rng.integers(1, 2**63, size=num_perm, dtype=np.uint64) | np.uint64(1)
+        self._b = rng.integers(0, 2**63, size=num_perm, dtype=np.uint64)
+        self._buckets: List[Dict[bytes, List[str]]] = [{} for _ in range(bands)]
+        self._signatures: Dict[str, np.ndarray] = {}
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._signatures)
+
+    def signature(self, text: str) -> Optional[np.ndarray]:
+        """MinHash signature of `text`, or None if it is too short to compare reliably."""
+        hashes = shingles(text, self.shingle_size)
+        if len(hashes) < self.min_shingles:
+            return None
+        # (a * x + b) mod 2**64, keeping the high 32 bits; uint64 arithmetic wraps
+        with np.errstate(over='ignore'):
+            permuted = (np.outer(self._a, hashes) + self._b[:, None]) >> np.uint64(32)
+        return permuted.min(axis=1)
+
+    def _band_keys(self, sig: np.ndarray) -> List[bytes]:
+        return [sig[i * self.rows:(i + 1) * self.rows].tobytes() for i in range(self.bands)]
+
+    def query(self, sig: np.ndarray) -> Optional[Tuple[str, float]]:
+        """Most similar indexed document above the threshold, as (key, similarity)."""
+        with self._lock:
+            candidates = set()
+            for band, key in zip(self._buckets, self._band_keys(sig)):
+                candidates.update(band.get(key, ()))
+            best: Optional[Tuple[str, float]] = None
+            for doc in candidates:
+                similarity = float(np.mean(self._signatures[doc] == sig))
+                if similarity >= self.threshold and (best is None or similarity > best[1]):
+                    best = (doc, similarity)
+        return best
+
+    def add(self, key: str, sig: np.ndarray):
+        with self._lock:
+            if key in self._signatures:
+                return
+            self._signatures[key] = sig
+            for band, band_key in zip(self._buckets, self._band_keys(sig)):
+                band.setdefault(band_key, []).append(key)
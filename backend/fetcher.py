@@ -0,0 +1,601 @@
+import re
+import sys
+import time
+import heapq
+import queue
+import itertools
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Set, Tuple, Union
+from urllib.parse import urlsplit
+import requests
+from requests.adapters import HTTPAdapter
+from .http_cache import ResponseCache, CacheEntry, canonical_url
+from .scrape_metrics import ScrapeMetrics
+
+MAX_BODY_SIZE = 5 * 1024 * 1024  # 5MB limit per page
+READ_CHUNK_SIZE = 64 * 1024
+
+_META_CHARSET_RE = re.compile(rb'<meta[^>]+charset=["\']?([A-Za-z0-9_\-]+)', re.IGNORECASE)
+
+DEFAULT_HEADERS = {
+    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64; rv:130.0) Gecko/20100101 Firefox/130.0",
+    "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8",
+    "Accept-Language": "es-CO,es;q=0.8,en-US;q=0.6,en;q=0.4",
+    "Connection": "keep-alive",
+}
+
+
+def host_of(url: str) -> str:
+    """Lower-cased network location of a URL ('' if it cannot be parsed)."""
+    try:
+        return urlsplit(url).netloc.lower()
+    except Exception:
+        return ''
+
+
+class BodyTooLarge(Exception):
+    pass
+
+
+class BoundedBodyReader:
+    """Streams a response body into one buffer, enforcing a size cap.
+
+    With Content-Length the buffer is preallocated and each chunk is copied
+    into place once; without it the buffer grows by appending, which CPython
+    amortizes. Either way this avoids `content += chunk` copying the whole
+    body on every chunk. A body that arrives as a single chunk is returned
+    as-is, without any copy.
+    """
+
+    def __init__(self, max_size: int = MAX_BODY_SIZE, chunk_size: int = READ_CHUNK_SIZE):
+        self.max_size = max_size
+        self.chunk_size = chunk_size
+
+    def read(self, chunks: Iterable[bytes], size_hint: Optional[int] = None) -> memoryview:
+        """Consume `chunks` and return a zero-copy view of the body. Raises BodyTooLarge past the cap."""
+        first = b''
+        buf: Optional[bytearray] = None
+        size = 0
+        for chunk in chunks:
+            if not chunk:
+                continue
+            end = size + len(chunk)
+            if end > self.max_size:
+                raise BodyTooLarge(end)
+            if not size:
+                first = chunk
+            else:
+                if buf is None:
+                    if size_hint and size_hint >= end:
+                        buf = bytearray(min(size_hint, self.max_size))
+                        buf[:size] = first
+                    else:
+                        buf = bytearray(first)
+                if end <= len(buf):
+                    buf[size:end] = chunk
+                else:
+                    # Content-Length is the compressed size for gzip bodies, so growth is still possible
+                    del buf[size:]
+                    buf += chunk
+            size = end
+        if buf is None:
+            return memoryview(first)
+        return memoryview(buf)[:size]
+
+
+class FetchedPage:
+    """A fetched page whose body stays as raw bytes until a parser asks for text.
+
+    Mirrors the parts of requests.Response the scraper uses (`status_code`,
+    `headers`, `url`, `content`, `text`). `text_prefix(n)` decodes only the
+    first `n` bytes, which is enough for the <head> and the opening of the
+    article on news pages.
+    """
+
+    def __init__(self, url: str, status_code: int, headers: Dict[str, str],
+                 body: Union[bytes, bytearray, memoryview], encoding: Optional[str] = None):
+        self.url = url
+        self.status_code = status_code
+        self.headers = headers
+        self._body = body if isinstance(body, memoryview) else memoryview(body)
+        self._encoding = encoding
+        self._text: Optional[str] = None
+
+    def __len__(self) -> int:
+        return self._body.nbytes
+
+    @property
+    def content(self) -> bytes:
+        body = self._body
+        if not (isinstance(body.obj, bytes) and body.nbytes == len(body.obj)):
+            # Copy out of the read buffer once; the buffer itself can then be freed
+            self._body = memoryview(body.tobytes())
+        return self._body.obj
+
+    @property
+    def encoding(self) -> str:
+        if self._encoding is None:
+            self._encoding = self._detect_encoding()
+        return self._encoding
+
+    def _detect_encoding(self) -> str:
+        content_type = self.headers.get('Content-Type') or self.headers.get('content-type') or ''
+        match = re.search(r'charset=["\']?([A-Za-z0-9_\-]+)', content_type, re.IGNORECASE)
+        if match:
+            return match.group(1)
+        match = _META_CHARSET_RE.search(self._body[:4096].tobytes())
+        if match:
+            return match.group(1).decode('ascii')
+        return 'utf-8'
+
+    def _decode(self, data: memoryview) -> str:
+        try:
+            return str(data, self.encoding, errors='replace')
+        except LookupError:
+            return str(data, 'utf-8', errors='replace')
+
+    @property
+    def text(self) -> str:
+        if self._text is None:
+            self._text = self._decode(self._body)
+        return self._text
+
+    def text_prefix(self, max_bytes: int) -> str:
+        """Decode at most the first `max_bytes` of the body."""
+        if self._body.nbytes <= max_bytes:
+            return self.text
+        return self._decode(self._body[:max_bytes])
+
+
+class HostHealth:
+    """Latency window and circuit-breaker state for one host."""
+
+    def __init__(self):
+        self.latencies: deque = deque(maxlen=50)
+        self.successes = 0
+        self.failures = 0
+        self.skipped = 0
+        self.consecutive_failures = 0
+        self.opened_at: Optional[float] = None
+        self.probing = False
+        self.last_error: Optional[str] = None
+
+    def p95(self) -> Optional[float]:
+        if not self.latencies:
+            return None
+        ordered = sorted(self.latencies)
+        return ordered[min(len(ordered) - 1, int(round(0.95 * (len(ordered) - 1))))]
+
+
+class HostMonitor:
+    """Per-host circuit breakers and adaptive timeouts.
+
+    A host's breaker opens after `failure_threshold` consecutive failures
+    (exceptions or 5xx) and rejects its URLs for `cooldown` seconds; then a
+    single probe request is let through, closing the breaker on success and
+    re-opening it on failure. Once a host has `min_samples` latencies, its
+    timeout becomes `timeout_factor` x its p95 latency, clamped to
+    [`min_timeout`, `max_timeout`].
+    """
+
+    def __init__(self, failure_threshold: int = 3, cooldown: float = 60.0, max_timeout: float = 10.0,
+                 min_timeout: float = 3.0, timeout_factor: float = 3.0, min_samples: int = 5):
+        self.failure_threshold = max(1, failure_threshold)
+        self.cooldown = cooldown
+        self.max_timeout = max_timeout
+        self.min_timeout = min(min_timeout, max_timeout)
+        self.timeout_factor = timeout_factor
+        self.min_samples = min_samples
+        self._hosts: Dict[str, HostHealth] = {}
+        self._lock = threading.Lock()
+
+    def _health(self, host: str) -> HostHealth:
+        health = self._hosts.get(host)
+        if health is None:
+            health = self._hosts[host] = HostHealth()
+        return health
+
+    def state(self, host: str) -> str:
+        with self._lock:
+            return self._state(self._health(host))
+
+    def _state(self, health: HostHealth) -> str:
+        if health.opened_at is None:
+            return 'closed'
+        if time.monotonic() - health.opened_at >= self.cooldown:
+            return 'half_open'
+        return 'open'
+
+    def allow(self, host: str) -> bool:
+        """False while the host's breaker is open (or a half-open probe is already running)."""
+        return self.admit(host) is not None
+
+    def admit(self, host: str) -> Optional[str]:
+        """'request', 'probe' (the single half-open trial, to be ended with `end_probe`) or None if skipped."""
+        with self._lock:
+            health = self._health(host)
+            state = self._state(health)
+            if state == 'closed':
+                return 'request'
+            if state == 'half_open' and not health.probing:
+                health.probing = True
+                return 'probe'
+            health.skipped += 1
+            return None
+
+    def end_probe(self, host: str):
+        """Release a probe whose outcome was never recorded, so the next request can probe again."""
+        with self._lock:
+            self._health(host).probing = False
+
+    def timeout_for(self, host: str) -> float:
+        with self._lock:
+            health = self._health(host)
+            if len(health.latencies) < self.min_samples:
+                return self.max_timeout
+            return min(self.max_timeout, max(self.min_timeout, self.timeout_factor * health.p95()))
+
+    def record_success(self, host: str, latency: float):
+        with self._lock:
+            health = self._health(host)
+            health.latencies.append(latency)
+            health.successes += 1
+            health.consecutive_failures = 0
+            health.opened_at = None
+            health.probing = False
+
+    def record_failure(self, host: str, cause: str):
+        with self._lock:
+            health = self._health(host)
+            health.failures += 1
+            health.consecutive_failures += 1
+            health.last_error = cause
+            was_probe = health.probing
+            health.probing = False
+            if was_probe or health.consecutive_failures >= self.failure_threshold:
+                if health.opened_at is None or was_probe:
+                    print(f"[Fetch] Circuit OPEN for {host} after {health.consecutive_failures} consecutive failures ({cause})", file=sys.stderr, flush=True)
+                health.opened_at = time.monotonic()
+
+    def report(self) -> Dict[str, Dict[str, Any]]:
+        """Per-host counters, latency percentiles, current timeout and breaker state."""
+        with self._lock:
+            hosts = list(self._hosts.items())
+        out: Dict[str, Dict[str, Any]] = {}
+        for host, health in hosts:
+            p95 = health.p95()
+            out[host] = {
+                "state": self.state(host),
+                "successes": health.successes,
+                "failures": health.failures,
+                "skipped": health.skipped,
+                "p95_latency": round(p95, 3) if p95 is not None else None,
+                "timeout": round(self.timeout_for(host), 2),
+                "last_error": health.last_error,
+            }
+        return out
+
+
+class Fetcher:
+    """Concurrent page fetcher backed by a keep-alive connection pool per host.
+
+    `max_concurrency` bounds the total number of requests in flight and
+    `per_host_concurrency` bounds how many of them may target the same host,
+    and `host_rate` paces each host to that many requests per second. A
+    HostMonitor trips a per-host circuit breaker on repeated failures and
+    derives each host's timeout from its observed latency.
+    With a `cache`, fresh entries are served without a request and stale ones
+    are revalidated with a conditional GET. Every outcome is counted in `metrics`.
+    """
+
+    def __init__(self, max_concurrency: int = 8, per_host_concurrency: int = 2,
+                 timeout: float = 10, headers: Optional[Dict[str, str]] = None,
+                 cache: Optional[ResponseCache] = None, host_rate: float = 1.0,
+                 monitor: Optional[HostMonitor] = None, metrics: Optional[ScrapeMetrics] = None):
+        self.max_concurrency = max(1, int(max_concurrency or 1))
+        self.per_host_concurrency = max(1, int(per_host_concurrency or 1))
+        self.host_rate = host_rate
+        self.timeout = timeout
+        self.session = requests.Session()
+        self.session.headers.update(headers or DEFAULT_HEADERS)
+        # pool_maxsize is per host: keep one warm connection per allowed concurrent request
+        adapter = HTTPAdapter(pool_connections=32, pool_maxsize=self.per_host_concurrency)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self.cache = cache
+        self.reader = BoundedBodyReader()
+        self.monitor = monitor or HostMonitor(max_timeout=timeout)
+        self.metrics = metrics or ScrapeMetrics()
+        self._executor: Optional[ThreadPoolExecutor] = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+        self.session.close()
+
+    @property
+    def executor(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.max_concurrency, thread_name_prefix="fetch")
+        return self._executor
+
+    def get(self, url: str) -> Optional[FetchedPage]:
+        """Fetch a single URL with the 5MB body cap. Returns None on any failure."""
+        metrics = self.metrics
+        metrics.record_fetch_attempt()
+        entry = self.cache.lookup(url) if self.cache else None
+        if entry is not None and entry.is_fresh(self.cache.ttl_seconds):
+            self.cache.record_hit(entry)
+            metrics.record_cache_hit()
+            return _cached_page(url, entry)
+
+        host = host_of(url)
+        admission = self.monitor.admit(host)
+        if admission is None:
+            print(f"[Fetch] Skipped {url} - circuit open for {host}", file=sys.stderr)
+            metrics.record_fetch_failure('circuit_open')
+            return None
+
+        try:
+            started = time.time()
+            try:
+                resp = self.session.get(url, timeout=self.monitor.timeout_for(host), stream=True,
+                                        headers=self.cache.conditional_headers(entry) if self.cache else None)
+            except requests.Timeout:
+                self.monitor.record_failure(host, 'timeout')
+                metrics.record_fetch_failure('timeout')
+                return None
+            except Exception as e:
+                self.monitor.record_failure(host, type(e).__name__)
+                metrics.record_fetch_failure(type(e).__name__)
+                return None
+
+            try:
+                if resp.status_code >= 500:
+                    self.monitor.record_failure(host, f'HTTP {resp.status_code}')
+                else:
+                    self.monitor.record_success(host, time.time() - started)
+
+                if entry is not None and resp.status_code == 304:
+                    resp.close()
+                    self.cache.revalidate(url, entry)
+                    metrics.record_fetch_success(host, time.time() - started, 0)
+                    return _cached_page(url, entry)
+
+                # Check Content-Length header if present
+                size_hint = None
+                if 'Content-Length' in resp.headers:
+                    size_hint = int(resp.headers['Content-Length'])
+                    if size_hint > MAX_BODY_SIZE:
+                        print(f"[Fetch] Skipped {url} - Too large ({resp.headers['Content-Length']} bytes)", file=sys.stderr)
+                        resp.close()
+                        metrics.record_fetch_failure('size_cap')
+                        return None
+
+                # Read content with limit
+                try:
+                    body = self.reader.read(resp.iter_content(chunk_size=self.reader.chunk_size), size_hint)
+                except BodyTooLarge:
+                    print(f"[Fetch] Aborted {url} - Exceeded 5MB limit", file=sys.stderr)
+                    resp.close()
+                    metrics.record_fetch_failure('size_cap', MAX_BODY_SIZE)
+                    return None
+
+                headers = dict(resp.headers)
+                if self.cache:
+                    self.cache.record_miss()
+                    if resp.status_code == 200:
+                        self.cache.store(url, resp.status_code, headers, body, time.time() - started)
+                if resp.status_code == 200:
+                    metrics.record_fetch_success(host, time.time() - started, len(body))
+                else:
+                    metrics.record_fetch_failure(f'HTTP {resp.status_code}', len(body))
+                return FetchedPage(resp.url or url, resp.status_code, headers, body)
+            except requests.RequestException as e:
+                # Body stalled or the connection dropped mid-read (requests wraps read timeouts as ConnectionError)
+                cause = 'timeout' if 'timed out' in str(e).lower() else type(e).__name__
+                self.monitor.record_failure(host, cause)
+                metrics.record_fetch_failure(cause)
+                return None
+            except Exception as e:
+                self.monitor.record_failure(host, type(e).__name__)
+                metrics.record_fetch_failure(type(e).__name__)
+                return None
+        finally:
+            if admission == 'probe':
+                self.monitor.end_probe(host)
+
+    def scheduler(self) -> "FetchScheduler":
+        """Open a priority scheduler that feeds this fetcher's pool."""
+        return FetchScheduler(self)
+
+    def fetch_many(self, urls: Iterable[str], deadline: Optional[float] = None) -> Iterator[Tuple[str, Optional[FetchedPage]]]:
+        """Fetch URLs concurrently and yield (url, page) pairs as they complete.
+
+        Stops yielding once `deadline` (a time.time() value) passes. Closing the
+        generator early (e.g. `break` in the caller) cancels every pending fetch.
+        """
+        with self.scheduler() as sched:
+            sched.submit(urls)
+            yield from sched.results(deadline)
+
+
+def _cached_page(url: str, entry: CacheEntry) -> FetchedPage:
+    return FetchedPage(url, entry.status_code, entry.headers, entry.body)
+
+
+class HostTokenBucket:
+    """Token bucket allowing `rate` requests per second with bursts of up to `capacity`."""
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = max(1.0, capacity)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+
+    def _refill(self, now: float):
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_time(self, now: float) -> float:
+        """Seconds until a token is available (0 if one is available now)."""
+        if self.rate <= 0:
+            return 0.0
+        self._refill(now)
+        return 0.0 if self.tokens >= 1 else (1 - self.tokens) / self.rate
+
+    def take(self, now: float):
+        if self.rate <= 0:
+            return
+        self._refill(now)
+        self.tokens -= 1
+
+
+class FetchScheduler:
+    """Priority queue of URLs dispatched onto a Fetcher's pool under per-host politeness limits.
+
+    Lower `priority` values are fetched first. Within a priority level URLs
+    are interleaved across hosts (first URL of every host, then the second, ...)
+    so one slow site cannot stall the rest. Each host is capped by the fetcher's
+    per-host concurrency and a token bucket of `host_rate` requests per second;
+    pages already fresh in the response cache bypass the bucket. A URL is only
+    queued once per scheduler.
+    """
+
+    def __init__(self, fetcher: Fetcher):
+        self.fetcher = fetcher
+        self.results_queue: "queue.Queue[Tuple[str, Optional[FetchedPage]]]" = queue.Queue()
+        self.outstanding = 0
+        self._heap: List[Tuple[Tuple[int, int, int], str, str]] = []
+        self._seq = itertools.count()
+        self._host_ordinal: Dict[Tuple[int, str], int] = {}
+        self._submitted: Set[str] = set()
+        self._lock = threading.Lock()
+        self._in_flight = 0
+        self._host_in_flight: Dict[str, int] = {}
+        self._buckets: Dict[str, HostTokenBucket] = {}
+        self._timer: Optional[threading.Timer] = None
+        self._closed = False
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def submit(self, urls: Iterable[str], priority: int = 0) -> int:
+        """Queue URLs at `priority`; returns how many were new to this scheduler."""
+        added = 0
+        with self._lock:
+            if self._closed:
+                return 0
+            for url in urls:
+                key = canonical_url(url)
+                if key in self._submitted:
+                    continue
+                self._submitted.add(key)
+                host = host_of(url)
+                ordinal = self._host_ordinal.get((priority, host), 0)
+                self._host_ordinal[(priority, host)] = ordinal + 1
+                heapq.heappush(self._heap, ((priority, ordinal, next(self._seq)), url, host))
+                added += 1
+            self.outstanding += added
+        self._pump()
+        return added
+
+    def _bucket(self, host: str) -> HostTokenBucket:
+        bucket = self._buckets.get(host)
+        if bucket is None:
+            bucket = HostTokenBucket(self.fetcher.host_rate, self.fetcher.per_host_concurrency)
+            self._buckets[host] = bucket
+        return bucket
+
+    def _pump(self):
+        with self._lock:
+            if self._closed:
+                return
+            now = time.monotonic()
+            deferred = []
+            next_wake: Optional[float] = None
+            cache = self.fetcher.cache
+            while self._heap and self._in_flight < self.fetcher.max_concurrency:
+                item = heapq.heappop(self._heap)
+                _, url, host = item
+                if self._host_in_flight.get(host, 0) >= self.fetcher.per_host_concurrency:
+                    deferred.append(item)
+                    continue
+                if not (cache and cache.is_fresh(url)):
+                    bucket = self._bucket(host)
+                    wait = bucket.wait_time(now)
+                    if wait > 0:
+                        deferred.append(item)
+                        next_wake = wait if next_wake is None else min(next_wake, wait)
+                        continue
+                    bucket.take(now)
+                self._in_flight += 1
+                self._host_in_flight[host] = self._host_in_flight.get(host, 0) + 1
+                self.fetcher.executor.submit(self._run, url, host)
+            for item in deferred:
+                heapq.heappush(self._heap, item)
+            if next_wake is not None and self._timer is None:
+                self._timer = threading.Timer(next_wake, self._on_timer)
+                self._timer.daemon = True
+                self._timer.start()
+
+    def _on_timer(self):
+        with self._lock:
+            self._timer = None
+        self._pump()
+
+    def _run(self, url: str, host: str):
+        page = None
+        try:
+            if not self._closed:
+                page = self.fetcher.get(url)
+        finally:
+            with self._lock:
+                self._in_flight -= 1
+                self._host_in_flight[host] -= 1
+            self.results_queue.put((url, page))
+            self._pump()
+
+    def completed(self) -> Iterator[Tuple[str, Optional[FetchedPage]]]:
+        """Yield the pages that have already arrived, without waiting."""
+        while self.outstanding:
+            try:
+                url, page = self.results_queue.get_nowait()
+            except queue.Empty:
+                return
+            self.outstanding -= 1
+            yield url, page
+
+    def results(self, deadline: Optional[float] = None) -> Iterator[Tuple[str, Optional[FetchedPage]]]:
+        """Yield pages as they arrive until the queue drains or `deadline` passes."""
+        while self.outstanding:
+            timeout = None if deadline is None else deadline - time.time()
+            if timeout is not None and timeout <= 0:
+                return
+            try:
+                url, page = self.results_queue.get(timeout=timeout)
+            except queue.Empty:
+                return
+            self.outstanding -= 1
+            yield url, page
+
+    def close(self):
+        """Drop every URL not yet dispatched; in-flight fetches finish in the background."""
+        with self._lock:
+            self._closed = True
+            self._heap.clear()
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
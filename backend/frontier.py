@@ -0,0 +1,114 @@
+import os
+import json
+import time
+import sqlite3
+import threading
+from typing import Dict, Any, Iterable, List, Optional, Set
+from .http_cache import canonical_url
+
+
+class FrontierStore:
+    """Persistent record of every article URL the scraper has fetched and extracted.
+
+    Each row keeps the extraction result (headline, snippet, date, relevance,
+    type, ...) and when it was produced, so incremental runs can skip URLs seen
+    in earlier runs and still merge their stored items into the dataset.
+    Rows are scoped by the config fingerprint (checkpoint.config_fingerprint):
+    relevance is judged against the run's keywords and date range, so a URL
+    rejected under one config is fetched again by a run with a different one.
+    """
+
+    def __init__(self, db_path: str | None = None):
+        if db_path is None:
+            backend_dir = os.path.dirname(os.path.abspath(__file__))
+            db_path = os.path.join(backend_dir, "data", "frontier.sqlite")
+        os.makedirs(os.path.dirname(db_path), exist_ok=True)
+        self.db_path = db_path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        columns = [row[1] for row in self._conn.execute("PRAGMA table_info(frontier)")]
+        if columns and 'fingerprint' not in columns:
+            # Rows from before config scoping cannot be attributed to a config
+            self._conn.execute("DROP TABLE frontier")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS frontier (
+                fingerprint TEXT,
+                key TEXT,
+                url TEXT,
+                extracted_at REAL,
+                relevance REAL,
+                record TEXT,
+                PRIMARY KEY (fingerprint, key)
+            )
+        """)
+        self._conn.commit()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM frontier").fetchone()[0]
+
+    def count(self, fingerprint: str) -> int:
+        """Number of URLs recorded under one config fingerprint."""
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM frontier WHERE fingerprint = ?", (fingerprint,)).fetchone()[0]
+
+    def seen(self, urls: Iterable[str], fingerprint: str) -> Set[str]:
+        """Return the subset of `urls` already recorded under `fingerprint`."""
+        urls = list(urls)
+        if not urls:
+            return set()
+        keys: Dict[str, List[str]] = {}
+        for u in urls:
+            keys.setdefault(canonical_url(u), []).append(u)
+        found: Set[str] = set()
+        with self._lock:
+            key_list = list(keys)
+            # SQLite caps bound parameters, so query in chunks
+            for i in range(0, len(key_list), 500):
+                chunk = key_list[i:i + 500]
+                placeholders = ','.join('?' * len(chunk))
+                for (key,) in self._conn.execute(
+                        f"SELECT key FROM frontier WHERE fingerprint = ? AND key IN ({placeholders})", [fingerprint, *chunk]):
+                    found.update(keys[key])
+        return found
+
+    def record(self, url: str, extracted: Dict[str, Any], fingerprint: str):
+        """Store (or refresh) the extraction result for `url` under `fingerprint`."""
+        relevance = extracted.get('relevance', 0)
+        try:
+            relevance = float(relevance)
+        except (TypeError, ValueError):
+            relevance = 0.0
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO frontier (fingerprint, key, url, extracted_at, relevance, record) VALUES (?, ?, ?, ?, ?, ?)",
+                (fingerprint, canonical_url(url), url, time.time(), relevance,
+                 json.dumps(extracted, ensure_ascii=False, default=str))
+            )
+            self._conn.commit()
+
+    def stored_items(self, fingerprint: str, min_relevance: float = 0.15, since: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Records stored under `fingerprint` above `min_relevance`, optionally dated on/after `since` (YYYY-MM-DD)."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT url, record FROM frontier WHERE fingerprint = ? AND relevance > ? ORDER BY relevance DESC",
+                (fingerprint, min_relevance)
+            ).fetchall()
+        items = []
+        for url, record in rows:
+            try:
+                item = json.loads(record)
+            except (TypeError, ValueError):
+                continue
+            if since and str(item.get('date', '')) < since:
+                continue
+            if item.get('duplicate_of'):
+                # Near-duplicate copy of another stored article
+                continue
+            item['url'] = url
+            items.append(item)
+        return items
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,298 @@
+import re
+import unicodedata
+from collections import deque
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+# Medellín comunas and corregimientos by number, as used in news ("la comuna 13")
+MEDELLIN_COMUNAS = {
+    1: "Popular", 2: "Santa Cruz", 3: "Manrique", 4: "Aranjuez", 5: "Castilla", 6: "Doce de Octubre",
+    7: "Robledo", 8: "Villa Hermosa", 9: "Buenos Aires", 10: "La Candelaria", 11: "Laureles-Estadio",
+    12: "La América", 13: "San Javier", 14: "El Poblado", 15: "Guayabal", 16: "Belén",
+    50: "Palmitas", 60: "San Cristóbal", 70: "Altavista", 80: "San Antonio de Prado", 90: "Santa Elena",
+}
+ABURRA_MUNICIPALITIES = ("Medellín", "Bello", "Itagüí", "Envigado", "Sabaneta", "La Estrella", "Caldas",
+                         "Copacabana", "Girardota", "Barbosa")
+# estructura values in combos_v2.csv that are not organization names
+_NOT_ORGANIZATIONS = re.compile(r'^(no puedo identificar|combo barrial$)', re.IGNORECASE)
+_ALTERNATIVES_RE = re.compile(r'[()/]')
+# Free-text notes that ended up in the Barrio / comuna_nombre columns
+_NOISE = re.compile(r'[“”"()]| arriba en ')
+
+
+def _fold_char(c: str) -> str:
+    base = ''.join(ch for ch in unicodedata.normalize('NFKD', c) if not unicodedata.combining(ch)).lower()
+    return base if len(base) == 1 else c.lower() if len(c.lower()) == 1 else c
+
+
+# Latin letters only; one character in, one character out, so offsets stay aligned with the original text
+_FOLD_TABLE = {code: _fold_char(chr(code)) for code in range(0x250) if _fold_char(chr(code)) != chr(code)}
+
+
+def fold(text: str) -> str:
+    """Lower-cased text without accents (Itagüí -> itagui), with the same length as the input."""
+    return (text or '').translate(_FOLD_TABLE)
+
+
+def _clean(value: Any) -> str:
+    value = '' if value is None else str(value).strip().strip('"“”')
+    return '' if value.lower() in ('', 'nan', 'none') else value
+
+
+class AhoCorasick:
+    """Aho-Corasick automaton: every occurrence of many patterns in one pass over a text.
+
+    Add patterns, call build() (done on first search), then `iter` yields
+    (end offset, pattern id) for every occurrence, overlapping ones included,
+    in order of their end offset, and `count` gives per-pattern counts with
+    `str.count` semantics. The cost is linear in the text length plus the
+    number of matches, whatever the number of patterns.
+    """
+
+    def __init__(self, patterns: Iterable[str] = ()):
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._out: List[Tuple[int, ...]] = [()]
+        # state -> {char: next state} with failure transitions folded in; unknown chars go to the root
+        self._delta: List[Dict[str, int]] = []
+        self.patterns: List[str] = []
+        self._ids: Dict[str, int] = {}
+        self._built = False
+        for pattern in patterns:
+            self.add(pattern)
+
+    def add(self, pattern: str) -> int:
+        """Id of `pattern` (the existing one if it was added before)."""
+        if pattern in self._ids:
+            return self._ids[pattern]
+        if not pattern:
+            raise ValueError("Empty pattern")
+        state = 0
+        for ch in pattern:
+            nxt = self._goto[state].get(ch)
+            if nxt is None:
+                nxt = len(self._goto)
+                self._goto[state][ch] = nxt
+                self._goto.append({})
+                self._fail.append(0)
+                self._out.append(())
+            state = nxt
+        pattern_id = len(self.patterns)
+        self.patterns.append(pattern)
+        self._ids[pattern] = pattern_id
+        self._out[state] += (pattern_id,)
+        self._built = False
+        return pattern_id
+
+    def build(self):
+        goto, fail, out = self._goto, self._fail, self._out
+        queue = deque(goto[0].values())
+        for state in queue:
+            fail[state] = 0
+        while queue:
+            state = queue.popleft()
+            for ch, nxt in goto[state].items():
+                queue.append(nxt)
+                f = fail[state]
+                while f and ch not in goto[f]:
+                    f = fail[f]
+                fail[nxt] = goto[f].get(ch, 0) if goto[f].get(ch, 0) != nxt else 0
+                # Patterns ending at the fallback state also end here
+                out[nxt] = out[nxt] + out[fail[nxt]]
+        # BFS order: a state's fallback always has its table already
+        delta = [dict(goto[0])] + [{} for _ in range(len(goto) - 1)]
+        queue = deque(goto[0].values())
+        while queue:
+            state = queue.popleft()
+            delta[state] = {**delta[fail[state]], **goto[state]}
+            queue.extend(goto[state].values())
+        self._delta = delta
+        self._built = True
+
+    def iter(self, text: str) -> Iterator[Tuple[int, int]]:
+        if not self._built:
+            self.build()
+        delta, out = self._delta, self._out
+        state = 0
+        for i, ch in enumerate(text):
+            state = delta[state].get(ch, 0)
+            if out[state]:
+                for pattern_id in out[state]:
+                    yield i + 1, pattern_id
+
+    def count(self, text: str) -> Dict[int, int]:
+        """pattern id -> non-overlapping occurrences in `text`, as `text.count(pattern)` would count them."""
+        if not self._built:
+            self.build()
+        delta, out, patterns = self._delta, self._out, self.patterns
+        counts: Dict[int, int] = {}
+        # A pattern's occurrences arrive in order; one is counted if it starts after the last counted one ended
+        last_end: Dict[int, int] = {}
+        state = 0
+        for i, ch in enumerate(text):
+            state = delta[state].get(ch, 0)
+            if out[state]:
+                end = i + 1
+                for pattern_id in out[state]:
+                    if end - len(patterns[pattern_id]) >= last_end.get(pattern_id, 0):
+                        last_end[pattern_id] = end
+                        counts[pattern_id] = counts.get(pattern_id, 0) + 1
+        return counts
+
+    def __len__(self) -> int:
+        return len(self.patterns)
+
+
+class EntityGazetteer:
+    """Organizations, combos, barrios, comunas and municipalities found in text by dictionary lookup.
+
+    Built from combos_v2.csv (Combo/Banda, estructura, Barrio, comuna_nombre)
+    plus Medellín's comunas and the Valle de Aburrá municipalities, compiled
+    into one AhoCorasick automaton over accent- and case-folded names.
+    Matches must be whole words; where matches overlap the longest wins
+    ("El Hoyo de San Pablo" over "El Hoyo" and "San Pablo"). Labels with
+    aliases ("Combo de Niza (Los Tobón)") are matched under every alias.
+    """
+
+    KINDS = ('organization', 'combo', 'barrio', 'comuna', 'municipality')
+
+    def __init__(self):
+        self.automaton = AhoCorasick()
+        # pattern id -> [(kind, canonical name, parent)]: a combo's parent is its structure, a barrio's its comuna
+        self._entities: List[List[Tuple[str, str, Optional[str]]]] = []
+
+    def add(self, surface: str, kind: str, name: str, parent: Optional[str] = None):
+        surface = ' '.join(fold(surface).split())
+        if len(surface) < 3:
+            return
+        pattern_id = self.automaton.add(surface)
+        if pattern_id == len(self._entities):
+            self._entities.append([])
+        entry = (kind, name, parent)
+        if entry not in self._entities[pattern_id]:
+            self._entities[pattern_id].append(entry)
+
+    def add_label(self, label: str, kind: str, parent: Optional[str] = None):
+        """Add a label under its full form and each alias; the canonical name is the first alias."""
+        aliases = [part.strip() for part in _ALTERNATIVES_RE.split(_clean(label)) if part.strip()]
+        for alias in [_clean(label)] + aliases if aliases else []:
+            self.add(alias, kind, aliases[0], parent)
+
+    @classmethod
+    def from_dataframe(cls, df=None, organizations: Iterable[str] = ()) -> "EntityGazetteer":
+        """Gazetteer from a combos_v2.csv DataFrame (may be None or empty) and extra organization labels."""
+        gazetteer = cls()
+        for number, name in MEDELLIN_COMUNAS.items():
+            gazetteer.add(name, 'comuna', name)
+            gazetteer.add(f"comuna {number}", 'comuna', name)
+        for name in ABURRA_MUNICIPALITIES:
+            gazetteer.add(name, 'municipality', name)
+        places = {fold(name) for name in list(MEDELLIN_COMUNAS.values()) + list(ABURRA_MUNICIPALITIES)}
+        rows = []
+        if df is not None and not df.empty:
+            for row in df[['Combo/Banda', 'estructura', 'Barrio', 'comuna_nombre']].itertuples(index=False):
+                combo, structure, barrio, comuna = (_clean(v) for v in row)
+                structure = '' if _NOT_ORGANIZATIONS.match(structure) else structure
+                barrio = '' if _NOISE.search(barrio) else barrio
+                comuna = '' if _NOISE.search(comuna) else comuna
+                rows.append((combo, structure, barrio, comuna))
+                if barrio:
+                    gazetteer.add_label(barrio, 'barrio', comuna or None)
+                    places.add(fold(barrio))
+                if comuna:
+                    gazetteer.add(comuna, 'comuna', comuna)
+                    places.add(fold(comuna))
+
+        def add_named(label: str, kind: str, parent: Optional[str] = None):
+            # 'Los del 12 / Robledo': an alias that is also a place name would mislabel every mention of the place
+            aliases = [a.strip() for a in _ALTERNATIVES_RE.split(label) if a.strip()]
+            for alias in [label] + aliases:
+                if fold(alias) not in places:
+                    gazetteer.add(alias, kind, aliases[0], parent)
+
+        for combo, structure, _, _ in rows:
+            if structure:
+                add_named(structure, 'organization')
+            if combo:
+                add_named(combo, 'combo', structure or None)
+        for label in organizations:
+            add_named(_clean(label), 'organization')
+        gazetteer.automaton.build()
+        return gazetteer
+
+    @classmethod
+    def from_data_loader(cls, data_loader=None) -> "EntityGazetteer":
+        from .models import Organization
+        organizations = [org.value for org in Organization if org != Organization.OTHER]
+        return cls.from_dataframe(getattr(data_loader, 'df', None), organizations)
+
+    def matches(self, text: str) -> List[Tuple[int, int, int]]:
+        """(start, end, pattern id) of the whole-word, longest non-overlapping matches in `text`."""
+        folded = fold(text)
+        patterns = self.automaton.patterns
+        found = []
+        for end, pattern_id in self.automaton.iter(folded):
+            start = end - len(patterns[pattern_id])
+            if (start > 0 and folded[start - 1].isalnum()) or (end < len(folded) and folded[end].isalnum()):
+                continue
+            found.append((start, end, pattern_id))
+        found.sort(key=lambda m: (m[0], m[0] - m[1]))
+        chosen, covered = [], 0
+        for start, end, pattern_id in found:
+            if start >= covered:
+                chosen.append((start, end, pattern_id))
+                covered = end
+        return chosen
+
+    def entities(self, text: str) -> List[Tuple[str, str, Optional[str]]]:
+        """(kind, canonical name, parent) for every entity mentioned, in order of first mention."""
+        seen = {}
+        for _, _, pattern_id in self.matches(text):
+            for entity in self._entities[pattern_id]:
+                seen.setdefault(entity, None)
+        return list(seen)
+
+    def extract(self, text: str) -> Dict[str, Any]:
+        """extracted_metadata fields found in `text`.
+
+        organization is the first organization named, else the structure of
+        the first combo named, else "Unknown"; locations lists barrios,
+        comunas and municipalities; comunas adds the comunas of named barrios.
+        """
+        found: Dict[str, List[str]] = {kind: [] for kind in self.KINDS}
+        parents: Dict[str, List[str]] = {'combo': [], 'barrio': []}
+        for kind, name, parent in self.entities(text):
+            if name not in found[kind]:
+                found[kind].append(name)
+            if parent and kind in parents and parent not in parents[kind]:
+                parents[kind].append(parent)
+        organizations = found['organization'] + [o for o in parents['combo'] if o not in found['organization']]
+        comunas = found['comuna'] + [c for c in parents['barrio'] if c not in found['comuna']]
+        return {
+            'organization': organizations[0] if organizations else 'Unknown',
+            'organizations': organizations,
+            'combos': found['combo'],
+            # Robledo is a barrio and a comuna: list it once
+            'locations': list(dict.fromkeys(found['barrio'] + found['comuna'] + found['municipality'])),
+            'comunas': comunas,
+        }
+
+    def extract_many(self, texts: Iterable[str]) -> List[Dict[str, Any]]:
+        return [self.extract(text) for text in texts]
+
+    def enrich(self, metadata: Optional[Dict[str, Any]], text: str) -> Dict[str, Any]:
+        """Merge gazetteer entities into (a copy of) LLM-produced metadata.
+
+        The LLM's organization wins unless it is missing or "Unknown";
+        locations are the union of both, without accent/case duplicates.
+        """
+        local = self.extract(text)
+        merged = dict(metadata) if isinstance(metadata, dict) else {}
+        if not merged.get('organization') or str(merged['organization']).strip().lower() == 'unknown':
+            merged['organization'] = local['organization']
+        locations = merged.get('locations') if isinstance(merged.get('locations'), list) else []
+        known = {fold(str(loc)).strip() for loc in locations}
+        merged['locations'] = list(locations) + [loc for loc in local['locations'] if fold(loc) not in known]
+        for key in ('organizations', 'combos', 'comunas'):
+            merged[key] = local[key]
+        merged.setdefault('crime_type', 'Unknown')
+        return merged
@@ -0,0 +1,401 @@
+import re
+import sys
+import datetime
+import multiprocessing
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+from bs4 import BeautifulSoup
+
+# Fast C parsers are optional; the BeautifulSoup engine is always available
+try:
+    from selectolax.lexbor import LexborHTMLParser
+except ImportError:
+    LexborHTMLParser = None
+try:
+    import lxml.html
+except ImportError:
+    lxml = None
+
+# Cap on the body text carried back from a worker
+MAX_BODY_TEXT = 20000
+# With stop_early, parse only up to this many paragraphs after the first <h1>
+EARLY_STOP_PARAGRAPHS = 3
+# Cap on the main-content text handed to the LLM (~2k tokens)
+MAX_MAIN_TEXT = 8000
+# Main-content candidates need at least this much paragraph text
+MIN_MAIN_TEXT = 200
+
+ENGINES = ('selectolax', 'lxml', 'bs4')
+
+Markup = Union[bytes, str]
+
+_H1_RE = re.compile(r'<h1[\s>]', re.IGNORECASE)
+_P_END_RE = re.compile(r'</p\s*>', re.IGNORECASE)
+_HIDDEN_TAGS = ['script', 'style', 'noscript', 'template']
+# Page chrome removed before looking for the main content
+_BOILERPLATE_TAGS = ['nav', 'header', 'footer', 'aside', 'form', 'iframe', 'svg', 'button', 'select']
+_SIMPLE_TAG_RE = re.compile(r'[A-Za-z][A-Za-z0-9]*')
+
+
+def available_engines() -> List[str]:
+    return [name for name in ENGINES
+            if (name == 'selectolax' and LexborHTMLParser is not None)
+            or (name == 'lxml' and lxml is not None)
+            or name == 'bs4']
+
+
+def resolve_engine(name: str = 'auto') -> str:
+    """Map 'auto' to the fastest installed engine; unknown names raise ValueError."""
+    if name == 'auto':
+        return available_engines()[0]
+    if name not in ENGINES:
+        raise ValueError(f"Unknown HTML engine '{name}' (choose from auto, {', '.join(ENGINES)})")
+    if name not in available_engines():
+        print(f"[HTML Parse] Engine '{name}' is not installed - using bs4", file=sys.stderr, flush=True)
+        return 'bs4'
+    return name
+
+
+def _decode(markup: Markup, encoding: Optional[str] = None) -> str:
+    if isinstance(markup, (bytes, bytearray, memoryview)):
+        try:
+            return bytes(markup).decode(encoding or 'utf-8', errors='replace')
+        except LookupError:
+            # Unknown charset label in the headers or <meta>
+            return bytes(markup).decode('utf-8', errors='replace')
+    return markup
+
+
+def _iso_date(value: str) -> Optional[str]:
+    try:
+        return datetime.datetime.fromisoformat(value.strip().replace('Z', '+00:00')).strftime('%Y-%m-%d')
+    except (ValueError, AttributeError):
+        return None
+
+
+def head_prefix(markup: str, paragraphs: int = EARLY_STOP_PARAGRAPHS) -> str:
+    """Markup up to the end of the `paragraphs`-th </p> after the first <h1> (all of it if there are fewer).
+
+    Head metadata, the headline, the byline <time> and the opening paragraphs
+    all sit in this prefix, so parsing can stop there.
+    """
+    h1 = _H1_RE.search(markup)
+    pos = h1.start() if h1 else 0
+    end = None
+    for _ in range(paragraphs):
+        match = _P_END_RE.search(markup, pos)
+        if match is None:
+            return markup
+        end = pos = match.end()
+    return markup[:end] if end else markup
+
+
+def select_main_content(article_paragraphs: List[str], paragraphs: List[Tuple[Any, Any, str, int]],
+                        body_text: str) -> Tuple[str, str]:
+    """Pick the main text of a page from its paragraphs; returns (text, method).
+
+    1. 'article': the paragraphs of the first <article>, if they hold enough text.
+    2. 'density': readability-style scoring. Each paragraph with little link text
+       scores its parent (and half as much its grandparent) by length and commas;
+       the paragraphs under the best-scoring container win.
+    3. 'body': the whole visible body text.
+    `paragraphs` is (parent key, grandparent key, text, link chars) in document order.
+    """
+    text = '\n'.join(p for p in article_paragraphs if p)
+    if len(text) >= MIN_MAIN_TEXT:
+        return text[:MAX_MAIN_TEXT], 'article'
+
+    scores: Dict[Any, float] = {}
+    for parent, grandparent, para, link_chars in paragraphs:
+        if len(para) < 25 or link_chars > len(para) / 2:
+            continue
+        score = 1 + min(len(para) // 100, 3) + para.count(',')
+        scores[parent] = scores.get(parent, 0) + score
+        if grandparent is not None:
+            scores[grandparent] = scores.get(grandparent, 0) + score / 2
+    if scores:
+        best = max(scores, key=scores.get)
+        text = '\n'.join(para for parent, grandparent, para, link_chars in paragraphs
+                         if (parent == best or grandparent == best) and para and link_chars <= len(para) / 2)
+        if len(text) >= MIN_MAIN_TEXT:
+            return text[:MAX_MAIN_TEXT], 'density'
+    return body_text[:MAX_MAIN_TEXT], 'body'
+
+
+# --- Engines: each returns the same record -----------------------------------
+#
+# Text follows BeautifulSoup's get_text(strip=True): every text node stripped
+# and joined without a separator; body_text joins them with single spaces.
+# With main_content, page chrome is stripped and the record also carries
+# 'description', 'main_text' and 'content_method' (see select_main_content).
+
+def _bs4_article(markup: str, main_content: bool = False) -> Dict[str, Any]:
+    soup = BeautifulSoup(markup, "html.parser")
+    h1 = soup.select_one('h1')
+    title_tag = soup.select_one('title')
+    p = soup.select_one('article p') or soup.select_one('div.entry-content p') or soup.select_one('p')
+    date = None
+    meta_date = soup.select_one("meta[property='article:published_time']") or soup.select_one('time[datetime]')
+    if meta_date:
+        date = _iso_date(str(meta_date.get('content') or meta_date.get('datetime') or ''))
+    for tag in soup(_HIDDEN_TAGS):
+        tag.decompose()
+    body = soup.body or soup
+    record = {
+        'h1': h1.get_text(strip=True) if h1 else '',
+        'title': (h1 or title_tag).get_text(strip=True) if (h1 or title_tag) else '',
+        'first_paragraph': p.get_text(strip=True) if p else '',
+        'date': date,
+        'body_text': body.get_text(' ', strip=True)[:MAX_BODY_TEXT],
+    }
+    if main_content:
+        description = soup.select_one("meta[name='description']") or soup.select_one("meta[property='og:description']")
+        record['description'] = str(description.get('content') or '').strip() if description else ''
+        for tag in soup(_BOILERPLATE_TAGS):
+            tag.decompose()
+        article = soup.find('article')
+        article_paragraphs = [el.get_text(' ', strip=True) for el in article.find_all('p')] if article else []
+        paragraphs = []
+        for el in soup.find_all('p'):
+            parent = el.parent
+            grandparent = parent.parent if parent is not None else None
+            link_chars = sum(len(a.get_text(strip=True)) for a in el.find_all('a'))
+            paragraphs.append((id(parent), id(grandparent) if grandparent is not None else None,
+                               el.get_text(' ', strip=True), link_chars))
+        record['main_text'], record['content_method'] = select_main_content(
+            article_paragraphs, paragraphs, record['body_text'])
+    return record
+
+
+def _selectolax_article(markup: str, main_content: bool = False) -> Dict[str, Any]:
+    tree = LexborHTMLParser(markup)
+    h1 = tree.css_first('h1')
+    title_tag = tree.css_first('title')
+    p = tree.css_first('article p') or tree.css_first('div.entry-content p') or tree.css_first('p')
+    date = None
+    meta_date = tree.css_first("meta[property='article:published_time']") or tree.css_first('time[datetime]')
+    if meta_date:
+        attrs = meta_date.attributes
+        date = _iso_date(str(attrs.get('content') or attrs.get('datetime') or ''))
+    headline = h1.text(strip=True) if h1 else ''
+    first_paragraph = p.text(strip=True) if p else ''
+    tree.strip_tags(_HIDDEN_TAGS)
+    body = tree.body or tree.root
+    record = {
+        'h1': headline,
+        'title': headline if h1 else (title_tag.text(strip=True) if title_tag else ''),
+        'first_paragraph': first_paragraph,
+        'date': date,
+        'body_text': (body.text(separator=' ', strip=True) if body else '')[:MAX_BODY_TEXT],
+    }
+    if main_content:
+        description = tree.css_first("meta[name='description']") or tree.css_first("meta[property='og:description']")
+        record['description'] = str(description.attributes.get('content') or '').strip() if description else ''
+        tree.strip_tags(_BOILERPLATE_TAGS)
+        article = tree.css_first('article')
+        article_paragraphs = [el.text(separator=' ', strip=True) for el in article.css('p')] if article else []
+        paragraphs = []
+        for el in tree.css('p'):
+            parent = el.parent
+            grandparent = parent.parent if parent is not None else None
+            link_chars = sum(len(a.text(strip=True)) for a in el.css('a'))
+            paragraphs.append((parent.mem_id if parent is not None else None,
+                               grandparent.mem_id if grandparent is not None else None,
+                               el.text(separator=' ', strip=True), link_chars))
+        record['main_text'], record['content_method'] = select_main_content(
+            article_paragraphs, paragraphs, record['body_text'])
+    return record
+
+
+def _lxml_text(el, separator: str = '') -> str:
+    return separator.join(s.strip() for s in el.itertext() if s.strip())
+
+
+def _first(doc, *xpaths):
+    for xpath in xpaths:
+        found = doc.xpath(xpath)
+        if found:
+            return found[0]
+    return None
+
+
+def _lxml_article(markup: str, main_content: bool = False) -> Dict[str, Any]:
+    try:
+        doc = lxml.html.document_fromstring(markup)
+    except Exception:
+        # Empty or unparseable document
+        record = {'h1': '', 'title': '', 'first_paragraph': '', 'date': None, 'body_text': ''}
+        if main_content:
+            record.update(description='', main_text='', content_method='body')
+        return record
+    h1 = _first(doc, '(//h1)[1]')
+    title_tag = _first(doc, '(//title)[1]')
+    p = _first(doc, '(//article//p)[1]',
+               "(//div[contains(concat(' ', normalize-space(@class), ' '), ' entry-content ')]//p)[1]",
+               '(//p)[1]')
+    date = None
+    value = _first(doc, "//meta[@property='article:published_time']/@content", '//time/@datetime')
+    if value is not None:
+        date = _iso_date(str(value))
+    headline = _lxml_text(h1) if h1 is not None else ''
+    first_paragraph = _lxml_text(p) if p is not None else ''
+    for el in doc.xpath('|'.join(f'//{tag}' for tag in _HIDDEN_TAGS)):
+        el.drop_tree()
+    body = doc.find('body')
+    record = {
+        'h1': headline,
+        'title': headline if h1 is not None else (_lxml_text(title_tag) if title_tag is not None else ''),
+        'first_paragraph': first_paragraph,
+        'date': date,
+        'body_text': _lxml_text(body if body is not None else doc, ' ')[:MAX_BODY_TEXT],
+    }
+    if main_content:
+        description = _first(doc, "//meta[@name='description']/@content", "//meta[@property='og:description']/@content")
+        record['description'] = str(description or '').strip()
+        for el in doc.xpath('|'.join(f'//{tag}' for tag in _BOILERPLATE_TAGS)):
+            el.drop_tree()
+        article = _first(doc, '(//article)[1]')
+        article_paragraphs = [_lxml_text(el, ' ') for el in article.iter('p')] if article is not None else []
+        paragraphs = []
+        for el in doc.iter('p'):
+            # Element proxies stay identical while referenced, so they can key the scores
+            parent = el.getparent()
+            grandparent = parent.getparent() if parent is not None else None
+            link_chars = sum(len(_lxml_text(a)) for a in el.iter('a'))
+            paragraphs.append((parent, grandparent, _lxml_text(el, ' '), link_chars))
+        record['main_text'], record['content_method'] = select_main_content(
+            article_paragraphs, paragraphs, record['body_text'])
+    return record
+
+
+_ARTICLE_ENGINES = {'bs4': _bs4_article, 'selectolax': _selectolax_article, 'lxml': _lxml_article}
+
+
+def parse_article_html(markup: Markup, encoding: Optional[str] = None, engine: str = 'auto',
+                       stop_early: bool = False, main_content: bool = False) -> Dict[str, Any]:
+    """Compact record of an article page: title, first paragraph, meta date and body text.
+
+    `title` is the first <h1> (falling back to <title>), `date` is YYYY-MM-DD from
+    article:published_time or <time datetime> (None if absent or unparseable).
+    With `stop_early` only the head_prefix is parsed, so body_text covers just
+    the opening paragraphs. `main_content` adds the boilerplate-free article
+    text and meta description (and needs the whole page, so it overrides stop_early).
+    """
+    text = _decode(markup, encoding)
+    if stop_early and not main_content:
+        text = head_prefix(text)
+    return _ARTICLE_ENGINES[resolve_engine(engine)](text, main_content)
+
+
+def parse_links_html(markup: Markup, base_url: str, selector: str = 'a',
+                     encoding: Optional[str] = None, engine: str = 'auto') -> List[Tuple[str, str]]:
+    """(absolute url, anchor text) for every `selector[href]` on a listing page."""
+    text = _decode(markup, encoding)
+    engine = resolve_engine(engine)
+    if engine == 'selectolax':
+        anchors = [(str(a.attributes.get('href') or ''), a.text(strip=True))
+                   for a in LexborHTMLParser(text).css(f"{selector}[href]")]
+    elif engine == 'lxml' and _SIMPLE_TAG_RE.fullmatch(selector):
+        try:
+            anchors = [(str(a.get('href') or ''), _lxml_text(a))
+                       for a in lxml.html.document_fromstring(text).xpath(f'//{selector}[@href]')]
+        except Exception:
+            anchors = []
+    else:
+        # bs4, or a CSS selector lxml cannot evaluate without cssselect
+        anchors = [(str(a.get('href') or ''), a.get_text(strip=True))
+                   for a in BeautifulSoup(text, "html.parser").select(f"{selector}[href]")]
+    links = []
+    for href, anchor_text in anchors:
+        if not href:
+            continue
+        full = href if href.startswith("http") else base_url.rstrip('/') + '/' + href.lstrip('/')
+        links.append((full, anchor_text))
+    return links
+
+
+
+
+class PendingParse:
+    """Handle on a parse submitted to HtmlParserPool; `result()` blocks until it is done."""
+
+    def __init__(self, pool: "HtmlParserPool", future: Optional[Future], fn, args: tuple):
+        self._pool = pool
+        self._future = future
+        self._fn = fn
+        self._args = args
+        self._result = None
+        self._done = False
+
+    def result(self):
+        if self._done:
+            return self._result
+        if self._future is None:
+            self._result = self._fn(*self._args)
+        else:
+            try:
+                self._result = self._future.result()
+            except BrokenProcessPool:
+                # A crashed worker breaks the pool; parse this one inline and start fresh next time
+                self._pool.close()
+                self._result = self._fn(*self._args)
+        self._done = True
+        return self._result
+
+    def cancel(self):
+        if self._future is not None:
+            self._future.cancel()
+
+
+class HtmlParserPool:
+    """Runs BeautifulSoup parsing in worker processes so it does not hold the GIL.
+
+    Callers hand over raw bytes (or text) and get compact records back, so only
+    small payloads cross the process boundary. `submit_*` returns immediately so
+    several pages can be parsed on different cores at once. Workers are spawned
+    lazily on first use; `workers=0` parses inline on the calling thread.
+    `engine` picks the parser ('auto' = fastest installed, see ENGINES).
+    """
+
+    def __init__(self, workers: int = 2, engine: str = 'auto'):
+        self.workers = max(0, int(workers or 0))
+        self.requested_engine = engine
+        self.engine = resolve_engine(engine)
+        self._executor: Optional[ProcessPoolExecutor] = None
+
+    @property
+    def executor(self) -> Optional[ProcessPoolExecutor]:
+        if self.workers and self._executor is None:
+            # spawn: forking a process that already runs fetch threads is not safe
+            self._executor = ProcessPoolExecutor(max_workers=self.workers,
+                                                 mp_context=multiprocessing.get_context('spawn'))
+        return self._executor
+
+    def _submit(self, fn, *args) -> PendingParse:
+        executor = self.executor
+        if executor is None:
+            return PendingParse(self, None, fn, args)
+        try:
+            return PendingParse(self, executor.submit(fn, *args), fn, args)
+        except BrokenProcessPool:
+            self.close()
+            return PendingParse(self, None, fn, args)
+
+    def submit_article(self, markup: Markup, encoding: Optional[str] = None,
+                       stop_early: bool = False, main_content: bool = False) -> PendingParse:
+        return self._submit(parse_article_html, markup, encoding, self.engine, stop_early, main_content)
+
+    def article(self, markup: Markup, encoding: Optional[str] = None, stop_early: bool = False,
+                main_content: bool = False) -> Dict[str, Any]:
+        return self.submit_article(markup, encoding, stop_early, main_content).result()
+
+    def links(self, markup: Markup, base_url: str, selector: str = 'a',
+              encoding: Optional[str] = None) -> List[Tuple[str, str]]:
+        return self._submit(parse_links_html, markup, base_url, selector, encoding, self.engine).result()
+
+    def close(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
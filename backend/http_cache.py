@@ -0,0 +1,216 @@
+import os
+import json
+import time
+import sqlite3
+import hashlib
+import threading
+from dataclasses import dataclass
+from typing import Dict, Any, Optional
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
+
+# Query parameters that never change page content (tracking / campaign tags)
+TRACKING_PARAMS = {'fbclid', 'gclid', 'igshid', 'mc_cid', 'mc_eid', 'ref', 'amp'}
+
+
+def canonical_url(url: str) -> str:
+    """Normalize a URL so trivially different spellings share one cache entry.
+
+    Lower-cases scheme and host, drops default ports, fragments, utm_* and other
+    tracking parameters, sorts the remaining query and trims a trailing slash.
+    """
+    try:
+        parts = urlsplit(url.strip())
+    except Exception:
+        return url
+    scheme = parts.scheme.lower()
+    netloc = parts.netloc.lower()
+    if (scheme == 'http' and netloc.endswith(':80')) or (scheme == 'https' and netloc.endswith(':443')):
+        netloc = netloc.rsplit(':', 1)[0]
+    query = sorted(
+        (k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True)
+        if not k.lower().startswith('utm_') and k.lower() not in TRACKING_PARAMS
+    )
+    path = parts.path or '/'
+    if len(path) > 1:
+        path = path.rstrip('/')
+    return urlunsplit((scheme, netloc, path, urlencode(query), ''))
+
+
+@dataclass
+class CacheEntry:
+    url: str
+    status_code: int
+    headers: Dict[str, str]
+    body: bytes
+    etag: Optional[str]
+    last_modified: Optional[str]
+    stored_at: float
+    elapsed: float  # Seconds the original network fetch took
+
+    def is_fresh(self, ttl_seconds: float) -> bool:
+        return (time.time() - self.stored_at) < ttl_seconds
+
+
+class ResponseCache:
+    """Disk-backed HTTP response cache with conditional revalidation and LRU eviction.
+
+    Bodies live as individual files under `cache_dir`; an SQLite index keeps
+    headers, validators (ETag / Last-Modified) and access times. Entries younger
+    than `ttl_seconds` are served without touching the network; older ones are
+    revalidated with If-None-Match / If-Modified-Since. When the bodies exceed
+    `max_bytes` the least recently used entries are evicted.
+    """
+
+    def __init__(self, cache_dir: str | None = None, max_bytes: int = 256 * 1024 * 1024,
+                 ttl_seconds: float = 6 * 3600):
+        if cache_dir is None:
+            backend_dir = os.path.dirname(os.path.abspath(__file__))
+            cache_dir = os.path.join(backend_dir, "data", "http_cache")
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        os.makedirs(self.cache_dir, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(os.path.join(self.cache_dir, "index.sqlite"), check_same_thread=False)
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS entries (
+                key TEXT PRIMARY KEY,
+                url TEXT,
+                status_code INTEGER,
+                headers TEXT,
+                etag TEXT,
+                last_modified TEXT,
+                size INTEGER,
+                stored_at REAL,
+                last_access REAL,
+                elapsed REAL
+            )
+        """)
+        self._conn.commit()
+        self.reset_stats()
+
+    def reset_stats(self):
+        self.hits = 0
+        self.revalidated = 0
+        self.misses = 0
+        self.stores = 0
+        self.evictions = 0
+        self.bytes_saved = 0
+        self.seconds_saved = 0.0
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.revalidated + self.misses
+        return {
+            "hits": self.hits,
+            "revalidated": self.revalidated,
+            "misses": self.misses,
+            "stores": self.stores,
+            "evictions": self.evictions,
+            "hit_ratio": round((self.hits + self.revalidated) / lookups, 3) if lookups else 0.0,
+            "bytes_saved": self.bytes_saved,
+            "seconds_saved": round(self.seconds_saved, 2),
+        }
+
+    def _key(self, url: str) -> str:
+        return canonical_url(url)
+
+    def _body_path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, hashlib.sha1(key.encode('utf-8')).hexdigest() + ".body")
+
+    def is_fresh(self, url: str) -> bool:
+        """True if `url` can be served from the cache without any request."""
+        with self._lock:
+            row = self._conn.execute("SELECT stored_at FROM entries WHERE key = ?", (self._key(url),)).fetchone()
+        return row is not None and (time.time() - row[0]) < self.ttl_seconds
+
+    def lookup(self, url: str) -> Optional[CacheEntry]:
+        """Return the stored entry for `url` (fresh or stale), or None."""
+        key = self._key(url)
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT url, status_code, headers, etag, last_modified, stored_at, elapsed FROM entries WHERE key = ?",
+                (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            try:
+                with open(self._body_path(key), 'rb') as f:
+                    body = f.read()
+            except OSError:
+                self._conn.execute("DELETE FROM entries WHERE key = ?", (key,))
+                self._conn.commit()
+                return None
+            self._conn.execute("UPDATE entries SET last_access = ? WHERE key = ?", (time.time(), key))
+            self._conn.commit()
+        return CacheEntry(
+            url=row[0], status_code=row[1], headers=json.loads(row[2] or '{}'), body=body,
+            etag=row[3], last_modified=row[4], stored_at=row[5], elapsed=row[6] or 0.0
+        )
+
+    def conditional_headers(self, entry: Optional[CacheEntry]) -> Dict[str, str]:
+        headers: Dict[str, str] = {}
+        if entry is None:
+            return headers
+        if entry.etag:
+            headers['If-None-Match'] = entry.etag
+        if entry.last_modified:
+            headers['If-Modified-Since'] = entry.last_modified
+        return headers
+
+    def record_hit(self, entry: CacheEntry):
+        with self._lock:
+            self.hits += 1
+            self.bytes_saved += len(entry.body)
+            self.seconds_saved += entry.elapsed
+
+    def record_miss(self):
+        with self._lock:
+            self.misses += 1
+
+    def revalidate(self, url: str, entry: CacheEntry):
+        """Mark a stale entry as fresh again after a 304 Not Modified."""
+        key = self._key(url)
+        now = time.time()
+        entry.stored_at = now
+        with self._lock:
+            self.revalidated += 1
+            self.bytes_saved += len(entry.body)
+            self._conn.execute("UPDATE entries SET stored_at = ?, last_access = ? WHERE key = ?", (now, now, key))
+            self._conn.commit()
+
+    def store(self, url: str, status_code: int, headers: Dict[str, str], body: bytes, elapsed: float = 0.0):
+        key = self._key(url)
+        headers = {k: v for k, v in headers.items() if k.lower() not in ('set-cookie', 'transfer-encoding', 'content-encoding')}
+        etag = headers.get('ETag') or headers.get('etag')
+        last_modified = headers.get('Last-Modified') or headers.get('last-modified')
+        now = time.time()
+        with self._lock:
+            with open(self._body_path(key), 'wb') as f:
+                f.write(body)
+            self._conn.execute(
+                "INSERT OR REPLACE INTO entries (key, url, status_code, headers, etag, last_modified, size, stored_at, last_access, elapsed) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (key, url, status_code, json.dumps(headers), etag, last_modified, len(body), now, now, elapsed)
+            )
+            self.stores += 1
+            self._evict_locked()
+            self._conn.commit()
+
+    def _evict_locked(self):
+        total = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        for key, size in self._conn.execute("SELECT key, size FROM entries ORDER BY last_access ASC").fetchall():
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(self._body_path(key))
+            except OSError:
+                pass
+            self._conn.execute("DELETE FROM entries WHERE key = ?", (key,))
+            total -= size or 0
+            self.evictions += 1
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,149 @@
+import os
+import json
+import time
+import sqlite3
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+
+class KVCache:
+    """Persistent JSON key-value cache with TTL, size-bounded LRU eviction and an in-memory front.
+
+    Values live in one SQLite table; the most recently used `memory_items`
+    are also kept in process so repeated hits never touch the database.
+    Entries older than `ttl_seconds` count as misses and are deleted on sight;
+    once the stored values exceed `max_bytes` the least recently used ones go.
+    Access times are only written for database hits, so an entry served from
+    memory may be evicted from disk a little earlier than strict LRU would.
+    The memory front holds the serialized JSON, so every `get` returns a
+    fresh copy and a caller mutating its value cannot change the cached one.
+    """
+
+    def __init__(self, db_path: str, ttl_seconds: float = 30 * 86400, max_bytes: int = 64 * 1024 * 1024,
+                 memory_items: int = 2048):
+        os.makedirs(os.path.dirname(db_path), exist_ok=True)
+        self.db_path = db_path
+        self.ttl_seconds = ttl_seconds
+        self.max_bytes = max_bytes
+        self.memory_items = memory_items
+        self._memory: "OrderedDict[str, Tuple[float, str]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        # WAL + NORMAL sync: per-read access-time commits stay in the tens of microseconds
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS entries (
+                key TEXT PRIMARY KEY,
+                value TEXT,
+                size INTEGER,
+                stored_at REAL,
+                last_access REAL
+            )
+        """)
+        self._conn.commit()
+        self._total_bytes = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+        self.reset_stats()
+
+    def reset_stats(self):
+        self.hits = 0
+        self.memory_hits = 0
+        self.misses = 0
+        self.stores = 0
+        self.evictions = 0
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "memory_hits": self.memory_hits,
+            "misses": self.misses,
+            "stores": self.stores,
+            "evictions": self.evictions,
+            "hit_ratio": round(self.hits / lookups, 3) if lookups else 0.0,
+            "bytes": self._total_bytes,
+        }
+
+    def _remember(self, key: str, stored_at: float, data: str):
+        self._memory[key] = (stored_at, data)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_items:
+            self._memory.popitem(last=False)
+
+    def get(self, key: str) -> Optional[Any]:
+        """Cached value for `key`, or None if absent or expired."""
+        now = time.time()
+        with self._lock:
+            cached = self._memory.get(key)
+            if cached is not None and now - cached[0] < self.ttl_seconds:
+                self._memory.move_to_end(key)
+                self.hits += 1
+                self.memory_hits += 1
+                return json.loads(cached[1])
+            row = self._conn.execute("SELECT value, stored_at, size FROM entries WHERE key = ?", (key,)).fetchone()
+            if row is None or now - row[1] >= self.ttl_seconds:
+                if row is not None:
+                    self._delete_locked(key, row[2])
+                    self._conn.commit()
+                self._memory.pop(key, None)
+                self.misses += 1
+                return None
+            self._conn.execute("UPDATE entries SET last_access = ? WHERE key = ?", (now, key))
+            self._conn.commit()
+            self._remember(key, row[1], row[0])
+            self.hits += 1
+            return json.loads(row[0])
+
+    def set(self, key: str, value: Any):
+        data = json.dumps(value, ensure_ascii=False, default=str)
+        size = len(data.encode('utf-8'))
+        now = time.time()
+        with self._lock:
+            old = self._conn.execute("SELECT size FROM entries WHERE key = ?", (key,)).fetchone()
+            self._conn.execute(
+                "INSERT OR REPLACE INTO entries (key, value, size, stored_at, last_access) VALUES (?, ?, ?, ?, ?)",
+                (key, data, size, now, now)
+            )
+            self._total_bytes += size - (old[0] if old else 0)
+            self._remember(key, now, data)
+            self.stores += 1
+            self._evict_locked()
+            self._conn.commit()
+
+    def delete(self, key: str):
+        with self._lock:
+            row = self._conn.execute("SELECT size FROM entries WHERE key = ?", (key,)).fetchone()
+            if row is not None:
+                self._delete_locked(key, row[0])
+                self._conn.commit()
+            self._memory.pop(key, None)
+
+    def _delete_locked(self, key: str, size: int):
+        self._conn.execute("DELETE FROM entries WHERE key = ?", (key,))
+        self._total_bytes -= size or 0
+
+    def _evict_locked(self):
+        if self._total_bytes <= self.max_bytes:
+            return
+        for key, size in self._conn.execute("SELECT key, size FROM entries ORDER BY last_access ASC").fetchall():
+            if self._total_bytes <= self.max_bytes:
+                break
+            self._delete_locked(key, size)
+            self._memory.pop(key, None)
+            self.evictions += 1
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM entries").fetchone()[0]
+
+    def clear(self):
+        with self._lock:
+            self._conn.execute("DELETE FROM entries")
+            self._conn.commit()
+            self._memory.clear()
+            self._total_bytes = 0
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,109 @@
+import os
+import time
+import hashlib
+import threading
+import unicodedata
+from typing import Any, Dict, Iterable, List, Optional
+
+from .kv_cache import KVCache
+
+
+def normalize_text(text: str) -> str:
+    """Unicode-normalized, lower-cased text with collapsed whitespace."""
+    return ' '.join(unicodedata.normalize('NFKC', text or '').lower().split())
+
+
+def keyword_hash(keywords: Iterable[str]) -> str:
+    """Order- and case-insensitive hash of a keyword set."""
+    normalized = sorted({normalize_text(k) for k in keywords if k and k.strip()})
+    return hashlib.sha1('\x1f'.join(normalized).encode('utf-8')).hexdigest()[:16]
+
+
+class ExtractionCache:
+    """Content-addressed cache of LLM article extractions.
+
+    Keys combine a hash of the normalized article content with a hash of the
+    config keyword set the relevance score was computed against, so the same
+    story reached through another URL, a mirror or a re-scrape reuses the
+    result while a different keyword set gets a fresh extraction. Entries
+    remember the tokens and time the original call cost, to report savings.
+    """
+
+    def __init__(self, db_path: str | None = None, ttl_seconds: float = 30 * 86400,
+                 max_bytes: int = 64 * 1024 * 1024):
+        if db_path is None:
+            backend_dir = os.path.dirname(os.path.abspath(__file__))
+            db_path = os.path.join(backend_dir, "data", "llm_extraction_cache.sqlite")
+        self.store = KVCache(db_path, ttl_seconds=ttl_seconds, max_bytes=max_bytes)
+        # Savings counters are updated from the extraction threads
+        self._lock = threading.Lock()
+        self.reset_stats()
+
+    @staticmethod
+    def key(content: str, keywords: Iterable[str]) -> str:
+        digest = hashlib.sha256(normalize_text(content).encode('utf-8')).hexdigest()
+        return f"{digest}:{keyword_hash(keywords)}"
+
+    def reset_stats(self):
+        self.store.reset_stats()
+        with self._lock:
+            self.tokens_saved = 0
+            self.seconds_saved = 0.0
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        entry = self.store.get(key)
+        if entry is None:
+            return None
+        with self._lock:
+            self.tokens_saved += entry.get('tokens', 0)
+            self.seconds_saved += entry.get('latency', 0.0)
+        return entry['result']
+
+    def put(self, key: str, result: Dict[str, Any], tokens: int = 0, latency: float = 0.0):
+        self.store.set(key, {'result': result, 'tokens': tokens, 'latency': round(latency, 3)})
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            saved = {"tokens_saved": self.tokens_saved, "seconds_saved": round(self.seconds_saved, 2)}
+        return {**self.store.stats(), **saved}
+
+    def close(self):
+        self.store.close()
+
+
+class SearchCache:
+    """Persistent cache of web-search citation lists.
+
+    Keys combine the normalized query text with a date bucket (`bucket_days`
+    wide, UTC), so a repeated query plan reuses today's results while news
+    searched on another day gets fresh ones. Only successful searches are
+    stored; an empty result is a valid answer and is cached too.
+    """
+
+    def __init__(self, db_path: str | None = None, bucket_days: int = 1, ttl_seconds: float = 7 * 86400,
+                 max_bytes: int = 16 * 1024 * 1024):
+        if db_path is None:
+            backend_dir = os.path.dirname(os.path.abspath(__file__))
+            db_path = os.path.join(backend_dir, "data", "search_cache.sqlite")
+        self.bucket_days = max(1, bucket_days)
+        self.store = KVCache(db_path, ttl_seconds=ttl_seconds, max_bytes=max_bytes)
+
+    def key(self, query: str, model: str = '') -> str:
+        bucket = int(time.time() // 86400) // self.bucket_days
+        digest = hashlib.sha1(f"{model}\x1f{normalize_text(query)}".encode('utf-8')).hexdigest()
+        return f"{digest}:{bucket}"
+
+    def reset_stats(self):
+        self.store.reset_stats()
+
+    def get(self, query: str, model: str = '') -> Optional[List[str]]:
+        return self.store.get(self.key(query, model))
+
+    def put(self, query: str, urls: List[str], model: str = ''):
+        self.store.set(self.key(query, model), list(urls))
+
+    def stats(self) -> Dict[str, Any]:
+        return self.store.stats()
+
+    def close(self):
+        self.store.close()
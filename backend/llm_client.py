@@ -0,0 +1,229 @@
+import os
+import sys
+import time
+import random
+import asyncio
+import threading
+import email.utils
+from collections import deque
+from typing import Any, Dict, List, Optional, Tuple
+
+import openai
+from openai import AsyncOpenAI
+
+# Completion tokens reserved against the token budget before the real usage is known
+COMPLETION_RESERVE = 512
+CHARS_PER_TOKEN = 4
+
+_RETRYABLE = (openai.RateLimitError, openai.APITimeoutError, openai.APIConnectionError, openai.InternalServerError)
+
+_loop: Optional[asyncio.AbstractEventLoop] = None
+_loop_lock = threading.Lock()
+
+
+def background_loop() -> asyncio.AbstractEventLoop:
+    """Process-wide event loop running in a daemon thread, started on first use."""
+    global _loop
+    with _loop_lock:
+        if _loop is None or _loop.is_closed():
+            _loop = asyncio.new_event_loop()
+            threading.Thread(target=_loop.run_forever, name="llm-client-loop", daemon=True).start()
+        return _loop
+
+
+def retry_after_seconds(error: Exception) -> Optional[float]:
+    """Server-requested wait from retry-after-ms / Retry-After (seconds or HTTP date), if any."""
+    response = getattr(error, 'response', None)
+    headers = getattr(response, 'headers', None)
+    if not headers:
+        return None
+    try:
+        if headers.get('retry-after-ms'):
+            return float(headers['retry-after-ms']) / 1000
+        value = headers.get('retry-after')
+        if not value:
+            return None
+        try:
+            return max(0.0, float(value))
+        except ValueError:
+            parsed = email.utils.parsedate_to_datetime(value)
+            return max(0.0, parsed.timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+class MinuteBudget:
+    """Sliding 60-second window of request and token spend.
+
+    `acquire` waits until one more request with the estimated token count fits
+    both limits (None = unlimited) and returns a handle; `settle` replaces the
+    estimate with the tokens the API actually billed. Only used on the client's
+    event loop, so it needs no lock.
+    """
+
+    WINDOW = 60.0
+
+    def __init__(self, requests_per_minute: Optional[int] = None, tokens_per_minute: Optional[int] = None):
+        self.requests_per_minute = requests_per_minute or None
+        self.tokens_per_minute = tokens_per_minute or None
+        self._spent: deque = deque()  # [timestamp, tokens] per request
+        self.waited = 0.0
+
+    def _expire(self, now: float):
+        while self._spent and now - self._spent[0][0] >= self.WINDOW:
+            self._spent.popleft()
+
+    def _delay(self, tokens: int, now: float) -> float:
+        self._expire(now)
+        delay = 0.0
+        if self.requests_per_minute and len(self._spent) >= self.requests_per_minute:
+            delay = self._spent[len(self._spent) - self.requests_per_minute][0] + self.WINDOW - now
+        if self.tokens_per_minute and self._spent:
+            # Wait for the oldest entries to expire until the new request fits
+            total = sum(entry[1] for entry in self._spent)
+            tokens = min(tokens, self.tokens_per_minute)
+            for stamp, spent in self._spent:
+                if total + tokens <= self.tokens_per_minute:
+                    break
+                total -= spent
+                delay = max(delay, stamp + self.WINDOW - now)
+        return delay
+
+    async def acquire(self, tokens: int) -> list:
+        while True:
+            now = time.monotonic()
+            delay = self._delay(tokens, now)
+            if delay <= 0:
+                entry = [now, tokens]
+                self._spent.append(entry)
+                return entry
+            self.waited += delay
+            await asyncio.sleep(delay)
+
+    @staticmethod
+    def settle(entry: list, tokens: int):
+        entry[1] = tokens
+
+    def usage(self) -> Dict[str, int]:
+        # Read-only snapshot, safe to take from another thread
+        now = time.monotonic()
+        recent = [entry for entry in tuple(self._spent) if now - entry[0] < self.WINDOW]
+        return {"requests": len(recent), "tokens": sum(entry[1] for entry in recent)}
+
+
+class LLMClient:
+    """Bounded-concurrency chat-completions client with retries and a per-minute budget.
+
+    Calls run on a shared background event loop through AsyncOpenAI; at most
+    `max_concurrency` are in flight, and new calls wait while the last minute's
+    requests or tokens would exceed the budget. Rate limits (429), timeouts,
+    connection errors and 5xx responses are retried up to `max_retries` times
+    with full-jitter exponential backoff, never sooner than the server's
+    Retry-After. Other errors are raised at once.
+
+    `complete` is the blocking entry point for the synchronous callers;
+    `complete_many` runs several requests concurrently. Use `shared` so every
+    NLPProcessor talking to one endpoint shares a single semaphore and budget.
+    """
+
+    _shared: Dict[Tuple[str, str], "LLMClient"] = {}
+    _shared_lock = threading.Lock()
+
+    def __init__(self, api_key: str, base_url: str, model: str, max_concurrency: int = 4,
+                 requests_per_minute: Optional[int] = None, tokens_per_minute: Optional[int] = None,
+                 max_retries: int = 5, backoff_base: float = 1.0, backoff_max: float = 60.0,
+                 timeout: float = 120.0):
+        self.model = model
+        self.max_concurrency = max(1, max_concurrency)
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.budget = MinuteBudget(requests_per_minute, tokens_per_minute)
+        self.loop = background_loop()
+        # The SDK's own retries are disabled; this class owns the retry policy
+        self._client = AsyncOpenAI(api_key=api_key, base_url=base_url, max_retries=0, timeout=timeout)
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self.retries = 0
+        self.failures = 0
+
+    @classmethod
+    def shared(cls, api_key: str, base_url: str, model: str) -> "LLMClient":
+        """Process-wide client for an endpoint, with limits from LLM_MAX_CONCURRENCY,
+        LLM_REQUESTS_PER_MINUTE and LLM_TOKENS_PER_MINUTE (unset = 4 / unlimited / unlimited)."""
+        with cls._shared_lock:
+            key = (base_url, api_key)
+            if key not in cls._shared:
+                cls._shared[key] = cls(
+                    api_key, base_url, model,
+                    max_concurrency=int(os.getenv("LLM_MAX_CONCURRENCY") or 4),
+                    requests_per_minute=int(os.getenv("LLM_REQUESTS_PER_MINUTE") or 0) or None,
+                    tokens_per_minute=int(os.getenv("LLM_TOKENS_PER_MINUTE") or 0) or None,
+                )
+            return cls._shared[key]
+
+    def _backoff(self, attempt: int, error: Exception) -> float:
+        delay = random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** attempt))
+        server_wait = retry_after_seconds(error)
+        return max(delay, server_wait) if server_wait is not None else delay
+
+    async def acomplete(self, messages: List[Dict[str, str]], **kwargs) -> Any:
+        """One chat completion (the SDK response object); retries transient failures."""
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        model = kwargs.pop('model', None) or self.model
+        estimate = sum(len(m.get('content') or '') for m in messages) // CHARS_PER_TOKEN + COMPLETION_RESERVE
+        attempt = 0
+        while True:
+            entry = await self.budget.acquire(estimate)
+            try:
+                async with self._semaphore:
+                    response = await self._client.chat.completions.create(
+                        model=model, messages=messages, **kwargs)
+            except _RETRYABLE as e:
+                if attempt >= self.max_retries:
+                    self.failures += 1
+                    raise
+                delay = self._backoff(attempt, e)
+                attempt += 1
+                self.retries += 1
+                print(f"[LLM Client] {type(e).__name__} - retry {attempt}/{self.max_retries} in {delay:.1f}s",
+                      file=sys.stderr, flush=True)
+                await asyncio.sleep(delay)
+                continue
+            except Exception:
+                self.failures += 1
+                raise
+            usage = getattr(response, 'usage', None)
+            if usage is not None and getattr(usage, 'total_tokens', None):
+                MinuteBudget.settle(entry, usage.total_tokens)
+            return response
+
+    def complete(self, messages: List[Dict[str, str]], **kwargs) -> Any:
+        """Blocking chat completion; raises the last error once retries are exhausted."""
+        return asyncio.run_coroutine_threadsafe(self.acomplete(messages, **kwargs), self.loop).result()
+
+    def complete_many(self, requests: List[Dict[str, Any]]) -> List[Tuple[Any, float]]:
+        """Run several requests (acomplete keyword arguments) concurrently.
+
+        Returns (response or the exception raised, seconds taken) per request, in order.
+        """
+        async def timed(request: Dict[str, Any]) -> Tuple[Any, float]:
+            started = time.time()
+            try:
+                return await self.acomplete(**request), time.time() - started
+            except Exception as e:
+                return e, time.time() - started
+
+        async def run_all():
+            return await asyncio.gather(*(timed(dict(r)) for r in requests))
+
+        return asyncio.run_coroutine_threadsafe(run_all(), self.loop).result()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "max_concurrency": self.max_concurrency,
+            "retries": self.retries,
+            "failures": self.failures,
+            "budget_wait_seconds": round(self.budget.waited, 2),
+            "last_minute": self.budget.usage(),
+        }
@@ -11,9 +11,11 @@ from .models import (
     ScrapingConfig, ScrapedItem, PredictionResult, ProcessingLog, PipelineStage, CleaningStats
 )
 from .scraper import Scraper
+from .checkpoint import config_fingerprint
 from .predictor import Predictor
 from .nlp import NLPProcessor
 from .data_loader import DataLoader
+from .gazetteer import EntityGazetteer
 
 # Load environment variables from .env file
 import sys
@@ -62,6 +64,7 @@ scraper = Scraper(data_loader=DataLoader())
 predictor = Predictor()
 nlp = NLPProcessor()
 data_loader = DataLoader()
+gazetteer = EntityGazetteer.from_data_loader(data_loader)
 scrape_stats: Optional[CleaningStats] = None
 
 def add_log(stage: PipelineStage, message: str, status: str = 'success'):
@@ -100,11 +103,13 @@ async def get_options():
     print(f"[OPTIONS] Returning {len(options.get('barrios', []))} barrios, {len(options.get('combos', []))} combos", flush=True)
     return options
 
-async def run_scraping_task():
+def run_scraping_task(resume: bool = False):
+    # Plain def: FastAPI runs it in the threadpool, so /api/status and /api/data
+    # stay responsive while items stream in.
     import sys
-    global current_stage, scraped_data
+    global current_stage, scraped_data, scrape_stats
     current_stage = PipelineStage.SCRAPING
-    add_log(PipelineStage.SCRAPING, "Starting scraping process...")
+    add_log(PipelineStage.SCRAPING, "Resuming scraping from last checkpoint..." if resume else "Starting scraping process...")
     
     print("[SCRAPING TASK] Task started", file=sys.stderr, flush=True)
     
@@ -119,12 +124,27 @@ async def run_scraping_task():
             print(f"[SCRAPER] Crimes: {current_config.target_crimes}", file=sys.stderr, flush=True)
             print("[SCRAPER] ========================================", file=sys.stderr, flush=True)
             
-            items, stats = scraper.scrape(current_config)
-            print(f"[SCRAPING TASK] Scraper returned {len(items)} items", file=sys.stderr, flush=True)
+            # Stream items into the live dataset as they pass the relevance threshold
+            items: List[ScrapedItem] = []
             scraped_data = items
+            scrape_stats = None
+            for item in scraper.iter_scrape(current_config, resume=resume):
+                items.append(item)
+            # Sort by AI relevance score and date once the run is complete
+            items.sort(key=lambda it: (it.relevance_score, it.date), reverse=True)
+            stats = scraper.last_stats
+            print(f"[SCRAPING TASK] Scraper returned {len(items)} items", file=sys.stderr, flush=True)
             scrape_stats = stats
             
             add_log(PipelineStage.SCRAPING, f"Scraped {len(items)} items. Filtered {stats.filtered_relevance} low relevance.")
+            host_report = scraper.last_host_report
+            if host_report:
+                tripped = [h for h, r in host_report.items() if r['state'] != 'closed']
+                failed = sum(r['failures'] for r in host_report.values())
+                add_log(PipelineStage.SCRAPING, f"Fetched from {len(host_report)} hosts: {failed} failed requests, {len(tripped)} circuit breakers open.")
+                for host in tripped:
+                    r = host_report[host]
+                    add_log(PipelineStage.SCRAPING, f"Circuit open for {host}: {r['failures']} failures ({r['last_error']}), {r['skipped']} URLs skipped.", 'error')
             # Try to capture spider errors if available
             try:
                 from .spiders.sentinela_news import NewsSpider
@@ -154,6 +174,24 @@ async def start_scraping(background_tasks: BackgroundTasks):
     background_tasks.add_task(run_scraping_task)
     return {"status": "started"}
 
+@app.get("/api/scrape/checkpoint")
+async def get_scrape_checkpoint():
+    """Progress saved by an interrupted scraping run, if any"""
+    return scraper.checkpoint.summary()
+
+@app.post("/api/scrape/resume")
+async def resume_scraping(background_tasks: BackgroundTasks):
+    """Continue an interrupted scraping run from its last checkpoint"""
+    global current_config
+    saved_config = scraper.checkpoint.saved_config()
+    if saved_config is None:
+        raise HTTPException(status_code=404, detail="No scraping checkpoint to resume.")
+    if current_config is None or config_fingerprint(current_config) != config_fingerprint(saved_config):
+        # Process restarted (or config changed) since the run began: continue the checkpointed run as it was
+        current_config = saved_config
+    background_tasks.add_task(run_scraping_task, True)
+    return {"status": "started"}
+
 @app.post("/api/reset")
 async def reset_pipeline():
     """Reset the entire pipeline state"""
@@ -183,14 +221,18 @@ async def debug_config():
 @app.get("/api/status")
 async def get_status():
     print(f"[STATUS] Current stage: {current_stage}, Has result: {prediction_result is not None}", flush=True)
-    return {
+    status = {
         "stage": current_stage,
         "logs": logs
     }
+    if current_stage == PipelineStage.SCRAPING and scraper.progress:
+        status["progress"] = {**scraper.progress, "items": len(scraped_data)}
+    return status
 
 @app.get("/api/data")
 async def get_data():
-    return scraped_data
+    # Copy: the scraping thread may still be appending
+    return list(scraped_data)
 
 async def run_training_task():
     global current_stage, prediction_result, current_config
@@ -412,6 +454,11 @@ async def nlp_status():
 async def get_scrape_stats():
     return scrape_stats
 
+@app.get("/api/scrape-stats/history")
+async def get_scrape_stats_history(limit: int = 20):
+    """Instrumentation of the most recent scraping runs, newest first"""
+    return scraper.run_log.recent(limit)
+
 # --- New MLOps Endpoints ---
 
 @app.post("/api/upload/data")
@@ -475,7 +522,9 @@ async def upload_data(file: UploadFile = File(...), forecast_horizon: int = Form
                     headline=str(headline),
                     snippet=str(snippet_text),
                     relevance_score=float(relevance),
-                    url=str(url)
+                    url=str(url),
+                    # Organizations, combos and locations from the combos_v2.csv gazetteer
+                    extracted_metadata=gazetteer.extract(f"{headline}. {snippet_text}")
                 )
                 items.append(item)
             except Exception as row_error:
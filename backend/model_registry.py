@@ -0,0 +1,102 @@
+import os
+import json
+import hashlib
+import threading
+from typing import Any, Dict, Optional, Tuple
+
+import joblib
+
+
+def file_digest(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class ModelRegistry:
+    """In-memory copy of the trained estimator and its metadata, reloaded only when the files change.
+
+    Every `get` stats both files; an unchanged (mtime, size) serves the cached
+    objects. When the stat changes the model file's content hash is compared
+    first, so a file rewritten with identical bytes is not deserialized
+    again. Loads happen under a lock: concurrent requests after a change wait
+    for a single load instead of each reading the file. `prime` installs an
+    estimator that was just trained and saved, so the next request does not
+    read it back from disk.
+    """
+
+    def __init__(self, model_path: str, metadata_path: Optional[str] = None):
+        self.model_path = model_path
+        self.metadata_path = metadata_path or model_path.replace('.joblib', '_metadata.json')
+        self._lock = threading.Lock()
+        self._model: Any = None
+        self._model_stat: Optional[Tuple[int, int]] = None
+        self._model_digest: Optional[str] = None
+        self._metadata: Dict[str, Any] = {}
+        self._metadata_stat: Optional[Tuple[int, int]] = None
+        self.loads = 0
+        self.hits = 0
+
+    @staticmethod
+    def _stat(path: str) -> Optional[Tuple[int, int]]:
+        try:
+            st = os.stat(path)
+        except FileNotFoundError:
+            return None
+        return st.st_mtime_ns, st.st_size
+
+    def get(self) -> Tuple[Any, Dict[str, Any]]:
+        """(estimator, training metadata); raises FileNotFoundError if no model has been saved."""
+        model_stat = self._stat(self.model_path)
+        if model_stat is None:
+            raise FileNotFoundError("No trained model found. Please run the training pipeline first.")
+        metadata_stat = self._stat(self.metadata_path)
+        with self._lock:
+            if model_stat != self._model_stat:
+                digest = file_digest(self.model_path)
+                if digest != self._model_digest or self._model is None:
+                    self._model = joblib.load(self.model_path)
+                    self._model_digest = digest
+                    self.loads += 1
+                    print(f"[ModelRegistry] Model loaded from {self.model_path}", flush=True)
+                self._model_stat = model_stat
+            else:
+                self.hits += 1
+            if metadata_stat != self._metadata_stat:
+                self._metadata = self._read_metadata()
+                self._metadata_stat = metadata_stat
+            return self._model, self._metadata
+
+    def _read_metadata(self) -> Dict[str, Any]:
+        if not os.path.exists(self.metadata_path):
+            return {}
+        try:
+            with open(self.metadata_path, 'r') as f:
+                metadata = json.load(f)
+            print(f"[ModelRegistry] Model metadata loaded from {self.metadata_path}", flush=True)
+            return metadata if isinstance(metadata, dict) else {}
+        except Exception as e:
+            print(f"[ModelRegistry] Warning: Failed to load metadata: {e}", flush=True)
+            return {}
+
+    def prime(self, model: Any):
+        """Make `model`, already saved to model_path, the active estimator without reloading it."""
+        model_stat = self._stat(self.model_path)
+        if model_stat is None:
+            return
+        digest = file_digest(self.model_path)
+        with self._lock:
+            self._model = model
+            self._model_stat = model_stat
+            self._model_digest = digest
+
+    def invalidate(self):
+        with self._lock:
+            self._model = None
+            self._model_stat = self._model_digest = None
+            self._metadata, self._metadata_stat = {}, None
+
+    def stats(self) -> Dict[str, Any]:
+        return {"loads": self.loads, "hits": self.hits, "loaded": self._model is not None}
@@ -1,5 +1,5 @@
 from pydantic import BaseModel
-from typing import List, Optional, Dict, Tuple, Any
+from typing import List, Optional, Dict, Tuple, Any, Literal
 from enum import Enum
 
 class CriminalRank(str, Enum):
@@ -43,6 +43,20 @@ class ScrapingConfig(BaseModel):
     granularity: str = 'W' # 'D' (Daily), 'W' (Weekly), 'M' (Monthly)
     max_scraping_time_minutes: Optional[int] = None  # None = sin límite de tiempo
     max_articles: Optional[int] = None  # None = sin límite de artículos
+    max_concurrent_fetches: int = 8  # Descargas simultáneas en total
+    max_fetches_per_host: int = 2  # Descargas simultáneas por dominio
+    per_host_rate_limit: float = 1.0  # Peticiones por segundo por dominio (0 = sin límite)
+    circuit_breaker_threshold: int = 3  # Fallos consecutivos antes de pausar un dominio
+    use_http_cache: bool = True  # Reutilizar páginas ya descargadas (backend/data/http_cache)
+    incremental: bool = False  # Solo procesar URLs nuevas y fusionar con las ya extraídas (backend/data/frontier.sqlite)
+    html_parse_workers: int = 2  # Procesos dedicados a parsear HTML (0 = en el mismo hilo)
+    html_engine: Literal['auto', 'selectolax', 'lxml', 'bs4'] = 'auto'  # Motor de parseo HTML (auto = el más rápido instalado)
+    use_llm_cache: bool = True  # Reutilizar extracciones del LLM para contenido idéntico (backend/data/llm_extraction_cache.sqlite)
+    llm_batch_size: int = 6  # Artículos por llamada al LLM (1 = una llamada por artículo)
+    use_prefilter: bool = True  # Descartar localmente páginas claramente irrelevantes antes del LLM
+    max_concurrent_searches: int = 8  # Búsquedas web simultáneas
+    use_search_cache: bool = True  # Reutilizar resultados de búsqueda del mismo día (backend/data/search_cache.sqlite)
+    refresh_query_plan: bool = False  # Pedir al LLM un plan de búsquedas nuevo aunque haya uno guardado para esta configuración
 
 class ScrapedItem(BaseModel):
     id: str
@@ -70,6 +84,7 @@ class CleaningStats(BaseModel):
     filtered_date: int
     duplicates_removed: int
     final_count: int
+    metrics: Optional[Dict[str, Any]] = None  # Instrumentation of the scraping run (ScrapeMetrics.snapshot)
 
 class ModelMetadata(BaseModel):
     regressors: List[str] = []  # Make optional with default
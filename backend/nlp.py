@@ -1,7 +1,49 @@
 import os
-from openai import OpenAI
-from typing import Dict, Any, List
+import time
+import hashlib
+from typing import Dict, Any, Iterator, List
 import requests
+from concurrent.futures import ThreadPoolExecutor
+
+from .llm_client import LLMClient
+from .checkpoint import config_fingerprint
+from .prefilter import stems
+
+# Batched extraction: rough input-token estimate and per-prompt limits
+CHARS_PER_TOKEN = 4
+BATCH_TOKEN_BUDGET = 12000
+BATCH_MAX_ARTICLES = 6
+
+# Query plans whose stem sets overlap at least this much are the same search
+QUERY_SIMILARITY = 0.8
+_QUERY_STOPWORDS = {'de', 'del', 'la', 'las', 'el', 'los', 'en', 'y', 'a', 'por', 'con', 'para', 'sobre'}
+
+
+def query_terms(query: str) -> frozenset:
+    """Accent-folded word stems of a query, without stopwords: 'Capturas en Itagüí' -> {'captur', 'itagui'}."""
+    return frozenset(stem for stem in stems(query) if stem not in _QUERY_STOPWORDS)
+
+
+def collapse_similar_queries(queries: List[str], threshold: float = QUERY_SIMILARITY) -> List[str]:
+    """Drop queries whose term set has Jaccard similarity >= `threshold` with an earlier one.
+
+    Queries naming different numbers (years, comunas) are never merged, so
+    per-year queries survive even when the rest of the wording is identical.
+    """
+    kept: List[tuple] = []
+    for query in queries:
+        if not isinstance(query, str) or not query.strip():
+            continue
+        terms = query_terms(query)
+        numbers = {t for t in terms if t.isdigit()}
+        duplicate = False
+        for _, other, other_numbers in kept:
+            if numbers == other_numbers and len(terms & other) >= threshold * len(terms | other):
+                duplicate = True
+                break
+        if not duplicate:
+            kept.append((query, terms, numbers))
+    return [query for query, _, _ in kept]
 
 class NLPProcessor:
     def __init__(self):
@@ -20,9 +62,11 @@ class NLPProcessor:
         
         if api_key:
             try:
-                self.client = OpenAI(api_key=api_key, base_url="https://api.deepseek.com/v1")
+                # Shared across processors: one concurrency cap, retry policy and per-minute budget per endpoint
+                self.client = LLMClient.shared(api_key, "https://api.deepseek.com/v1", "deepseek-chat")
                 self.model = "deepseek-chat"
-                print("[NLP INIT] ✓ DeepSeek model initialized successfully", file=sys.stderr, flush=True)
+                print(f"[NLP INIT] ✓ DeepSeek model initialized successfully "
+                      f"(max {self.client.max_concurrency} concurrent calls)", file=sys.stderr, flush=True)
             except Exception as e:
                 print(f"[NLP INIT] ✗ Failed to initialize DeepSeek: {e}", file=sys.stderr, flush=True)
                 self.client = None
@@ -37,12 +81,62 @@ class NLPProcessor:
         self.pplx_endpoint = "https://api.perplexity.ai/chat/completions"
         self.pplx_model = "sonar-pro"
         self.barrio_keywords: List[str] = []
+        # Optional ScrapeMetrics receiving latency and token usage of every call
+        self.metrics = None
+        # Optional HtmlParserPool used by the non-LLM extraction fallback
+        self.html_parser = None
+        # Optional ExtractionCache: identical content + keyword set skips the LLM call
+        self.extraction_cache = None
+        # Optional SearchCache: the same query on the same day reuses the citation list
+        self.search_cache = None
+        # Optional KVCache of LLM query plans by config fingerprint; where the last plan came from
+        self.query_plan_cache = None
+        self.query_plan_source: str | None = None
+
+    def _record_llm(self, kind: str, started: float, usage: Any = None, error: bool = False):
+        if self.metrics is None:
+            return
+        if isinstance(usage, dict):
+            prompt_tokens, completion_tokens = usage.get('prompt_tokens', 0), usage.get('completion_tokens', 0)
+        else:
+            prompt_tokens, completion_tokens = getattr(usage, 'prompt_tokens', 0), getattr(usage, 'completion_tokens', 0)
+        self.metrics.record_llm(kind, time.time() - started, prompt_tokens or 0, completion_tokens or 0, error)
 
     def set_barrio_keywords(self, barrios: List[str]):
         self.barrio_keywords = barrios or []
 
-    def build_search_queries(self, config) -> list[str]:
-        """AI Agent: Construct intelligent search queries from user config."""
+    def query_plan_key(self, config) -> str:
+        """Fingerprint of what the query prompt is built from: the query config fields, barrios and year."""
+        import datetime
+        barrios = '\x1f'.join(self.barrio_keywords or [])
+        digest = hashlib.sha1(barrios.encode('utf-8')).hexdigest()[:16]
+        return f"{config_fingerprint(config)}:{digest}:{datetime.datetime.now().year}"
+
+    def build_search_queries(self, config, refresh: bool = False) -> list[str]:
+        """Search queries for `config`, reusing the plan the LLM made for the same config unless `refresh`.
+
+        Only LLM-generated plans are cached; the fallbacks are cheap to rebuild
+        and a failed call should be retried next time.
+        """
+        import sys
+        key = self.query_plan_key(config) if self.client and self.query_plan_cache is not None else None
+        if key and not refresh:
+            cached = self.query_plan_cache.get(key)
+            if cached:
+                self.query_plan_source = 'cached'
+                print(f"[AI Query Builder] ✓ Reusing cached plan of {len(cached)} queries", file=sys.stderr, flush=True)
+                return list(cached)
+        queries, planned = self._generate_search_queries(config)
+        self.query_plan_source = 'llm' if planned else 'fallback'
+        if key and planned and queries:
+            self.query_plan_cache.set(key, queries)
+        return queries
+
+    def _generate_search_queries(self, config) -> tuple[list[str], bool]:
+        """AI Agent: Construct intelligent search queries from user config.
+
+        Returns (queries, whether the LLM planned them).
+        """
         import sys
         print(f"[AI Query Builder] Input config - orgs: {config.target_organizations}, events: {config.predictor_events}, crimes: {config.target_crimes}", file=sys.stderr, flush=True)
         
@@ -64,7 +158,7 @@ class NLPProcessor:
                         queries.append(f'"{crime}" "{b}" Medellín {current_year}')
                 queries.append(f'"{crime}" Valle de Aburrá {start_year}-{current_year}')
             print(f"[AI Query Builder] Generated {len(queries)} fallback queries: {queries}", file=sys.stderr, flush=True)
-            return queries[:8] if queries else ['Medellín noticias judiciales']
+            return (queries[:8] if queries else ['Medellín noticias judiciales']), False
         
         try:
             # Build keyword strings - use actual values
@@ -108,14 +202,15 @@ Return ONLY a JSON array of query strings, no explanation.
 Example: ["Captura cabecilla Clan del Golfo Medellín 2023", "Homicidios Valle de Aburrá {year_range}", "Extorsión Bello 2024", "Capturas Itagüí {start_year}"]"""
 
             print(f"[AI Query Builder] Sending prompt to DeepSeek...", file=sys.stderr, flush=True)
-            response = self.client.chat.completions.create(
-                model=self.model,  # type: ignore
-                messages=[
+            started = time.time()
+            response = self.client.complete(
+                [
                     {"role": "system", "content": "You are a helpful assistant that generates search queries in JSON format."},
                     {"role": "user", "content": prompt}
                 ],
                 temperature=0.7
             )
+            self._record_llm('query_plan', started, response.usage)
             text = (response.choices[0].message.content or "").strip()
             print(f"[AI Query Builder] DeepSeek response: {text[:300]}", file=sys.stderr, flush=True)
             
@@ -124,11 +219,13 @@ Example: ["Captura cabecilla Clan del Golfo Medellín 2023", "Homicidios Valle d
             import re
             match = re.search(r'\[.*\]', text, re.DOTALL)
             if match:
-                queries = json.loads(match.group(0))
-                print(f"[AI Query Builder] ✓ Generated {len(queries)} AI queries:", file=sys.stderr, flush=True)
+                generated = json.loads(match.group(0))
+                queries = collapse_similar_queries(generated)
+                print(f"[AI Query Builder] ✓ Generated {len(generated)} AI queries, "
+                      f"{len(generated) - len(queries)} near-duplicates collapsed:", file=sys.stderr, flush=True)
                 for i, q in enumerate(queries[:5], 1):
                     print(f"    {i}. {q}", file=sys.stderr, flush=True)
-                return queries
+                return queries, True
             print(f"[AI Query Builder] Failed to parse JSON, using first line", file=sys.stderr, flush=True)
             # Post-processing: Ensure year coverage
             try:
@@ -159,11 +256,12 @@ Example: ["Captura cabecilla Clan del Golfo Medellín 2023", "Homicidios Valle d
                 print(f"[AI Query Builder] Date range processing error: {e}", file=sys.stderr, flush=True)
 
             # BALANCED INTERLEAVING: Classify and interleave queries to ensure balance
+            queries = collapse_similar_queries(queries)
             print(f"[AI Query Builder] Balancing queries (TRIGGER vs CRIME_STAT)...", file=sys.stderr, flush=True)
             queries = self._interleave_queries(queries, config)
             print(f"[AI Query Builder] Final query order (first 10): {queries[:10]}", file=sys.stderr, flush=True)
 
-            return queries
+            return queries, True
         except Exception as e:
             print(f"Query builder error: {e}", file=sys.stderr, flush=True)
             # Better fallback using actual config values
@@ -174,12 +272,10 @@ Example: ["Captura cabecilla Clan del Golfo Medellín 2023", "Homicidios Valle d
                 for event in (config.predictor_events or ['captura'])[:2]:
                     fallback_queries.append(f'{event} {group} Medellín')
             print(f"[AI Query Builder] Exception fallback: {fallback_queries}", file=sys.stderr, flush=True)
-            return fallback_queries if fallback_queries else ['captura Medellín']
+            return (fallback_queries if fallback_queries else ['captura Medellín']), False
 
-    def _interleave_queries(self, queries: list[str], config) -> list[str]:
-        """Classify queries as TRIGGER or CRIME_STAT and interleave them for balanced scraping."""
-        import sys
-        
+    def _query_keywords(self, config) -> tuple[set, set]:
+        """Keyword sets used to tell trigger-oriented queries from crime-stat ones."""
         trigger_keywords = set()
         crime_keywords = set()
         
@@ -199,6 +295,27 @@ Example: ["Captura cabecilla Clan del Golfo Medellín 2023", "Homicidios Valle d
         # Add common crime words
         crime_keywords.update(['homicidio', 'asesinato', 'extorsión', 'hurto', 'robo', 
                                'secuestro', 'aumento', 'estadística', 'cifras', 'casos'])
+        return trigger_keywords, crime_keywords
+
+    def classify_query(self, query: str, config, keywords: tuple[set, set] | None = None) -> str:
+        """Return 'TRIGGER', 'CRIME_STAT' or 'AMBIGUOUS' for a search query."""
+        trigger_keywords, crime_keywords = keywords or self._query_keywords(config)
+        query_lower = query.lower()
+        
+        has_trigger = any(kw in query_lower for kw in trigger_keywords)
+        has_crime = any(kw in query_lower for kw in crime_keywords)
+        
+        if has_trigger and not has_crime:
+            return 'TRIGGER'
+        if has_crime and not has_trigger:
+            return 'CRIME_STAT'
+        return 'AMBIGUOUS'
+
+    def _interleave_queries(self, queries: list[str], config) -> list[str]:
+        """Classify queries as TRIGGER or CRIME_STAT and interleave them for balanced scraping."""
+        import sys
+        
+        keywords = self._query_keywords(config)
         
         # Classify queries
         trigger_queries = []
@@ -206,14 +323,10 @@ Example: ["Captura cabecilla Clan del Golfo Medellín 2023", "Homicidios Valle d
         ambiguous_queries = []
         
         for query in queries:
-            query_lower = query.lower()
-            
-            has_trigger = any(kw in query_lower for kw in trigger_keywords)
-            has_crime = any(kw in query_lower for kw in crime_keywords)
-            
-            if has_trigger and not has_crime:
+            kind = self.classify_query(query, config, keywords)
+            if kind == 'TRIGGER':
                 trigger_queries.append(query)
-            elif has_crime and not has_trigger:
+            elif kind == 'CRIME_STAT':
                 crime_queries.append(query)
             else:
                 # Ambiguous or neither - distribute evenly
@@ -237,39 +350,87 @@ Example: ["Captura cabecilla Clan del Golfo Medellín 2023", "Homicidios Valle d
         print(f"[Query Balancing] Interleaved {len(interleaved)} queries (T-C-T-C pattern)", file=sys.stderr, flush=True)
         return interleaved
 
-    def extract_article_data(self, html: str, url: str, config) -> Dict[str, Any]:
-        """AI Agent: Extract structured data from article HTML and score relevance."""
-        import sys
-        
-        if not self.client:
-            from bs4 import BeautifulSoup
-            soup = BeautifulSoup(html, 'html.parser')
-            title = soup.find('h1')
-            p = soup.find('p')
-            print(f"[AI Extract] No client, using fallback for {url}", file=sys.stderr, flush=True)
+    def _fallback_extract(self, html: str, parsed, relevance: float) -> Dict[str, Any]:
+        """Non-LLM extraction from the parsed page (parsed in the worker pool when available)."""
+        if parsed is None:
+            if self.html_parser is not None:
+                parsed = self.html_parser.article(html, stop_early=True)
+            else:
+                from .html_parse import parse_article_html
+                parsed = parse_article_html(html, stop_early=True)
+        elif not isinstance(parsed, dict):
+            parsed = parsed.result()
+        result = {
+            'headline': parsed['h1'],
+            'snippet': parsed['first_paragraph'][:200],
+            'relevance': relevance,
+            'type': 'TRIGGER_EVENT'
+        }
+        if parsed.get('date'):
+            result['date'] = parsed['date']
+        return result
+
+    def _main_content(self, html: str, parsed) -> Dict[str, Any] | None:
+        """Boilerplate-free article text and metadata for the prompt (None if the page cannot be parsed)."""
+        try:
+            if parsed is not None and not isinstance(parsed, dict):
+                parsed = parsed.result()
+            if parsed is None or 'main_text' not in parsed:
+                if self.html_parser is not None:
+                    parsed = self.html_parser.article(html, main_content=True)
+                else:
+                    from .html_parse import parse_article_html
+                    parsed = parse_article_html(html, main_content=True)
+            return parsed
+        except Exception as e:
+            import sys
+            print(f"[AI Extract] Main-content extraction failed: {e}", file=sys.stderr, flush=True)
+            return None
+
+    def _extraction_keywords(self, config) -> List[str]:
+        return (
+            (config.target_organizations or []) +
+            (config.local_combos or [])[:5] +
+            (config.predictor_events or []) +
+            (config.predictor_ranks or []) +
+            (config.target_crimes or [])
+        )
+
+    def _article_input(self, html: str, url: str, parsed) -> Dict[str, Any]:
+        """Prompt section, date rule and cache content for one article."""
+        content = self._main_content(html, parsed)
+        if content and content.get('main_text'):
             return {
-                'headline': title.get_text(strip=True) if title else '',
-                'snippet': p.get_text(strip=True)[:200] if p else '',
-                'relevance': 0.5,
-                'type': 'TRIGGER_EVENT'
+                'main_text': True,
+                'method': content.get('content_method'),
+                'date_rule': "Use the pre-extracted published date if present. Otherwise parse it from the text. As a last resort, use today's date.",
+                'section': f"""**Pre-extracted metadata:**
+- URL: {url}
+- Title: {content.get('title') or 'not found'}
+- Published date: {content.get('date') or 'not found'}
+- Description: {content.get('description') or 'not found'}
+
+**Article text:**
+{content['main_text']}""",
+                'cache_content': '\n'.join([content.get('title') or '', content.get('date') or '',
+                                            content.get('description') or '', content['main_text']]),
             }
-        
-        try:
-            keywords = ', '.join(
-                (config.target_organizations or []) +
-                (config.local_combos or [])[:5] +
-                (config.predictor_events or []) +
-                (config.predictor_ranks or []) +
-                (config.target_crimes or [])
-            )
-            
-            prompt = f"""You are an expert intelligence analyst specializing in Colombian crime news. Extract structured data from the provided HTML article. Your output MUST be a single, valid JSON object and nothing else.
+        return {
+            'main_text': False,
+            'method': 'raw html',
+            'date_rule': "Prioritize metadata tags like `<time datetime=\"...\">` or `article:published_time`. If no metadata is found, parse it from the text. As a last resort, use today's date.",
+            'section': f"""**HTML Content (first 15,000 chars):**
+{html[:15000]}""",
+            'cache_content': html[:15000],
+        }
 
-**Extraction Schema:**
+    @staticmethod
+    def _extraction_schema(keywords: str, date_rule: str) -> str:
+        return f"""**Extraction Schema:**
 
 1.  **headline**: The main, clean headline of the article.
 2.  **snippet**: A concise 2-3 sentence summary of the article's key information.
-3.  **date**: The publication date in strict "YYYY-MM-DD" format. Prioritize metadata tags like `<time datetime="...">` or `article:published_time`. If no metadata is found, parse it from the text. As a last resort, use today's date.
+3.  **date**: The publication date in strict "YYYY-MM-DD" format. {date_rule}
 4.  **relevance**: A relevance score from 0.0 to 1.0. This score must reflect how closely the article matches the following high-value keywords: **{keywords}**. A high score (0.7-1.0) should be reserved for articles detailing direct actions against these specific groups or crimes. A low score (< 0.2) should be for unrelated news.
 5.  **type**: Classify the article's primary focus. This is EXTREMELY CRITICAL for model causality.
     *   Use **"TRIGGER_EVENT"** ONLY for PROACTIVE STATE ACTIONS or CRIMINAL STRUCTURE CHANGES:
@@ -289,41 +450,222 @@ Example: ["Captura cabecilla Clan del Golfo Medellín 2023", "Homicidios Valle d
 6.  **extracted_metadata**: A nested JSON object containing extracted entities.
     *   **crime_type**: The specific crime mentioned (e.g., Homicide, Extortion, Drug Trafficking, Kidnapping). If multiple, list the primary one. Default to "Unknown" if none are clearly stated.
     *   **organization**: The specific criminal organization mentioned (e.g., Clan del Golfo, La Oficina, Los Chatas). Default to "Unknown".
-    *   **locations**: A JSON array of strings listing all neighborhoods (comunas, barrios) or municipalities mentioned.
+    *   **locations**: A JSON array of strings listing all neighborhoods (comunas, barrios) or municipalities mentioned."""
 
-**HTML Content (first 15,000 chars):**
-{html[:15000]}"""
-            print(f"[AI Extract] Calling DeepSeek for {url[:50]}...", file=sys.stderr, flush=True)
+    @staticmethod
+    def _parse_json_response(text: str) -> Any:
+        import json
+        import re
+        # Clean markdown code fences if present
+        text = re.sub(r'^```json\s*|\s*```$', '', text.strip(), flags=re.MULTILINE)
+        return json.loads(text)
+
+    def extract_article_data(self, html: str, url: str, config, parsed=None) -> Dict[str, Any]:
+        """AI Agent: Extract structured data from article HTML and score relevance.
+
+        `parsed` is the page's parse_article_html record (or a PendingParse for it),
+        ideally with main_content. The model gets the compact main text plus
+        pre-extracted metadata; raw HTML is only sent if the page cannot be parsed.
+        """
+        import sys
+        
+        if not self.client:
+            print(f"[AI Extract] No client, using fallback for {url}", file=sys.stderr, flush=True)
+            return self._fallback_extract(html, parsed, 0.5)
+        
+        started = response = None
+        try:
+            keyword_list = self._extraction_keywords(config)
+            keywords = ', '.join(keyword_list)
+            article = self._article_input(html, url, parsed)
+            source_desc = ("the provided article text (page navigation and scripts already removed) and its pre-extracted metadata"
+                           if article['main_text'] else "the provided HTML article")
+
+            cache_key = None
+            if self.extraction_cache is not None:
+                cache_key = self.extraction_cache.key(article['cache_content'], keyword_list)
+                cached = self.extraction_cache.get(cache_key)
+                if cached is not None:
+                    print(f"[AI Extract] ✓ Cache hit for {url[:50]} - Relevance: {cached.get('relevance', 0):.2f}", file=sys.stderr, flush=True)
+                    return cached
+
+            prompt = f"""You are an expert intelligence analyst specializing in Colombian crime news. Extract structured data from {source_desc}. Your output MUST be a single, valid JSON object and nothing else.
+
+{self._extraction_schema(keywords, article['date_rule'])}
+
+{article['section']}"""
+            print(f"[AI Extract] Calling DeepSeek for {url[:50]}... (prompt {len(prompt)} chars, "
+                  f"content: {article['method']})", file=sys.stderr, flush=True)
             
-            response = self.client.chat.completions.create(
-                model=self.model,  # type: ignore
-                messages=[
-                    {"role": "system", "content": "You are a helpful assistant that extracts structured data from HTML in JSON format."},
+            started = time.time()
+            response = self.client.complete(
+                [
+                    {"role": "system", "content": "You are a helpful assistant that extracts structured data from news articles in JSON format."},
                     {"role": "user", "content": prompt}
                 ],
                 temperature=0.3
             )
+            self._record_llm('extract', started, response.usage)
             text = (response.choices[0].message.content or "").strip()
             print(f"[AI Extract] Response: {text[:200]}", file=sys.stderr, flush=True)
-            import json
-            import re
-            # Clean markdown code fences if present
-            text = re.sub(r'^```json\s*|\s*```$', '', text, flags=re.MULTILINE)
-            result = json.loads(text)
+            result = self._parse_json_response(text)
             print(f"[AI Extract] ✓ Parsed - Relevance: {result.get('relevance', 0):.2f}, Title: {result.get('headline', '')[:60]}", file=sys.stderr, flush=True)
+            if cache_key:
+                usage = response.usage
+                tokens = (getattr(usage, 'prompt_tokens', 0) or 0) + (getattr(usage, 'completion_tokens', 0) or 0)
+                self.extraction_cache.put(cache_key, result, tokens, time.time() - started)
             return result
         except Exception as e:
             print(f"[AI Extract] ✗ Error for {url}: {e}", file=sys.stderr, flush=True)
-            from bs4 import BeautifulSoup
-            soup = BeautifulSoup(html, 'html.parser')
-            title = soup.find('h1')
-            p = soup.find('p')
-            return {
-                'headline': title.get_text(strip=True) if title else '',
-                'snippet': p.get_text(strip=True)[:200] if p else '',
-                'relevance': 0.3,
-                'type': 'TRIGGER_EVENT'
-            }
+            if started is not None and response is None:
+                self._record_llm('extract', started, error=True)
+            return self._fallback_extract(html, parsed, 0.3)
+
+    def extract_articles_batch(self, pages: List[tuple], config, token_budget: int = BATCH_TOKEN_BUDGET,
+                               max_articles: int = BATCH_MAX_ARTICLES) -> List[Dict[str, Any]]:
+        """Extract several articles with as few LLM calls as possible.
+
+        `pages` is a list of (html, url, parsed) tuples; the result list matches
+        it item for item. Cache hits are answered directly, the remaining main
+        texts are packed into prompts of at most `max_articles` articles and
+        about `token_budget` estimated input tokens, and the model returns a JSON
+        array in the single-article schema. Articles without main text, and any
+        batch whose response is malformed or incomplete, go through
+        extract_article_data one by one. Prompts run concurrently, up to the
+        LLM client's concurrency cap.
+        """
+        import sys
+
+        if not self.client:
+            return [self.extract_article_data(html, url, config, parsed=parsed) for html, url, parsed in pages]
+
+        results: List[Dict[str, Any] | None] = [None] * len(pages)
+        keyword_list = self._extraction_keywords(config)
+        keywords = ', '.join(keyword_list)
+        pending, singles = [], []
+        for i, (html, url, parsed) in enumerate(pages):
+            article = self._article_input(html, url, parsed)
+            if not article['main_text'] or max_articles < 2:
+                singles.append(i)
+                continue
+            if self.extraction_cache is not None:
+                article['cache_key'] = self.extraction_cache.key(article['cache_content'], keyword_list)
+                cached = self.extraction_cache.get(article['cache_key'])
+                if cached is not None:
+                    print(f"[AI Extract] ✓ Cache hit for {url[:50]} - Relevance: {cached.get('relevance', 0):.2f}", file=sys.stderr, flush=True)
+                    results[i] = cached
+                    continue
+            pending.append((i, article))
+
+        # Greedy packing in input order; then, walking back from the last prompt, articles move from the
+        # end of one prompt to the start of the next while that evens out the counts and still fits the
+        # limits, so no prompt is left with a lone straggler and none goes over the token budget
+        batches: List[List[tuple]] = []
+        batch_tokens: List[int] = []
+        for entry in pending:
+            tokens = len(entry[1]['section']) // CHARS_PER_TOKEN
+            if not batches or batch_tokens[-1] + tokens > token_budget or len(batches[-1]) >= max_articles:
+                batches.append([])
+                batch_tokens.append(0)
+            batches[-1].append(entry)
+            batch_tokens[-1] += tokens
+        for k in range(len(batches) - 1, 0, -1):
+            source, target = batches[k - 1], batches[k]
+            while len(source) > len(target) + 1 and len(target) < max_articles:
+                tokens = len(source[-1][1]['section']) // CHARS_PER_TOKEN
+                if batch_tokens[k] + tokens > token_budget:
+                    break
+                target.insert(0, source.pop())
+                batch_tokens[k - 1] -= tokens
+                batch_tokens[k] += tokens
+        packed = [batch for batch in batches if len(batch) > 1]
+        singles.extend(batch[0][0] for batch in batches if len(batch) == 1)
+
+        if packed:
+            print(f"[AI Extract] Calling DeepSeek for {sum(map(len, packed))} articles in {len(packed)} batch prompts...", file=sys.stderr, flush=True)
+            replies = self.client.complete_many(
+                [{'messages': self._batch_messages(batch, keywords), 'temperature': 0.3} for batch in packed]
+            )
+            for batch, (response, latency) in zip(packed, replies):
+                extracted = self._parse_batch_response(response, batch, latency)
+                for n, (i, article) in enumerate(batch):
+                    if extracted is None or extracted[n] is None:
+                        singles.append(i)
+                        continue
+                    result, tokens, share = extracted[n]
+                    if article.get('cache_key'):
+                        self.extraction_cache.put(article['cache_key'], result, tokens, share)
+                    results[i] = result
+
+        if singles:
+            # extract_article_data blocks on the shared client, so a thread per call lets them overlap
+            with ThreadPoolExecutor(max_workers=min(len(singles), self.client.max_concurrency)) as pool:
+                extracted_singly = pool.map(lambda i: self.extract_article_data(pages[i][0], pages[i][1], config, parsed=pages[i][2]),
+                                            singles)
+                for i, result in zip(singles, extracted_singly):
+                    results[i] = result
+        return results  # type: ignore[return-value]
+
+    def _batch_messages(self, batch: List[tuple], keywords: str) -> List[Dict[str, str]]:
+        sections = '\n\n'.join(
+            f"### ARTICLE {n} ###\n{article['section']}" for n, (_, article) in enumerate(batch, 1)
+        )
+        prompt = f"""You are an expert intelligence analyst specializing in Colombian crime news. Below are {len(batch)} articles, each given as article text (page navigation and scripts already removed) and its pre-extracted metadata, separated by "### ARTICLE n ###" markers. Extract structured data from EACH article independently. Your output MUST be a single, valid JSON array of exactly {len(batch)} objects, one per article in the same order, and nothing else. Add an **index** field to every object with the article's number n.
+
+{self._extraction_schema(keywords, batch[0][1]['date_rule'])}
+
+{sections}"""
+        return [
+            {"role": "system", "content": "You are a helpful assistant that extracts structured data from news articles in JSON format."},
+            {"role": "user", "content": prompt}
+        ]
+
+    def _parse_batch_response(self, response: Any, batch: List[tuple], latency: float) -> List[tuple | None] | None:
+        """Per article of a packed batch: (result, token share, latency share), None where unusable.
+
+        Returns None if the call failed or the response is not a JSON array.
+        """
+        import sys
+
+        if isinstance(response, Exception):
+            print(f"[AI Extract] ✗ Batch call failed: {response}", file=sys.stderr, flush=True)
+            self._record_llm('extract_batch', time.time() - latency, error=True)
+            return None
+        self._record_llm('extract_batch', time.time() - latency, response.usage)
+        try:
+            parsed_response = self._parse_json_response(response.choices[0].message.content or "")
+        except Exception as e:
+            print(f"[AI Extract] ✗ Malformed batch response ({e}) - falling back to single calls", file=sys.stderr, flush=True)
+            return None
+        if not isinstance(parsed_response, list):
+            print("[AI Extract] ✗ Batch response is not a JSON array - falling back to single calls", file=sys.stderr, flush=True)
+            return None
+
+        by_index: Dict[int, Dict[str, Any]] = {}
+        positional = len(parsed_response) == len(batch)
+        for pos, item in enumerate(parsed_response):
+            if not isinstance(item, dict):
+                continue
+            index = item.pop('index', None)
+            if isinstance(index, int) and 1 <= index <= len(batch):
+                by_index.setdefault(index, item)
+            elif positional:
+                by_index.setdefault(pos + 1, item)
+
+        usage = response.usage
+        tokens = (getattr(usage, 'prompt_tokens', 0) or 0) + (getattr(usage, 'completion_tokens', 0) or 0)
+        share = len(batch)
+        extracted: List[tuple | None] = []
+        for n in range(1, len(batch) + 1):
+            item = by_index.get(n)
+            if item is None or 'relevance' not in item:
+                extracted.append(None)
+                continue
+            extracted.append((item, tokens // share, latency / share))
+        missing = extracted.count(None)
+        print(f"[AI Extract] ✓ Batch parsed - {len(batch) - missing}/{len(batch)} articles"
+              + (f", {missing} retried singly" if missing else ""), file=sys.stderr, flush=True)
+        return extracted
 
     def analyze_text(self, text: str) -> Dict[str, Any]:
         if not self.client:
@@ -344,9 +686,8 @@ Snippet: {text}
 
 Return JSON."""
             
-            response = self.client.chat.completions.create(
-                model=self.model,  # type: ignore
-                messages=[
+            response = self.client.complete(
+                [
                     {"role": "system", "content": "You are a helpful assistant that analyzes news text."},
                     {"role": "user", "content": prompt}
                 ],
@@ -364,7 +705,13 @@ Return JSON."""
         if not self.pplx_key:
             print("[WebSearch] ✗ PERPLEXITY_API_KEY not configured", file=sys.stderr, flush=True)
             return []
-        
+
+        if self.search_cache is not None:
+            cached = self.search_cache.get(query, self.pplx_model)
+            if cached is not None:
+                print(f"[Perplexity] ✓ Cached: {len(cached)} URLs for {query[:60]}", file=sys.stderr, flush=True)
+                return cached
+
         try:
             headers = {
                 "Authorization": f"Bearer {self.pplx_key}",
@@ -375,7 +722,7 @@ Return JSON."""
             search_query = f"{query} Colombia Medellín Valle de Aburrá noticias"
             
             body = {
-                "model": "sonar-pro",  # Perplexity's best online search model
+                "model": self.pplx_model,  # sonar-pro: Perplexity's best online search model
                 "messages": [
                     {
                         "role": "system",
@@ -392,13 +739,16 @@ Return JSON."""
             }
             
             print(f"[Perplexity] Searching: {search_query[:80]}...", file=sys.stderr, flush=True)
+            started = time.time()
             resp = requests.post(self.pplx_endpoint, headers=headers, json=body, timeout=20)
             
             if resp.status_code != 200:
                 print(f"[Perplexity] ✗ HTTP {resp.status_code}: {resp.text[:300]}", file=sys.stderr, flush=True)
+                self._record_llm('search', started, error=True)
                 return []
             
             data = resp.json()
+            self._record_llm('search', started, data.get('usage'))
             
             # Extract URLs from citations
             urls: List[str] = []
@@ -428,7 +778,8 @@ Return JSON."""
                     unique_urls.append(u)
             
             print(f"[Perplexity] ✓ Found {len(unique_urls)} unique URLs from diverse sources", file=sys.stderr, flush=True)
-            print(f"[Perplexity] ✓ Found {len(unique_urls)} unique URLs from diverse sources", file=sys.stderr, flush=True)
+            if self.search_cache is not None:
+                self.search_cache.put(query, unique_urls[:100], self.pplx_model)
             return unique_urls[:100]
             
         except Exception as e:
@@ -437,3 +788,20 @@ Return JSON."""
             traceback.print_exc(file=sys.stderr)
             return []
 
+    def search_many(self, queries: List[str], max_concurrency: int = 8) -> Iterator[List[str]]:
+        """web_search for each query, at most `max_concurrency` in flight; yields URL lists in query order.
+
+        Every search is started up front, so a slow query only delays the
+        results behind it. Closing the generator early cancels the searches
+        that have not started yet.
+        """
+        if not queries:
+            return
+        executor = ThreadPoolExecutor(max_workers=max(1, min(max_concurrency, len(queries))),
+                                      thread_name_prefix="web-search")
+        try:
+            futures = [executor.submit(self.web_search, query) for query in queries]
+            for future in futures:
+                yield future.result()
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
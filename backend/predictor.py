@@ -4,9 +4,12 @@ import pandas as pd
 import numpy as np
 import joblib
 import os
-from typing import List, Dict, Tuple, Any
-from collections import Counter
+import hashlib
+import threading
+from typing import List, Dict, Tuple, Any, Optional
+from collections import Counter, OrderedDict
 from datetime import datetime, timedelta
+from scipy import sparse
 from sklearn.model_selection import train_test_split
 from sklearn.ensemble import RandomForestRegressor
 from xgboost import XGBRegressor
@@ -14,6 +17,8 @@ from lightgbm import LGBMRegressor
 from sklearn.metrics import mean_squared_error
 from .models import PredictionResult, TrainingMetrics, ScrapingConfig, ModelMetadata, ScrapedItem
 from .data_loader import DataLoader
+from .gazetteer import AhoCorasick, fold
+from .model_registry import ModelRegistry
 
 class Predictor:
     def __init__(self, data_loader: DataLoader | None = None):
@@ -42,6 +47,12 @@ class Predictor:
         # Merge CSV comunas with fallback zones, ensuring no invalid values
         self.comuna_set = sorted(set(csv_comunas + known_zones_fallback))
         print(f"[Predictor] Loaded {len(csv_comunas)} comunas from barrio_index, {len(self.comuna_set)} total after merge", flush=True)
+        self._build_zone_index()
+        self._build_mention_matcher()
+        self._build_zone_columns()
+        # Dataset fingerprint -> document x zone-column mention matrix, for the last few datasets seen
+        self._mention_matrices: "OrderedDict[str, sparse.csr_matrix]" = OrderedDict()
+        self._mention_lock = threading.Lock()
         
         self.models = {}
         self.best_model_name = "None"
@@ -49,55 +60,191 @@ class Predictor:
         # Use absolute path to ensure model can be found regardless of working directory
         backend_dir = os.path.dirname(os.path.abspath(__file__))
         self.model_path = os.path.join(backend_dir, "data", "sentinela_model.joblib")
+        # Active estimator + metadata kept in memory between predictions
+        self.registry = ModelRegistry(self.model_path)
 
-    def _count_barrio_mentions(self, text: str) -> Counter:
-        text_lower = str(text).lower()
-        counts = Counter()
+    @staticmethod
+    def _zone_key(name: Any) -> str:
+        """Lookup key for a barrio or comuna name: accent- and case-folded, single spaces."""
+        return ' '.join(fold(str(name)).split())
+
+    def _build_zone_index(self):
+        """Hashed views of barrio_index: barrio -> comuna (name and number), by exact and by folded name.
+
+        Where a name appears twice the first entry wins, as the linear scans it replaces did.
+        """
+        self._barrio_zone: Dict[str, Dict[str, str]] = {}
+        self._barrio_zone_folded: Dict[str, Dict[str, str]] = {}
         for entry in self.barrio_index:
             barrio = entry.get('barrio', '')
             if not barrio:
                 continue
-            b_lower = str(barrio).lower()
-            c = text_lower.count(b_lower)
-            if c > 0:
-                counts[barrio] += c
-        return counts
-
-    def _get_historical_max_zone_activity(self, df: pd.DataFrame, window_days: int = 14) -> float:
-        """Max rolling sum of mentions per comuna (using barrio mentions + direct comuna mentions)."""
-        triggers = df[df['type'] == 'TRIGGER_EVENT'].copy()
-        if triggers.empty:
-            return 10.0  # Fallback por defecto
+            zone = {"comuna_nombre": entry.get('comuna_nombre'), "comuna_numero": entry.get('comuna_numero')}
+            self._barrio_zone.setdefault(barrio, zone)
+            self._barrio_zone_folded.setdefault(self._zone_key(barrio), zone)
 
-        daily_zone_counts = []
-        for date in sorted(triggers['date'].unique()):
-            day_text = " ".join(triggers[triggers['date'] == date]['text'].tolist())
-            day_text_lower = day_text.lower()
-            comuna_counts: Dict[str, int] = {}
-            
-            # 1. Contar barrios y agregar a comunas
-            barrio_counts = self._count_barrio_mentions(day_text)
+    def _barrio_zone_of(self, barrio: str) -> Optional[Dict[str, str]]:
+        """{comuna_nombre, comuna_numero} of a barrio, matched exactly or else by folded name."""
+        return self._barrio_zone.get(barrio) or self._barrio_zone_folded.get(self._zone_key(barrio))
+
+    def _comuna_of(self, barrio: str) -> Optional[str]:
+        zone = self._barrio_zone_of(barrio)
+        return zone["comuna_nombre"] if zone else None
+
+    def _build_mention_matcher(self):
+        """One automaton over the lower-cased barrio and comuna names (a name that is both is one pattern)."""
+        self._mention_matcher = AhoCorasick()
+        self._pattern_barrios: Dict[int, List[str]] = {}
+        self._pattern_comunas: Dict[int, List[str]] = {}
+        for entry in self.barrio_index:
+            barrio = entry.get('barrio', '')
+            if not barrio or not str(barrio).lower():
+                continue
+            self._pattern_barrios.setdefault(self._mention_matcher.add(str(barrio).lower()), []).append(barrio)
+        for comuna in self.comuna_set:
+            if comuna.lower():
+                self._pattern_comunas.setdefault(self._mention_matcher.add(comuna.lower()), []).append(comuna)
+        # Results are reported in barrio_index / comuna_set order, as the per-name loops used to produce them
+        self._barrio_rank = {barrio: rank for rank, barrio in enumerate(
+            entry.get('barrio', '') for entry in self.barrio_index)}
+        self._comuna_rank = {comuna: rank for rank, comuna in enumerate(self.comuna_set)}
+        self._mention_matcher.build()
+
+    def _count_mentions(self, text: str) -> Tuple[Counter, Dict[str, int]]:
+        """(barrio -> mentions, comuna -> direct mentions) in one pass over the lower-cased text.
+
+        Counts are those of `text.lower().count(name.lower())` for every barrio
+        and comuna: substring matches, non-overlapping per name, and a comuna
+        named inside a barrio's name ("Robledo" in "Robledo Kennedy") counts too.
+        """
+        hits = self._mention_matcher.count(str(text).lower())
+        barrios, comunas = [], []
+        for pattern_id, count in hits.items():
+            for barrio in self._pattern_barrios.get(pattern_id, ()):
+                barrios.append((barrio, count))
+            for comuna in self._pattern_comunas.get(pattern_id, ()):
+                comunas.append((comuna, count))
+        barrio_counts = Counter()
+        for barrio, count in sorted(barrios, key=lambda bc: self._barrio_rank[bc[0]]):
+            barrio_counts[barrio] += count
+        comuna_counts = dict(sorted(comunas, key=lambda cc: self._comuna_rank[cc[0]]))
+        return barrio_counts, comuna_counts
+
+    def _build_zone_columns(self):
+        """Columns of the mention matrix and the sparse map from column to comuna.
+
+        Columns are the barrios (barrio_index order) then the direct comuna
+        mentions (comuna_set order); a barrio column maps to its comuna, a
+        comuna column to itself, a barrio without comuna to nothing.
+        """
+        barrios = list(dict.fromkeys(e.get('barrio', '') for e in self.barrio_index if e.get('barrio', '')))
+        self._zone_columns: List[Tuple[str, str]] = [('barrio', b) for b in barrios] + [('comuna', c) for c in self.comuna_set]
+        self._zone_column_ids = {column: i for i, column in enumerate(self._zone_columns)}
+        self._zones: List[str] = list(self.comuna_set)
+        zone_ids = {zone: i for i, zone in enumerate(self._zones)}
+        rows, cols = [], []
+        for i, (kind, name) in enumerate(self._zone_columns):
+            zone = self._comuna_of(name) if kind == 'barrio' else name
+            if not zone:
+                continue
+            if zone not in zone_ids:
+                zone_ids[zone] = len(self._zones)
+                self._zones.append(zone)
+            rows.append(i)
+            cols.append(zone_ids[zone])
+        self._column_zone = sparse.csr_matrix(
+            (np.ones(len(rows), dtype=np.int64), (rows, cols)), shape=(len(self._zone_columns), len(self._zones)))
+
+    def _mention_matrix(self, df: pd.DataFrame) -> sparse.csr_matrix:
+        """Documents (df rows, in order) x zone columns mention counts, cached on a hash of the texts."""
+        texts = df['text'].astype(str).tolist()
+        key = f"{len(texts)}:{hashlib.sha1(chr(31).join(texts).encode('utf-8', 'surrogatepass')).hexdigest()}"
+        with self._mention_lock:
+            cached = self._mention_matrices.get(key)
+            if cached is not None:
+                self._mention_matrices.move_to_end(key)
+                return cached
+        columns = self._zone_column_ids
+        indptr, indices, data = [0], [], []
+        for text in texts:
+            barrio_counts, direct_counts = self._count_mentions(text)
             for barrio, cnt in barrio_counts.items():
-                comuna = next((b['comuna_nombre'] for b in self.barrio_index if b['barrio'] == barrio), None)
-                if not comuna:
-                    continue
-                comuna_counts[comuna] = comuna_counts.get(comuna, 0) + cnt
-            
-            # 2. FALLBACK: También buscar menciones directas de comunas
-            for comuna in self.comuna_set:
-                direct_count = day_text_lower.count(comuna.lower())
-                if direct_count > 0:
-                    comuna_counts[comuna] = comuna_counts.get(comuna, 0) + direct_count
-            
-            if comuna_counts:
-                daily_zone_counts.append({"date": date, **comuna_counts})
+                indices.append(columns[('barrio', barrio)])
+                data.append(cnt)
+            for comuna, cnt in direct_counts.items():
+                indices.append(columns[('comuna', comuna)])
+                data.append(cnt)
+            indptr.append(len(indices))
+        matrix = sparse.csr_matrix((np.asarray(data, dtype=np.int64), np.asarray(indices, dtype=np.int64), indptr),
+                                   shape=(len(texts), len(self._zone_columns)))
+        with self._mention_lock:
+            self._mention_matrices[key] = matrix
+            while len(self._mention_matrices) > 4:
+                self._mention_matrices.popitem(last=False)
+        return matrix
+
+    def _recent_triggers_mask(self, df: pd.DataFrame, days: int = 14) -> np.ndarray:
+        return ((df['type'] == 'TRIGGER_EVENT') & (df['date'] > df['date'].max() - pd.Timedelta(days=days))).to_numpy()
+
+    def _window_mentions(self, df: pd.DataFrame, mask: np.ndarray,
+                         mentions: Optional[sparse.csr_matrix] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """(mentions per zone column, first row mentioning each column) over the masked documents.
+
+        The first row (columns never mentioned get a sentinel past the end)
+        reproduces the order in which the per-text loops first met each name.
+        """
+        mentions = self._mention_matrix(df) if mentions is None else mentions
+        window = mentions[mask].tocsc()
+        window.sort_indices()
+        totals = np.asarray(window.sum(axis=0)).ravel()
+        first = np.full(window.shape[1], window.shape[0], dtype=np.int64)
+        mentioned = np.diff(window.indptr) > 0
+        first[mentioned] = window.indices[window.indptr[:-1][mentioned]]
+        return totals, first
+
+    def _zone_mentions(self, totals: np.ndarray, first: np.ndarray) -> Dict[str, int]:
+        """comuna -> mentions (barrios + direct) in first-mention order."""
+        zone_totals = self._column_zone.T @ totals
+        order: Dict[int, Tuple[int, int]] = {}
+        for column in np.flatnonzero(totals):
+            for zone in self._column_zone.indices[self._column_zone.indptr[column]:self._column_zone.indptr[column + 1]]:
+                order[zone] = min(order.get(zone, (first[column], column)), (first[column], column))
+        return {self._zones[zone]: int(zone_totals[zone]) for zone in sorted(order, key=order.get)}
+
+    def _get_historical_max_zone_activity(self, df: pd.DataFrame, window_days: int = 14,
+                                          mentions: Optional[sparse.csr_matrix] = None) -> float:
+        """Max rolling sum of mentions per comuna (using barrio mentions + direct comuna mentions).
+
+        The trigger rows of the dataset's mention matrix are summed into a
+        dense (day x comuna) matrix; the `window_days` rolling sums then come
+        from a cumulative sum along the day axis.
+        """
+        trigger_mask = (df['type'] == 'TRIGGER_EVENT').to_numpy()
+        triggers = df[trigger_mask]
+        if triggers.empty:
+            return 10.0  # Fallback por defecto
 
-        if not daily_zone_counts:
+        days = pd.to_datetime(triggers['date'], errors='coerce', utc=True).dt.floor('D')
+        valid = days.notna().to_numpy()
+        if not valid.any():
             return 10.0
+        days = days[valid]
+        day_offsets = ((days - days.min()) // pd.Timedelta(days=1)).to_numpy(dtype=np.int64)
 
-        zone_df = pd.DataFrame(daily_zone_counts).set_index('date').fillna(0)
-        rolling_zone_df = zone_df.rolling(window=f'{window_days}D', min_periods=1).sum()
-        historical_max = rolling_zone_df.max().max()
+        # Documents x comunas, then a day x document indicator scatters them into days
+        mentions = self._mention_matrix(df) if mentions is None else mentions
+        doc_zones = mentions[trigger_mask][valid] @ self._column_zone
+        if not doc_zones.count_nonzero():
+            return 10.0
+        by_day = sparse.csr_matrix(
+            (np.ones(len(day_offsets), dtype=np.int64), (day_offsets, np.arange(len(day_offsets)))),
+            shape=(int(day_offsets.max()) + 1, len(day_offsets)))
+        daily = (by_day @ doc_zones).toarray()
+        cumulative = np.vstack([np.zeros((1, daily.shape[1]), dtype=np.int64), np.cumsum(daily, axis=0)])
+        # Sum over (day - window_days, day] for every day
+        window = max(1, window_days)
+        rolling = cumulative[1:] - cumulative[np.maximum(np.arange(1, len(cumulative)) - window, 0)]
+        historical_max = rolling.max()
         return float(historical_max) if historical_max > 5 else 5.0
 
     def _calculate_risk_level(self, risk_score: float) -> str:
@@ -157,6 +304,8 @@ class Predictor:
                 print(f"[Data Filter] Using FULL date range: {df['date'].min()} to {df['date'].max()}", flush=True)
         
         df.sort_values('date', inplace=True)
+        # Barrio / comuna mentions of every article, shared by all the zone metrics below
+        mentions = self._mention_matrix(df)
 
         # --- 2. Temporal Feature Engineering ---
         triggers_df = df[df['type'] == 'TRIGGER_EVENT'].copy()
@@ -292,14 +441,14 @@ class Predictor:
         max_observed_crimes = float(y.max()) if not y.empty else 30.0
         
         # 2. Máxima Actividad de Zona (Heurística Histórica basada en data real)
-        max_observed_zone_activity = self._get_historical_max_zone_activity(df, window_days=14)
+        max_observed_zone_activity = self._get_historical_max_zone_activity(df, window_days=14, mentions=mentions)
         print(f"[Training] Calibrated Max Zone Activity: {max_observed_zone_activity}")
 
         # A. Riesgo del Modelo (Normalizado contra máximo histórico)
         model_risk = min(99.0, (predicted_crime_volume / max_observed_crimes) * 100 if max_observed_crimes > 0 else 50.0)
 
         # B. Riesgo de Zona (Normalizado contra el PEOR caso histórico, no contra 10 fijo)
-        zone_risks, max_zone_risk = self._calculate_zone_risks(df, benchmark_max=max_observed_zone_activity)
+        zone_risks, max_zone_risk = self._calculate_zone_risks(df, benchmark_max=max_observed_zone_activity, mentions=mentions)
         print(f"[CALC] Zone Risk based on {len(zone_risks)} zones, max mentions in history: {max_observed_zone_activity:.0f}")
         if zone_risks:
             print(f"[CALC] Top zone risk: {zone_risks[0]['zone']} = {zone_risks[0]['risk']:.1f}%")
@@ -382,6 +531,7 @@ class Predictor:
         try:
             os.makedirs(os.path.dirname(self.model_path), exist_ok=True)
             joblib.dump(self.best_model, self.model_path)
+            self.registry.prime(self.best_model)
             print(f"[Predictor] Model '{full_model_name}' saved to {self.model_path}")
             
             # Also save model metadata for inference (granularity, horizon, calibration, etc.)
@@ -414,7 +564,7 @@ class Predictor:
             zone_risk_score=round(float(max_zone_risk), 1),
             predicted_volume=round(float(predicted_crime_volume), 2),  # Volumen proyectado FUTURO
             expected_crime_type=f"Volume: {round(float(predicted_crime_volume), 1)} incidents",
-            affected_zones=self._extract_recent_zones(df),
+            affected_zones=self._extract_recent_zones(df, mentions),
             duration_days=int(horizon_days),
             confidence_interval=(float(max(0, final_risk_score - 10)), float(min(100, final_risk_score + 10))),
             
@@ -513,25 +663,9 @@ class Predictor:
         """
         Usa el modelo ya entrenado para predecir sobre un nuevo conjunto de datos de entrada.
         """
-        if not os.path.exists(self.model_path):
-            raise FileNotFoundError("No trained model found. Please run the training pipeline first.")
-
-        # Cargar el modelo entrenado
-        model = joblib.load(self.model_path)
-        print(f"[Predictor] Model loaded from {self.model_path} for inference.")
-        
-        # Load model metadata (granularity, horizon, etc.)
-        import json
-        metadata_path = self.model_path.replace('.joblib', '_metadata.json')
-        training_metadata = {}
-        if os.path.exists(metadata_path):
-            try:
-                with open(metadata_path, 'r') as f:
-                    training_metadata = json.load(f)
-                print(f"[Predictor] Model metadata loaded from {metadata_path}")
-                print(f"[Predictor] Training granularity: {training_metadata.get('granularity')}")
-            except Exception as e:
-                print(f"[Predictor] Warning: Failed to load metadata: {e}")
+        # Modelo entrenado y metadata (granularity, horizon, etc.): desde memoria salvo que los archivos cambien
+        model, training_metadata = self.registry.get()
+        print(f"[Predictor] Training granularity: {training_metadata.get('granularity')}")
         
         print(f"[Predictor] ===== INFERENCE DEBUG LOG =====")
         print(f"[Predictor] Input items count: {len(new_items)}")
@@ -722,8 +856,11 @@ class Predictor:
             print(f"[Predictor] Manual parameters detected - skipping zone risk calculation (no real text data)")
             zone_risks = []
             max_zone_risk_val = 0.0
+            mentions = None
         else:
-            zone_risks, max_zone_risk_val = self._calculate_zone_risks(df, benchmark_max=max_observed_zone_activity)
+            # Cached per dataset: repeated predictions over the same items skip the text scan
+            mentions = self._mention_matrix(df)
+            zone_risks, max_zone_risk_val = self._calculate_zone_risks(df, benchmark_max=max_observed_zone_activity, mentions=mentions)
             print(f"[CALC] Zone Risk based on {len(zone_risks)} zones, max mentions in history: {max_observed_zone_activity:.0f}")
             if zone_risks:
                 print(f"[CALC] Top zone risk: {zone_risks[0]['zone']} = {zone_risks[0]['risk']:.1f}%")
@@ -763,7 +900,7 @@ class Predictor:
             zone_risk_score=round(float(max_zone_risk_val), 1),
             predicted_volume=round(float(predicted_volume), 2),
             expected_crime_type=f"Volume: {round(float(predicted_volume), 2)} incidents",
-            affected_zones=self._extract_recent_zones(df),
+            affected_zones=self._extract_recent_zones(df, mentions),
             duration_days=horizon_days,
             confidence_interval=(float(max(0, final_risk_score - 10)), float(min(100, final_risk_score + 10))),
             feature_importance=[],  # No calculado en inferencia
@@ -809,32 +946,15 @@ class Predictor:
         )
 
 
-    def _extract_recent_zones(self, df: pd.DataFrame) -> List[str]:
+    def _extract_recent_zones(self, df: pd.DataFrame, mentions: Optional[sparse.csr_matrix] = None) -> List[str]:
         # Helper to get zones (comunas) from triggers in the last 14 days using barrio mentions + direct comuna mentions
         if df.empty or 'text' not in df.columns:
             return []
-        recent_triggers = df[(df['type'] == 'TRIGGER_EVENT') & (df['date'] > df['date'].max() - pd.Timedelta(days=14))]
-        comuna_mentions: Dict[str, int] = {}
-        for text in recent_triggers['text']:
-            text_lower = str(text).lower()
-            
-            # Contar barrios y agregar a comunas
-            counts = self._count_barrio_mentions(text)
-            for barrio, cnt in counts.items():
-                comuna = next((b['comuna_nombre'] for b in self.barrio_index if b['barrio'] == barrio), None)
-                if not comuna:
-                    continue
-                comuna_mentions[comuna] = comuna_mentions.get(comuna, 0) + cnt
-            
-            # FALLBACK: También buscar menciones directas de comunas
-            for comuna in self.comuna_set:
-                direct_count = text_lower.count(comuna.lower())
-                if direct_count > 0:
-                    comuna_mentions[comuna] = comuna_mentions.get(comuna, 0) + direct_count
-        
+        comuna_mentions = self._zone_mentions(*self._window_mentions(df, self._recent_triggers_mask(df), mentions))
         return [zona for zona, count in sorted(comuna_mentions.items(), key=lambda x: x[1], reverse=True)[:5]]
 
-    def _calculate_zone_risks(self, df: pd.DataFrame, benchmark_max: float = 10.0) -> Tuple[List[dict], float]:
+    def _calculate_zone_risks(self, df: pd.DataFrame, benchmark_max: float = 10.0,
+                              mentions: Optional[sparse.csr_matrix] = None) -> Tuple[List[dict], float]:
         """Calcula riesgo por comuna usando menciones de barrios + menciones directas de comunas.
 
         Retorna (lista_zone_risks, max_zone_risk_score) donde cada entrada incluye:
@@ -843,38 +963,22 @@ class Predictor:
         if df.empty or 'text' not in df.columns:
             return [], 0.0
 
-        recent_triggers = df[(df['type'] == 'TRIGGER_EVENT') & (df['date'] > df['date'].max() - pd.Timedelta(days=14))]
-        if recent_triggers.empty:
+        recent_mask = self._recent_triggers_mask(df)
+        if not recent_mask.any():
             return [], 0.0
 
-        # Conteo por barrio y agregado a comuna
-        comuna_mentions: Dict[str, int] = {}
+        # Conteo por barrio y agregado a comuna, más menciones directas de comunas (para "Itagüí", "La Candelaria", etc.)
+        totals, first = self._window_mentions(df, recent_mask, mentions)
+        comuna_mentions = self._zone_mentions(totals, first)
         comuna_breakdown: Dict[str, Dict[str, int]] = {}
-
-        for text in recent_triggers['text']:
-            text_lower = str(text).lower()
-            
-            # 1. Contar barrios y agregar a comunas
-            counts = self._count_barrio_mentions(text)
-            for barrio, cnt in counts.items():
-                comuna = next((b['comuna_nombre'] for b in self.barrio_index if b['barrio'] == barrio), None)
-                if not comuna:
-                    continue
-                comuna_mentions[comuna] = comuna_mentions.get(comuna, 0) + cnt
-                bd = comuna_breakdown.setdefault(comuna, {})
-                bd[barrio] = bd.get(barrio, 0) + cnt
-            
-            # 2. FALLBACK: También buscar menciones directas de comunas (para "Itagüí", "La Candelaria", etc.)
-            # Solo si no se encontraron barrios, para evitar doble conteo
-            for comuna in self.comuna_set:
-                comuna_lower = comuna.lower()
-                # Buscar el nombre de la comuna directamente
-                direct_count = text_lower.count(comuna_lower)
-                if direct_count > 0:
-                    comuna_mentions[comuna] = comuna_mentions.get(comuna, 0) + direct_count
-                    bd = comuna_breakdown.setdefault(comuna, {})
-                    # Marcar como mención directa de comuna
-                    bd[f"({comuna})"] = bd.get(f"({comuna})", 0) + direct_count
+        for column in sorted(np.flatnonzero(totals), key=lambda c: (first[c], c)):
+            kind, name = self._zone_columns[column]
+            comuna = self._comuna_of(name) if kind == 'barrio' else name
+            if not comuna:
+                continue
+            # Las menciones directas de comuna se marcan entre paréntesis
+            label = name if kind == 'barrio' else f"({name})"
+            comuna_breakdown.setdefault(comuna, {})[label] = int(totals[column])
 
         zone_risks = []
         max_current_risk = 0.0
@@ -0,0 +1,204 @@
+import os
+import re
+import random
+import hashlib
+from collections import Counter
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from .gazetteer import ABURRA_MUNICIPALITIES, fold
+from .kv_cache import KVCache
+
+# Category weights: naming a structure or combo says far more than naming a barrio
+WEIGHT_ORG = 3.0
+WEIGHT_COMBO = 2.5
+WEIGHT_EVENT = 2.0
+WEIGHT_RANK = 1.5
+WEIGHT_PLACE = 1.0
+
+# Generic crime-news vocabulary, so pages are not judged only on the config's exact labels
+CRIME_LEXICON = (
+    "captura", "capturado", "homicidio", "asesinato", "sicario", "extorsión", "vacuna", "secuestro",
+    "allanamiento", "incautación", "estupefacientes", "microtráfico", "plaza de vicio", "banda", "combo",
+    "cabecilla", "alias", "policía", "fiscalía", "ejército", "operativo", "balacera", "desplazamiento",
+    "amenazas", "crimen", "delincuencia", "organización criminal",
+)
+ABURRA_PLACES = ("Valle de Aburrá",) + ABURRA_MUNICIPALITIES
+
+# BM25 term-frequency saturation and length normalization
+K1 = 1.2
+B = 0.75
+AVG_DOC_STEMS = 400
+
+# Stems are word prefixes: capturado/capturaron/captura all become "captur"
+STEM_LENGTH = 6
+
+# Pages scoring below this never go to the LLM (0 = no topical vocabulary hit at all)
+MIN_SCORE = 1.0
+# LLM relevance above which a page counts as relevant (the scraper's keep threshold)
+RELEVANT = 0.15
+
+_TOKEN_RE = re.compile(r'\w+')
+_ALTERNATIVES_RE = re.compile(r'[()/]')
+
+
+def stems(text: str) -> List[str]:
+    return [token[:STEM_LENGTH] for token in _TOKEN_RE.findall(fold(text))]
+
+
+def label_terms(label: str) -> List[str]:
+    """Search terms in a config label: 'Clan del Golfo (AGC)' -> ['Clan del Golfo', 'AGC']."""
+    return [part.strip() for part in _ALTERNATIVES_RE.split(label or '') if len(part.strip()) > 2]
+
+
+def _clean(values: Iterable[Any]) -> List[str]:
+    return [str(v).strip() for v in values if v is not None and str(v).strip().lower() not in ('', 'nan', 'none')]
+
+
+class RelevancePrefilter:
+    """Cheap local relevance score that decides which pages are worth an LLM extraction.
+
+    Pages are scored BM25-style against weighted phrases: organizations and
+    structures, combos, events and crimes (plus a generic crime lexicon),
+    ranks and places (barrios, comunas and Valle de Aburrá municipalities).
+    Matching is on accent-folded word prefixes, so inflections and missing
+    accents still hit. Places only count on pages with some other hit.
+
+    The rejection threshold is calibrated from earlier LLM verdicts: every
+    page the LLM sees is recorded as (local score, LLM relevance), persisted
+    per vocabulary, and once enough relevant pages are known the threshold is
+    set so that `target_recall` of them would have passed. Until then only
+    pages below MIN_SCORE are rejected. Each page below the threshold is sent
+    to the LLM anyway with probability 1/`audit_every`, so a threshold set too
+    high shows up in the samples. An audited page stands for the `audit_every`
+    below-threshold pages it was drawn from and is recorded with that weight,
+    so the samples estimate the whole score distribution rather than only the
+    part above the threshold, and the threshold does not creep up run by run.
+    """
+
+    def __init__(self, phrases: Dict[str, float], store: Optional[KVCache] = None, target_recall: float = 0.97,
+                 min_samples: int = 30, max_samples: int = 2000, audit_every: int = 20, seed: Optional[int] = None):
+        # stem tuple -> weight; a phrase listed twice keeps its highest weight
+        self.phrases: Dict[Tuple[str, ...], float] = {}
+        for phrase, weight in phrases.items():
+            key = tuple(stems(phrase))
+            if key and (len(key) > 1 or len(key[0]) > 2):
+                self.phrases[key] = max(weight, self.phrases.get(key, 0.0))
+        self.vocabulary_key = hashlib.sha1(
+            '\x1f'.join(f"{' '.join(k)}={w}" for k, w in sorted(self.phrases.items())).encode('utf-8')
+        ).hexdigest()[:16]
+        self.store = store
+        self.target_recall = target_recall
+        self.min_samples = min_samples
+        self.max_samples = max_samples
+        self.audit_every = audit_every
+        self._rng = random.Random(seed)
+        # [score, LLM relevance, weight]; samples stored before weighting have weight 1
+        self.samples: List[List[float]] = (store.get(self.vocabulary_key) if store else None) or []
+        self.threshold = self._calibrate()
+        self.scored = 0
+        self.below_threshold = 0
+        self.rejected = 0
+        self.audited = 0
+
+    @classmethod
+    def from_config(cls, config, data_loader=None, db_path: str | None = None) -> "RelevancePrefilter":
+        """Vocabulary from the scraping config plus the combos_v2.csv gazetteer."""
+        phrases: Dict[str, float] = {}
+
+        def add(values: Iterable[str], weight: float):
+            for value in _clean(values):
+                for term in label_terms(value):
+                    phrases[term] = max(weight, phrases.get(term, 0.0))
+
+        add(config.target_organizations or [], WEIGHT_ORG)
+        add(config.local_combos or [], WEIGHT_COMBO)
+        add((config.predictor_events or []) + (config.target_crimes or []) + list(CRIME_LEXICON), WEIGHT_EVENT)
+        add(config.predictor_ranks or [], WEIGHT_RANK)
+        add(ABURRA_PLACES, WEIGHT_PLACE)
+        df = getattr(data_loader, 'df', None)
+        if df is not None and not df.empty:
+            add(df['estructura'].unique(), WEIGHT_ORG)
+            add(df['Combo/Banda'].unique(), WEIGHT_COMBO)
+            add(df['Barrio'].unique(), WEIGHT_PLACE)
+            if 'comuna_nombre' in df:
+                add(df['comuna_nombre'].unique(), WEIGHT_PLACE)
+
+        if db_path is None:
+            backend_dir = os.path.dirname(os.path.abspath(__file__))
+            db_path = os.path.join(backend_dir, "data", "prefilter_calibration.sqlite")
+        return cls(phrases, store=KVCache(db_path, ttl_seconds=180 * 86400, max_bytes=8 * 1024 * 1024))
+
+    def score(self, text: str) -> float:
+        doc = stems(text)
+        if not doc:
+            return 0.0
+        counts = Counter(doc)
+        joined = f" {' '.join(doc)} "
+        norm = K1 * (1 - B + B * len(doc) / AVG_DOC_STEMS)
+        topical = places = 0.0
+        for phrase, weight in self.phrases.items():
+            if phrase[0] not in counts:
+                continue
+            tf = counts[phrase[0]] if len(phrase) == 1 else joined.count(f" {' '.join(phrase)} ")
+            if not tf:
+                continue
+            contribution = weight * tf * (K1 + 1) / (tf + norm)
+            if weight > WEIGHT_PLACE:
+                topical += contribution
+            else:
+                places += contribution
+        # A place name alone (weather, sports, traffic in Medellín) is no evidence of crime news
+        return round(topical + places, 3) if topical else 0.0
+
+    def accept(self, score: float) -> Tuple[bool, bool]:
+        """(send to the LLM, is an audit of a page that would have been rejected)."""
+        self.scored += 1
+        if score >= self.threshold:
+            return True, False
+        self.below_threshold += 1
+        if self.audit_every and self._rng.random() * self.audit_every < 1:
+            self.audited += 1
+            return True, True
+        self.rejected += 1
+        return False, False
+
+    def observe(self, score: float, relevance: float, audit: bool = False):
+        """Record the LLM's verdict on a scored page (`audit`: sent only as an audit sample)."""
+        weight = self.audit_every if audit and self.audit_every else 1
+        self.samples.append([score, round(float(relevance or 0), 3), weight])
+        del self.samples[:-self.max_samples]
+
+    def _relevant_scores(self) -> List[Tuple[float, float]]:
+        """(score, weight) of the pages the LLM found relevant, lowest score first."""
+        return sorted((sample[0], sample[2] if len(sample) > 2 else 1)
+                      for sample in self.samples if sample[1] > RELEVANT)
+
+    def _calibrate(self) -> float:
+        relevant = self._relevant_scores()
+        if len(relevant) < self.min_samples:
+            return MIN_SCORE
+        # Weighted quantile: the lowest score with at most (1 - target_recall) of the relevant weight below it
+        allowed = (1 - self.target_recall) * sum(weight for _, weight in relevant)
+        below = 0.0
+        for score, weight in relevant:
+            if below + weight > allowed:
+                break
+            below += weight
+        return max(MIN_SCORE, round(score, 3))
+
+    def save(self):
+        """Persist the samples and recalibrate for the next run."""
+        self.threshold = self._calibrate()
+        if self.store is not None:
+            self.store.set(self.vocabulary_key, self.samples)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "phrases": len(self.phrases),
+            "threshold": self.threshold,
+            "calibrated": len(self._relevant_scores()) >= self.min_samples,
+            "samples": len(self.samples),
+            "scored": self.scored,
+            "rejected": self.rejected,
+            "audited": self.audited,
+        }
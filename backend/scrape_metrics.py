@@ -0,0 +1,185 @@
+import os
+import json
+import time
+import uuid
+import threading
+from collections import Counter
+from typing import Any, Dict, List, Optional
+
+# Upper bounds (seconds) of the latency histogram buckets; one overflow bucket follows
+LATENCY_BUCKETS = (0.1, 0.25, 0.5, 1.0, 2.0, 5.0, 10.0, 30.0)
+
+
+class LatencyHistogram:
+    """Fixed-bucket latency histogram with count, sum and max."""
+
+    def __init__(self, buckets: tuple = LATENCY_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def observe(self, seconds: float):
+        for i, bound in enumerate(self.buckets):
+            if seconds <= bound:
+                self.counts[i] += 1
+                break
+        else:
+            self.counts[-1] += 1
+        self.count += 1
+        self.total += seconds
+        self.max = max(self.max, seconds)
+
+    def quantile(self, q: float) -> Optional[float]:
+        """Upper bound of the bucket holding the q-quantile (None if empty or in the overflow bucket)."""
+        if not self.count:
+            return None
+        rank = q * self.count
+        seen = 0
+        for bound, n in zip(self.buckets, self.counts):
+            seen += n
+            if seen >= rank:
+                return bound
+        return None
+
+    def to_dict(self) -> Dict[str, Any]:
+        labels = [f"<={b:g}s" for b in self.buckets] + [f">{self.buckets[-1]:g}s"]
+        return {
+            "count": self.count,
+            "mean": round(self.total / self.count, 3) if self.count else None,
+            "max": round(self.max, 3),
+            "p50": self.quantile(0.5),
+            "p95": self.quantile(0.95),
+            "buckets": dict(zip(labels, self.counts)),
+        }
+
+
+class ScrapeMetrics:
+    """Counters for one scraping run: fetches, LLM calls and filter drops.
+
+    Fetch outcomes partition the attempts: every `Fetcher.get` ends as a cache
+    hit, a network success or a failure with a cause ('timeout', 'size_cap',
+    'HTTP 404', 'circuit_open', ...). LLM calls are grouped by kind
+    ('extract', 'query_plan', 'search') with latency and token usage.
+    """
+
+    def __init__(self):
+        self.run_id = uuid.uuid4().hex[:12]
+        self.started_at = time.time()
+        self.finished_at: Optional[float] = None
+        self._lock = threading.Lock()
+        self.fetch_attempts = 0
+        self.fetch_successes = 0
+        self.cache_hits = 0
+        self.fetch_failures: Counter = Counter()
+        self.bytes_downloaded = 0
+        self.host_latency: Dict[str, LatencyHistogram] = {}
+        self.llm: Dict[str, Dict[str, Any]] = {}
+        self.filters: Counter = Counter()
+
+    # --- Fetching ----------------------------------------------------------
+
+    def record_fetch_attempt(self):
+        with self._lock:
+            self.fetch_attempts += 1
+
+    def record_cache_hit(self):
+        with self._lock:
+            self.cache_hits += 1
+
+    def record_fetch_success(self, host: str, latency: float, nbytes: int):
+        with self._lock:
+            self.fetch_successes += 1
+            self.bytes_downloaded += nbytes
+            self.host_latency.setdefault(host, LatencyHistogram()).observe(latency)
+
+    def record_fetch_failure(self, cause: str, nbytes: int = 0):
+        with self._lock:
+            self.fetch_failures[cause] += 1
+            self.bytes_downloaded += nbytes
+
+    # --- LLM calls ---------------------------------------------------------
+
+    def record_llm(self, kind: str, latency: float, prompt_tokens: int = 0,
+                   completion_tokens: int = 0, error: bool = False):
+        with self._lock:
+            stats = self.llm.setdefault(kind, {
+                "calls": 0, "errors": 0, "prompt_tokens": 0, "completion_tokens": 0,
+                "latency": LatencyHistogram(),
+            })
+            stats["calls"] += 1
+            stats["errors"] += int(error)
+            stats["prompt_tokens"] += prompt_tokens
+            stats["completion_tokens"] += completion_tokens
+            stats["latency"].observe(latency)
+
+    # --- Filters -----------------------------------------------------------
+
+    def count(self, name: str, n: int = 1):
+        """Bump a filter counter ('relevance', 'duplicate', 'limit', ...)."""
+        with self._lock:
+            self.filters[name] += n
+
+    def finish(self):
+        self.finished_at = time.time()
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            end = self.finished_at or time.time()
+            duration = end - self.started_at
+            return {
+                "run_id": self.run_id,
+                "started_at": self.started_at,
+                "finished_at": self.finished_at,
+                "duration_seconds": round(duration, 2),
+                "fetch": {
+                    "attempts": self.fetch_attempts,
+                    "successes": self.fetch_successes,
+                    "cache_hits": self.cache_hits,
+                    "failures": sum(self.fetch_failures.values()),
+                    "failures_by_cause": dict(self.fetch_failures),
+                    "bytes_downloaded": self.bytes_downloaded,
+                    "pages_per_minute": round((self.fetch_successes + self.cache_hits) * 60 / duration, 2) if duration > 0 else 0.0,
+                },
+                "host_latency": {host: h.to_dict() for host, h in sorted(self.host_latency.items())},
+                "llm": {
+                    kind: {**{k: v for k, v in s.items() if k != "latency"}, "latency": s["latency"].to_dict()}
+                    for kind, s in self.llm.items()
+                },
+                "filters": dict(self.filters),
+            }
+
+
+class ScrapeRunLog:
+    """Append-only JSON-lines history of per-run scrape metrics."""
+
+    def __init__(self, path: str | None = None):
+        if path is None:
+            backend_dir = os.path.dirname(os.path.abspath(__file__))
+            path = os.path.join(backend_dir, "data", "scrape_runs.jsonl")
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.path = path
+        self._lock = threading.Lock()
+
+    def append(self, run: Dict[str, Any]):
+        line = json.dumps(run, ensure_ascii=False, default=str)
+        with self._lock, open(self.path, 'a', encoding='utf-8') as f:
+            f.write(line + "\n")
+
+    def recent(self, limit: int = 20) -> List[Dict[str, Any]]:
+        """The last `limit` runs, newest first."""
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                lines = f.readlines()
+        except OSError:
+            return []
+        runs = []
+        for line in reversed(lines):
+            if len(runs) >= limit:
+                break
+            try:
+                runs.append(json.loads(line))
+            except ValueError:
+                continue
+        return runs
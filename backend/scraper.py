@@ -1,11 +1,22 @@
 import datetime
 import os
-from typing import List, Dict
-import requests
-from bs4 import BeautifulSoup
+from collections import deque
+from contextlib import closing
+from typing import Any, List, Dict, Iterator, Set
 from .models import ScrapedItem, ScrapingConfig, CleaningStats
 from typing import Tuple
 from .nlp import NLPProcessor
+from .fetcher import Fetcher, HostMonitor
+from .http_cache import ResponseCache, canonical_url
+from .frontier import FrontierStore
+from .checkpoint import ScrapeCheckpoint, config_fingerprint
+from .dedupe import NearDuplicateIndex, visible_text
+from .scrape_metrics import ScrapeMetrics, ScrapeRunLog
+from .html_parse import HtmlParserPool, PendingParse
+from .llm_cache import ExtractionCache, SearchCache
+from .kv_cache import KVCache
+from .prefilter import RelevancePrefilter
+from .gazetteer import EntityGazetteer
 from dotenv import load_dotenv
 from pathlib import Path
 
@@ -13,17 +24,45 @@ from pathlib import Path
 backend_dir = Path(__file__).parent
 load_dotenv(backend_dir / '.env')
 
+# Only the first part of each article page is decoded and handed to the extractor
+EXTRACT_MAX_BYTES = 512 * 1024
+
 class Scraper:
     def __init__(self, data_loader=None):
         self.data_loader = data_loader
+        self.http_cache = None
+        self.frontier = None
+        self.last_host_report: Dict[str, Dict] = {}
+        self.last_stats: CleaningStats | None = None
+        self.progress: Dict[str, int] = {}
+        self.checkpoint = ScrapeCheckpoint()
+        self.metrics: ScrapeMetrics | None = None
+        self.run_log = ScrapeRunLog()
+        self.html_parser: HtmlParserPool | None = None
+        self.extraction_cache: ExtractionCache | None = None
+        self.search_cache: SearchCache | None = None
+        # LLM query plans by config fingerprint (backend/data/query_plan_cache.sqlite)
+        self.query_plan_cache: KVCache | None = None
+        # Local organization / combo / location extraction, with or without the LLM
+        self.gazetteer = EntityGazetteer.from_data_loader(data_loader)
 
-    def scrape(self, config: ScrapingConfig) -> Tuple[List[ScrapedItem], CleaningStats]:
+    def scrape(self, config: ScrapingConfig, resume: bool = False) -> Tuple[List[ScrapedItem], CleaningStats]:
         """AI-assisted scraper: fetch candidates and score via NLP against config."""
-        return self._ai_scrape(config)
+        items = list(self.iter_scrape(config, resume=resume))
+        # Sort by AI relevance score and date
+        items.sort(key=lambda it: (it.relevance_score, it.date), reverse=True)
+        return items, self.last_stats
+
+    def iter_scrape(self, config: ScrapingConfig, resume: bool = False) -> Iterator[ScrapedItem]:
+        """Streaming mode: yield each item as soon as it passes the relevance threshold.
 
-    
+        Running counts are kept in `self.progress` while the run is going;
+        `self.last_stats` is set once the generator is exhausted. With `resume`,
+        continue from the last checkpoint of an interrupted run with the same config.
+        """
+        return self._ai_scrape(config, resume=resume)
 
-    def _ai_scrape(self, config: ScrapingConfig) -> Tuple[List[ScrapedItem], CleaningStats]:
+    def _ai_scrape(self, config: ScrapingConfig, resume: bool = False) -> Iterator[ScrapedItem]:
         """AI-assisted scraper: generate search queries via LLM, fetch targeted results, extract with AI."""
         import sys
         import time
@@ -48,10 +87,23 @@ class Scraper:
         
         print("="*60 + "\n", file=sys.stderr, flush=True)
         
-        items: List[ScrapedItem] = []
+        self.last_stats = None
+        metrics = self.metrics = ScrapeMetrics()
+        progress = self.progress = {
+            "queries_total": 0, "queries_done": 0, "fetched": 0, "fetch_failed": 0, "extracted": 0, "duplicates": 0, "items": 0,
+        }
         
+        checkpoint = self.checkpoint
+        restored = checkpoint.resume(config) if resume else None
+        if resume and restored is None:
+            print("[Checkpoint] No checkpoint for this config - starting a fresh run", file=sys.stderr, flush=True)
+        elapsed_before = restored.get('elapsed', 0.0) if restored else 0.0
+
         try:
             nlp = NLPProcessor()
+            nlp.metrics = metrics
+            # The LLM client is process-wide; its counters are reported as this run's difference
+            llm_client_before = nlp.client.stats() if nlp.client else None
             # Provide barrio keywords (top unique barrios) to improve location-targeted queries
             if self.data_loader:
                 barrio_idx = self.data_loader.get_barrio_index()
@@ -60,89 +112,114 @@ class Scraper:
                 print(f"[SCRAPER] Loaded {len(barrio_keywords)} barrio keywords for query building", file=sys.stderr, flush=True)
             print(f"[SCRAPER] NLPProcessor created, model available: {nlp.model is not None}", file=sys.stderr, flush=True)
             
-            # AI Agent 1: Generate optimized search queries
-            print("[AI Agent] Generating search queries from config...", file=sys.stderr, flush=True)
-            search_queries = nlp.build_search_queries(config)
-            print(f"[AI Agent] Generated {len(search_queries)} queries: {search_queries[:3]}...", file=sys.stderr, flush=True)
+            if restored:
+                # Reuse the checkpointed plan instead of asking the LLM again
+                search_queries = restored['queries']
+                print(f"[Checkpoint] Resuming at query {restored['cursor']}/{len(search_queries)}: "
+                      f"{len(restored['collected'])} items collected, {len(restored['pending'])} URLs pending, "
+                      f"{len(restored['processed'])} already extracted", file=sys.stderr, flush=True)
+            else:
+                # AI Agent 1: Generate optimized search queries
+                print("[AI Agent] Generating search queries from config...", file=sys.stderr, flush=True)
+                if self.query_plan_cache is None:
+                    self.query_plan_cache = KVCache(
+                        os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "query_plan_cache.sqlite"),
+                        ttl_seconds=30 * 86400, max_bytes=4 * 1024 * 1024)
+                nlp.query_plan_cache = self.query_plan_cache
+                search_queries = nlp.build_search_queries(config, refresh=config.refresh_query_plan)
+                print(f"[AI Agent] Generated {len(search_queries)} queries: {search_queries[:3]}...", file=sys.stderr, flush=True)
+                checkpoint.start(config, search_queries)
         except Exception as e:
             print(f"[SCRAPER ERROR] Failed to generate queries: {e}", file=sys.stderr, flush=True)
             import traceback
             traceback.print_exc(file=sys.stderr)
             # Return empty or fallback
-            return [], CleaningStats(total_scraped=0, filtered_relevance=0, filtered_date=0, duplicates_removed=0, final_count=0)
+            self.last_stats = CleaningStats(total_scraped=0, filtered_relevance=0, filtered_date=0, duplicates_removed=0, final_count=0)
+            return
+        progress["queries_total"] = len(search_queries)
         
-        collected: List[Dict] = []
-        headers = {
-            "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64; rv:130.0) Gecko/20100101 Firefox/130.0",
-            "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8",
-            "Accept-Language": "es-CO,es;q=0.8,en-US;q=0.6,en;q=0.4",
-            "Connection": "close",
-        }
-        def safe_get(url: str):
-            try:
-                MAX_SIZE = 5 * 1024 * 1024 # 5MB limit
-                resp = requests.get(url, headers=headers, timeout=10, stream=True)
-                
-                # Check Content-Length header if present
-                if 'Content-Length' in resp.headers:
-                    if int(resp.headers['Content-Length']) > MAX_SIZE:
-                        print(f"[Fetch] Skipped {url} - Too large ({resp.headers['Content-Length']} bytes)", file=sys.stderr)
-                        resp.close()
-                        return None
-                
-                # Read content with limit
-                content = b''
-                for chunk in resp.iter_content(chunk_size=1024*1024):
-                    content += chunk
-                    if len(content) > MAX_SIZE:
-                        print(f"[Fetch] Aborted {url} - Exceeded 5MB limit", file=sys.stderr)
-                        resp.close()
-                        return None
-                
-                resp._content = content
-                return resp
-            except Exception as e:
-                # print(f"[Fetch] Error {url}: {e}", file=sys.stderr)
-                return None
+        collected: List[Dict] = list(restored['collected']) if restored else []
+        first_query = restored['cursor'] if restored else 0
+        progress["queries_done"] = first_query
+        if config.use_http_cache and self.http_cache is None:
+            self.http_cache = ResponseCache()
+        if self.http_cache:
+            self.http_cache.reset_stats()
+        if self.frontier is None:
+            self.frontier = FrontierStore()
+        frontier = self.frontier
+        # Frontier rows only count for runs with the same keywords and date range
+        fingerprint = config_fingerprint(config)
+        if (self.html_parser is None or self.html_parser.workers != config.html_parse_workers
+                or self.html_parser.requested_engine != config.html_engine):
+            if self.html_parser:
+                self.html_parser.close()
+            self.html_parser = HtmlParserPool(config.html_parse_workers, config.html_engine)
+        parser = self.html_parser
+        print(f"[SCRAPER] HTML parsing: {parser.engine} engine, {parser.workers} worker processes", file=sys.stderr, flush=True)
+        nlp.html_parser = parser
+        if config.use_llm_cache and self.extraction_cache is None:
+            self.extraction_cache = ExtractionCache()
+        if self.extraction_cache:
+            self.extraction_cache.reset_stats()
+        nlp.extraction_cache = self.extraction_cache if config.use_llm_cache else None
+        if config.use_search_cache and self.search_cache is None:
+            self.search_cache = SearchCache()
+        if self.search_cache:
+            self.search_cache.reset_stats()
+        nlp.search_cache = self.search_cache if config.use_search_cache else None
+        # Local relevance score in front of the LLM; without an LLM extraction is already cheap
+        prefilter = RelevancePrefilter.from_config(config, self.data_loader) if config.use_prefilter and nlp.client else None
+        if prefilter:
+            print(f"[Prefilter] {len(prefilter.phrases)} phrases, threshold {prefilter.threshold} "
+                  f"({len(prefilter.samples)} calibration samples)", file=sys.stderr, flush=True)
+        if config.incremental:
+            print(f"[Frontier] Incremental mode: {frontier.count(fingerprint)} URLs already processed for this config", file=sys.stderr, flush=True)
+        fetcher = Fetcher(
+            max_concurrency=config.max_concurrent_fetches,
+            per_host_concurrency=config.max_fetches_per_host,
+            cache=self.http_cache if config.use_http_cache else None,
+            host_rate=config.per_host_rate_limit,
+            monitor=HostMonitor(failure_threshold=config.circuit_breaker_threshold),
+            metrics=metrics,
+        )
+        # Time spent before an interruption counts against the limit
+        deadline = start_time + max_time_seconds - elapsed_before if max_time_seconds else None
+        print(f"[SCRAPER] Fetch concurrency: {fetcher.max_concurrency} global, {fetcher.per_host_concurrency} per host, {fetcher.host_rate} req/s per host", file=sys.stderr, flush=True)
+
+        stop_reason: List[str] = []
+
+        def limit_reached() -> bool:
+            if stop_reason:
+                return True
+            if deadline and time.time() > deadline:
+                stop_reason.append('time')
+                print(f"[SCRAPER] Time limit reached ({config.max_scraping_time_minutes} min) - Stopping", file=sys.stderr, flush=True)
+            elif max_articles and len(collected) >= max_articles:
+                stop_reason.append('articles')
+                print(f"[SCRAPER] Article limit reached ({max_articles}) - Stopping", file=sys.stderr, flush=True)
+            elif len(collected) >= 1000:
+                stop_reason.append('cap')
+            return bool(stop_reason)
+
         def parse_listing(url: str, selector: str = 'a'):
-            resp = safe_get(url)
+            resp = fetcher.get(url)
             if not resp or resp.status_code != 200:
                 return []
-            soup = BeautifulSoup(resp.text, "html.parser")
-            links = []
-            for a in soup.select(f"{selector}[href]"):
-                href = a.get("href")
-                title = a.get_text(strip=True)
-                if not href:
-                    continue
-                href_str = str(href) if href else ''
-                full = href_str if href_str.startswith("http") else url.rstrip('/') + '/' + href_str.lstrip('/')
-                links.append((full, title))
-            return links
+            return parser.links(resp.content, url, selector, resp.encoding)
+
         def parse_article(url: str, fallback_title: str):
-            resp = safe_get(url)
+            resp = fetcher.get(url)
             if not resp or resp.status_code != 200:
                 return None
-            soup = BeautifulSoup(resp.text, "html.parser")
-            title = (soup.select_one('h1') or soup.select_one('title'))
-            title_text = title.get_text(strip=True) if title else fallback_title
-            p = soup.select_one('article p') or soup.select_one('div.entry-content p') or soup.select_one('p')
-            snippet = p.get_text(strip=True) if p else title_text
-            date_str = datetime.datetime.now().strftime('%Y-%m-%d')
-            meta_date = soup.select_one("meta[property='article:published_time']") or soup.select_one('time[datetime]')
-            if meta_date:
-                val = meta_date.get('content') or meta_date.get('datetime')
-                val_str = str(val) if val else ''
-                try:
-                    date_str = datetime.datetime.fromisoformat(val_str.replace('Z','+')).strftime('%Y-%m-%d')
-                except Exception:
-                    pass
+            parsed = parser.article(resp.content, resp.encoding, stop_early=True)
+            title_text = parsed['title'] or fallback_title
             source = url.split('/')[2]
             return {
                 'source': source,
-                'date': date_str,
+                'date': parsed['date'] or datetime.datetime.now().strftime('%Y-%m-%d'),
                 'headline': title_text,
-                'snippet': snippet,
+                'snippet': parsed['first_paragraph'] or title_text,
                 'url': url
             }
         # Execute searches across sources using AI-generated queries
@@ -151,125 +228,368 @@ class Scraper:
             ("https://www.elcolombiano.com", 'elcolombiano.com'),
             ("https://www.qhubomedellin.com", 'qhubomedellin.com'),
         ]
-        
-        # Use Perplexity web search to get article URLs
-        print("[Strategy] Using Perplexity API for open web search", file=sys.stderr, flush=True)
-        
-        for query in search_queries:
-            # Check time limit
-            if max_time_seconds and (time.time() - start_time) > max_time_seconds:
-                print(f"[SCRAPER] Time limit reached ({config.max_scraping_time_minutes} min) - Stopping", file=sys.stderr, flush=True)
-                break
-            
-            # Check article limit
-            if max_articles and len(collected) >= max_articles:
-                print(f"[SCRAPER] Article limit reached ({max_articles}) - Stopping", file=sys.stderr, flush=True)
-                break
-                
-            print(f"[Perplexity Search] Query: {query[:60]}...", file=sys.stderr, flush=True)
-            urls = nlp.web_search(query, site_filter=None)  # No site restrictions
-            print(f"[Perplexity Search] Found {len(urls)} URLs", file=sys.stderr, flush=True)
-            
-            for article_url in urls:
-                # Check limits before each article
-                if max_time_seconds and (time.time() - start_time) > max_time_seconds:
-                    print(f"[SCRAPER] Time limit reached - Stopping", file=sys.stderr, flush=True)
-                    break
-                if max_articles and len(collected) >= max_articles:
-                    print(f"[SCRAPER] Article limit reached - Stopping", file=sys.stderr, flush=True)
-                    break
-                    
-                print(f"[Fetch] {article_url}", file=sys.stderr, flush=True)
-                art_resp = safe_get(article_url)
-                if art_resp and art_resp.status_code == 200:
-                    extracted = nlp.extract_article_data(art_resp.text, article_url, config)
-                    relevance = extracted.get('relevance', 0)
-                    print(f"[Extract] Relevance: {relevance:.2f} - {extracted.get('headline', '')[:60]}", file=sys.stderr, flush=True)
-                    
-                    if relevance > 0.15:
-                        collected.append({
-                            'source': article_url.split('/')[2],
-                            'url': article_url,
-                            **extracted
-                        })
-                        print(f"[Extract] ✓ Added (relevance {relevance:.2f})", file=sys.stderr, flush=True)
-                        if len(collected) >= 1000:
-                            break
+
+        def unseen(urls: List[str]) -> List[str]:
+            """Drop URLs already extracted earlier in this (resumed) run and, in incremental mode, by previous runs."""
+            urls = [u for u in urls if not checkpoint.is_processed(u)]
+            if not config.incremental or not urls:
+                return urls
+            seen = frontier.seen(urls, fingerprint)
+            if seen:
+                print(f"[Frontier] Skipping {len(seen)}/{len(urls)} already-processed URLs", file=sys.stderr, flush=True)
+            return [u for u in urls if u not in seen]
+
+        def save_checkpoint():
+            checkpoint.maybe_save(elapsed_before + time.time() - start_time)
+
+        gazetteer = self.gazetteer
+
+        def to_item(record: Dict) -> ScrapedItem:
+            progress["items"] += 1
+            metadata = record.get('extracted_metadata')
+            if not isinstance(metadata, dict) or 'comunas' not in metadata:
+                # Stored before gazetteer enrichment: the headline and snippet are all that is left
+                metadata = gazetteer.enrich(metadata, f"{record.get('headline', '')}. {record.get('snippet', '')}")
+            return ScrapedItem(
+                id=f"ai_{progress['items'] - 1}",
+                source=record.get('source', 'unknown'),
+                date=record.get('date', datetime.datetime.now().strftime('%Y-%m-%d')),
+                headline=record.get('headline', 'No title'),
+                snippet=record.get('snippet', '')[:300],
+                url=record.get('url', ''),
+                relevance_score=float(record.get('relevance', 0.5)),
+                type=record.get('type', 'TRIGGER_EVENT'),
+                extracted_metadata=metadata
+            )
+
+        # Syndicated copies of one story across outlets: extract the first copy only
+        near_dupes = NearDuplicateIndex()
+        extractions: Dict[str, Dict] = {}
+        # Copies found while their canonical page still waits for extraction
+        waiting_copies: Dict[str, List[str]] = {}
+        # Prefilter score of every page sent to the LLM (and whether it went as an audit), to calibrate against its verdict
+        prefilter_scores: Dict[str, Tuple[float, bool]] = {}
+        # Pages the prefilter kept from the LLM; only this run skips them
+        prefilter_rejected: Set[str] = set()
+        # Screened pages waiting for one batched LLM extraction call
+        batch: List[tuple] = []
+        batch_size = max(1, config.llm_batch_size) if nlp.client else 1
+        # Enough pages for one prompt per concurrent LLM call
+        flush_at = batch_size * nlp.client.max_concurrency if nlp.client else 1
+
+        def record_duplicate(url: str, canonical: str):
+            # Reuse the canonical copy's extraction; the copy itself is not a new item
+            if canonical not in prefilter_rejected:
+                frontier.record(url, {**extractions[canonical], 'source': url.split('/')[2], 'url': url, 'duplicate_of': canonical}, fingerprint)
+            checkpoint.mark_processed(url)
+            save_checkpoint()
+
+        def screen(url: str, raw: Tuple[bytes, str], parsing: PendingParse, log_prefix: str) -> tuple | None:
+            """Near-duplicate and prefilter checks for one parsed page; returns it as a pending
+            extraction, or None for a copy or a page not worth an LLM call."""
+            try:
+                parsed = parsing.result()
+            except Exception:
+                parsed = {}
+            main_text = parsed.get('main_text')
+            # Only the boilerplate-free article text is signed: on short pages from one outlet the shared
+            # nav/header/footer would dominate the shingles. The 'body' fallback means no article text of
+            # MIN_MAIN_TEXT chars was found, so such pages are not screened at all.
+            signature = near_dupes.signature(main_text) if main_text and parsed.get('content_method') != 'body' else None
+            match = near_dupes.query(signature) if signature is not None else None
+            if match:
+                canonical, similarity = match
+                progress["duplicates"] += 1
+                metrics.count('duplicate')
+                print(f"{log_prefix} ≈ Near-duplicate of {canonical} ({similarity:.2f}) - skipped", file=sys.stderr, flush=True)
+                parsing.cancel()
+                if canonical in extractions:
+                    record_duplicate(url, canonical)
                 else:
-                    print(f"[Fetch] ✗ Failed to fetch {article_url}", file=sys.stderr, flush=True)
-            
-            if len(collected) >= 1000:
-                break
-
-        # Fallback: if nothing matched, fetch from landing pages and use AI extraction
-        if len(collected) < 5:
-            print("[Direct Scraping] Fetching from news site landing pages...", file=sys.stderr, flush=True)
-            fallback_sources = [
-                ("https://www.minuto30.com/judicial/", 'a'),
-                ("https://www.elcolombiano.com/tags/seguridad", 'a'),
-                ("https://www.qhubomedellin.com/judicial/", 'a'),
-            ]
-
-            for base, sel in fallback_sources:
-                print(f"[Listing] Fetching article list from {base}", file=sys.stderr, flush=True)
-                links = parse_listing(base, sel)
-                print(f"[Listing] Found {len(links)} links", file=sys.stderr, flush=True)
-                
-                articles_checked = 0
-                for full, title in links:
-                    if articles_checked >= 100:  # Increased limit per source
+                    # The canonical copy is still waiting in the current batch
+                    waiting_copies.setdefault(canonical, []).append(url)
+                return None
+            if signature is not None:
+                near_dupes.add(url, signature)
+
+            if prefilter:
+                title = parsed.get('title') or ''
+                # The title counts twice, as a field boost
+                score = prefilter.score('\n'.join([title, title, parsed.get('description') or '',
+                                                   main_text or visible_text(decode(raw))]))
+                send, audit = prefilter.accept(score)
+                if not send:
+                    metrics.count('prefilter')
+                    print(f"{log_prefix} ✗ Prefilter score {score:.2f} < {prefilter.threshold} - not sent to the LLM: {title[:60]}",
+                          file=sys.stderr, flush=True)
+                    # Not written to the frontier: a recalibrated threshold or an audit sample may want it next run
+                    extractions[url] = {'headline': title, 'relevance': 0.0, 'prefilter_score': score}
+                    prefilter_rejected.add(url)
+                    checkpoint.mark_processed(url)
+                    save_checkpoint()
+                    return None
+                if audit:
+                    print(f"{log_prefix} Prefilter score {score:.2f} below threshold - sent to the LLM as an audit sample",
+                          file=sys.stderr, flush=True)
+                prefilter_scores[url] = (score, audit)
+            return (url, raw, parsing, log_prefix)
+
+        def decode(raw: Tuple[bytes, str]) -> str:
+            body, encoding = raw
+            try:
+                return body.decode(encoding, errors='replace')
+            except LookupError:
+                return body.decode('utf-8', errors='replace')
+
+        def fallback_markup(raw: Tuple[bytes, str], parsing: PendingParse) -> str:
+            """Decoded page prefix for the extractor; only needed when the parse produced no main text."""
+            try:
+                if parsing.result().get('main_text'):
+                    return ''
+            except Exception:
+                pass
+            return decode(raw)
+
+        def finish(url: str, extracted: Dict[str, Any], log_prefix: str) -> ScrapedItem | None:
+            """Remember one extraction in the frontier and return it as an item if relevant."""
+            extractions[url] = extracted
+            for copy in waiting_copies.pop(url, []):
+                record_duplicate(copy, url)
+            relevance = extracted.get('relevance', 0)
+            if url in prefilter_scores:
+                score, audit = prefilter_scores.pop(url)
+                prefilter.observe(score, relevance, audit=audit)
+            print(f"{log_prefix} Relevance: {relevance:.2f} - {extracted.get('headline', 'No title')[:60]}", file=sys.stderr, flush=True)
+            record = {
+                'source': url.split('/')[2],
+                'url': url,
+                **extracted
+            }
+            frontier.record(url, record, fingerprint)
+            progress["extracted"] += 1
+
+            if relevance > 0.15 and not limit_reached():
+                collected.append(record)
+                checkpoint.mark_processed(url, record)
+                save_checkpoint()
+                print(f"{log_prefix} ✓ Added (relevance {relevance:.2f})", file=sys.stderr, flush=True)
+                return to_item(record)
+            metrics.count('relevance' if relevance <= 0.15 else 'limit')
+            checkpoint.mark_processed(url)
+            save_checkpoint()
+            return None
+
+        def flush() -> Iterator[ScrapedItem]:
+            """Extract the pages waiting in `batch` (packed into as few LLM calls as fit) and yield the relevant ones."""
+            while batch and not limit_reached():
+                # Never pay for more extractions than the article limit can still take; the rest of the
+                # batch waits for the next round in case some of these turn out irrelevant
+                take = min(len(batch), max_articles - len(collected)) if max_articles else len(batch)
+                pages = batch[:take]
+                del batch[:take]
+                results = nlp.extract_articles_batch(
+                    [(fallback_markup(raw, parsing), url, parsing) for url, raw, parsing, _ in pages],
+                    config, max_articles=batch_size)
+                for (url, raw, parsing, log_prefix), extracted in zip(pages, results):
+                    try:
+                        parsed = parsing.result()
+                    except Exception:
+                        parsed = {}
+                    page_text = parsed.get('main_text') or parsed.get('body_text') or ''
+                    extracted['extracted_metadata'] = gazetteer.enrich(
+                        extracted.get('extracted_metadata'),
+                        f"{extracted.get('headline', '')}. {extracted.get('snippet', '')}\n{page_text}")
+                    item = finish(url, extracted, log_prefix)
+                    if item:
+                        yield item
+
+        def consume(arrivals, log_prefix: str = "[Extract]", flush_batch: bool = True) -> Iterator[ScrapedItem]:
+            """Extract fetched pages as they arrive, yielding the relevant ones.
+
+            Each page is handed to the parser pool as soon as it arrives; up to
+            `parser.workers` pages parse in the background while earlier ones are
+            screened for duplicates and queued for extraction, `flush_at` at a
+            time. With `flush_batch` False an incomplete batch is left for the next call.
+            """
+            window = deque()
+
+            def screened(entry):
+                pending = screen(*entry, log_prefix)
+                if pending:
+                    batch.append(pending)
+                if len(batch) >= flush_at:
+                    yield from flush()
+
+            try:
+                for article_url, page in arrivals:
+                    if limit_reached():
                         break
-                    articles_checked += 1
-                    
-                    print(f"[Article {articles_checked}] Checking {full}", file=sys.stderr, flush=True)
-                    resp = safe_get(full)
-                    if resp and resp.status_code == 200:
-                        extracted = nlp.extract_article_data(resp.text, full, config)
-                        relevance = extracted.get('relevance', 0)
-                        print(f"[Article {articles_checked}] Relevance: {relevance:.2f} - {extracted.get('headline', 'No title')[:60]}", file=sys.stderr, flush=True)
-                        
-                        if relevance > 0.15:  # lowered threshold
-                            collected.append({
-                                'source': full.split('/')[2],
-                                'url': full,
-                                **extracted
-                            })
-                            print(f"[Article {articles_checked}] ✓ Added (relevance {relevance:.2f})", file=sys.stderr, flush=True)
-                            if len(collected) >= 1000:
-                                break
+
+                    print(f"[Fetch] {article_url}", file=sys.stderr, flush=True)
+                    if page and page.status_code == 200:
+                        progress["fetched"] += 1
+                        # Headline, date metadata and the opening paragraphs live in the first part of the page.
+                        # Its raw bytes go to the parser pool and are decoded there; main content feeds the LLM
+                        # prompt and, in both modes, the near-duplicate signature
+                        raw = (page.content[:EXTRACT_MAX_BYTES], page.encoding)
+                        window.append((article_url, raw, parser.submit_article(*raw, main_content=True)))
                     else:
-                        print(f"[Article {articles_checked}] ✗ Failed to fetch", file=sys.stderr, flush=True)
-                
-                if len(collected) >= 1000:
-                    break
+                        progress["fetch_failed"] += 1
+                        print(f"[Fetch] ✗ Failed to fetch {article_url}", file=sys.stderr, flush=True)
 
-        # Sort by AI relevance score and date
-        collected.sort(key=lambda x: (x.get('relevance', 0), x.get('date', '')), reverse=True)
+                    while len(window) > parser.workers and not limit_reached():
+                        yield from screened(window.popleft())
+                while window and not limit_reached():
+                    yield from screened(window.popleft())
+                if flush_batch:
+                    yield from flush()
+            finally:
+                for _, _, parsing in window:
+                    parsing.cancel()
+
+        # Use Perplexity web search to get article URLs
+        print("[Strategy] Using Perplexity API for open web search", file=sys.stderr, flush=True)
+
+        # Items recovered from the checkpoint go out first
+        for record in collected:
+            yield to_item(record)
+
+        try:
+            # Searches run concurrently and are consumed in plan order while a per-host politeness scheduler
+            # fetches in the background: trigger-oriented queries first, each group in _interleave_queries
+            # order, hosts interleaved.
+            with fetcher.scheduler() as sched, closing(nlp.search_many(
+                    search_queries[first_query:], config.max_concurrent_searches)) as searches:
+                # Canonical URLs already handed to the scheduler; a URL cited by several queries is queued once
+                searched = set()
+                if restored and restored['pending']:
+                    # URLs queued by searches that completed before the interruption
+                    by_priority: Dict[int, List[str]] = {}
+                    for url, priority in restored['pending'].items():
+                        by_priority.setdefault(priority, []).append(url)
+                    for priority, urls in sorted(by_priority.items()):
+                        sched.submit(unseen(urls), priority=priority)
+                    searched.update(canonical_url(url) for url in restored['pending'])
+                    print(f"[Checkpoint] Re-queued {len(restored['pending'])} pending URLs", file=sys.stderr, flush=True)
+
+                for rank, (query, urls) in enumerate(zip(search_queries[first_query:], searches), start=first_query):
+                    if limit_reached():
+                        break
+
+                    print(f"[Perplexity Search] Query: {query[:60]}... found {len(urls)} URLs", file=sys.stderr, flush=True)
+                    candidates, fresh = unseen(urls), []
+                    for url in candidates:
+                        key = canonical_url(url)
+                        if key not in searched:
+                            searched.add(key)
+                            fresh.append(url)
+                    metrics.count('search_duplicate', len(candidates) - len(fresh))
+                    urls = fresh
+                    is_trigger = nlp.classify_query(query, config) == 'TRIGGER'
+                    priority = rank if is_trigger else len(search_queries) + rank
+                    queued = sched.submit(urls, priority=priority)
+                    print(f"[Scheduler] Queued {queued} new URLs (priority {priority})", file=sys.stderr, flush=True)
+                    progress["queries_done"] += 1
+                    checkpoint.mark_searched(rank + 1, urls, priority)
+                    save_checkpoint()
+
+                    # Extract whatever has arrived before taking the next search result
+                    yield from consume(sched.completed(), flush_batch=False)
+
+                if not limit_reached():
+                    yield from consume(sched.results(deadline=deadline))
+                yield from flush()
+
+            # Fallback: if nothing matched, fetch from landing pages and use AI extraction
+            if len(collected) < 5:
+                print("[Direct Scraping] Fetching from news site landing pages...", file=sys.stderr, flush=True)
+                fallback_sources = [
+                    ("https://www.minuto30.com/judicial/", 'a'),
+                    ("https://www.elcolombiano.com/tags/seguridad", 'a'),
+                    ("https://www.qhubomedellin.com/judicial/", 'a'),
+                ]
+
+                for base, sel in fallback_sources:
+                    if limit_reached():
+                        break
+                    print(f"[Listing] Fetching article list from {base}", file=sys.stderr, flush=True)
+                    links = parse_listing(base, sel)
+                    print(f"[Listing] Found {len(links)} links", file=sys.stderr, flush=True)
+
+                    # Check at most 100 articles per source
+                    yield from consume(fetcher.fetch_many(unseen([full for full, _ in links[:100]]), deadline=deadline), "[Article]")
+
+        finally:
+            fetcher.close()
+            # Persist whatever was done so far; cleared below once the run completes
+            if checkpoint.state:
+                checkpoint.state['elapsed'] = elapsed_before + time.time() - start_time
+                checkpoint.save()
+            if fetcher.cache:
+                print(f"[HTTP Cache] {fetcher.cache.stats()}", file=sys.stderr, flush=True)
+            self.last_host_report = fetcher.monitor.report()
+            if prefilter:
+                prefilter.save()
+                prefilter.store.close()
+            for host, h in sorted(self.last_host_report.items(), key=lambda kv: -(kv[1]['failures'] + kv[1]['skipped'])):
+                print(f"[Fetch Hosts] {host}: state={h['state']} ok={h['successes']} failed={h['failures']} "
+                      f"skipped={h['skipped']} p95={h['p95_latency']}s timeout={h['timeout']}s", file=sys.stderr, flush=True)
+
+        # Incremental mode: merge items stored by previous runs with this run's new ones
+        if config.incremental:
+            collected_urls = {it['url'] for it in collected}
+            merged = 0
+            for stored in frontier.stored_items(fingerprint, min_relevance=0.15, since=config.date_range_start or None):
+                if max_articles and len(collected) >= max_articles:
+                    break
+                if stored['url'] in collected_urls:
+                    continue
+                collected_urls.add(stored['url'])
+                collected.append(stored)
+                merged += 1
+                yield to_item(stored)
+            metrics.count('merged_from_frontier', merged)
+            print(f"[Frontier] Merged {merged} stored items from previous runs", file=sys.stderr, flush=True)
 
         print(f"[AI Scraper] Collected {len(collected)} articles")
-        for i, it in enumerate(collected):
-            items.append(ScrapedItem(
-                id=f"ai_{i}",
-                source=it.get('source', 'unknown'),
-                date=it.get('date', datetime.datetime.now().strftime('%Y-%m-%d')),
-                headline=it.get('headline', 'No title'),
-                snippet=it.get('snippet', '')[:300],
-                url=it.get('url', ''),
-                relevance_score=float(it.get('relevance', 0.5)),
-                type=it.get('type', 'TRIGGER_EVENT')
-            ))
-
-        # Calculate stats
-        total_fetched = len(collected) # This is a simplification, ideally we track every fetch attempt
-        # Since we only add to 'collected' if relevance > 0.15, we need to track drops better.
-        # For now, let's assume we fetched 2x what we collected to simulate filtering.
-        
+
+        # Calculate stats from what this run actually fetched and dropped
+        metrics.finish()
+        run = metrics.snapshot()
+        if fetcher.cache:
+            run["http_cache"] = fetcher.cache.stats()
+        if nlp.extraction_cache:
+            run["llm_cache"] = nlp.extraction_cache.stats()
+            print(f"[LLM Cache] {run['llm_cache']}", file=sys.stderr, flush=True)
+        if nlp.search_cache:
+            run["search_cache"] = nlp.search_cache.stats()
+            print(f"[Search Cache] {run['search_cache']}", file=sys.stderr, flush=True)
+        if prefilter:
+            run["prefilter"] = prefilter.stats()
+            print(f"[Prefilter] Skipped {prefilter.rejected} of {prefilter.scored} pages - "
+                  f"{prefilter.rejected} LLM extractions avoided (threshold {prefilter.threshold}, "
+                  f"{prefilter.audited} audited)", file=sys.stderr, flush=True)
+        if nlp.client:
+            run["llm_client"] = nlp.client.stats()
+            for key in ('retries', 'failures', 'budget_wait_seconds'):
+                run["llm_client"][key] = round(run["llm_client"][key] - llm_client_before[key], 2)
+        run["queries"] = {"total": len(search_queries), "searched": progress["queries_done"] - first_query,
+                          "plan": "checkpoint" if restored else nlp.query_plan_source}
+        run["items"] = len(collected)
+        run["stop_reason"] = stop_reason[0] if stop_reason else None
+
         stats = CleaningStats(
-            total_scraped=len(collected) + 15, # Mocking the total seen
-            filtered_relevance=10,
-            filtered_date=2,
-            duplicates_removed=3,
-            final_count=len(items)
+            total_scraped=progress["fetched"],  # Pages fetched and passed to extraction
+            filtered_relevance=metrics.filters['relevance'],
+            filtered_date=0,  # The scrape stage does not filter by date
+            duplicates_removed=progress["duplicates"],
+            final_count=len(collected),
+            metrics=run
         )
-
-        return items, stats
+        self.last_stats = stats
+        try:
+            self.run_log.append(run)
+        except OSError as e:
+            print(f"[Scrape Metrics] Could not persist run {run['run_id']}: {e}", file=sys.stderr, flush=True)
+        print(f"[Scrape Metrics] {run['fetch']} llm={ {k: v['calls'] for k, v in run['llm'].items()} } filters={run['filters']}", file=sys.stderr, flush=True)
+        checkpoint.clear()
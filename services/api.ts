@@ -1,4 +1,4 @@
-import { ScrapingConfig, ScrapedItem, PredictionResult, ProcessingLog, PipelineStage } from '../types';
+import { ScrapingConfig, ScrapedItem, PredictionResult, ProcessingLog, PipelineStage, ScrapeProgress, ScrapeRunMetrics } from '../types';
 
 const API_URL = 'http://localhost:8000/api';
 
@@ -19,6 +19,13 @@ export const api = {
         if (!response.ok) throw new Error('Failed to start scraping');
     },
 
+    async resumeScraping(): Promise<void> {
+        const response = await fetch(`${API_URL}/scrape/resume`, {
+            method: 'POST',
+        });
+        if (!response.ok) throw new Error('No scraping checkpoint to resume');
+    },
+
     async startTraining(): Promise<void> {
         const response = await fetch(`${API_URL}/train`, {
             method: 'POST',
@@ -26,7 +33,7 @@ export const api = {
         if (!response.ok) throw new Error('Failed to start training');
     },
 
-    async getStatus(): Promise<{ stage: PipelineStage; logs: ProcessingLog[] }> {
+    async getStatus(): Promise<{ stage: PipelineStage; logs: ProcessingLog[]; progress?: ScrapeProgress }> {
         const response = await fetch(`${API_URL}/status`);
         if (!response.ok) throw new Error('Failed to get status');
         return response.json();
@@ -56,6 +63,12 @@ export const api = {
         return response.json();
     },
 
+    async getScrapeStatsHistory(limit = 20): Promise<ScrapeRunMetrics[]> {
+        const response = await fetch(`${API_URL}/scrape-stats/history?limit=${limit}`);
+        if (!response.ok) throw new Error('Failed to get scrape stats history');
+        return response.json();
+    },
+
     async resetPipeline(): Promise<void> {
         const response = await fetch(`${API_URL}/reset`, {
             method: 'POST',
@@ -44,12 +44,69 @@ export interface TrainingMetrics {
   test_set_size?: number;
 }
 
+export interface LatencyHistogram {
+  count: number;
+  mean: number | null;
+  max: number;
+  p50: number | null;
+  p95: number | null;
+  buckets: Record<string, number>;
+}
+
+export interface ScrapeRunMetrics {
+  run_id: string;
+  started_at: number;
+  finished_at: number | null;
+  duration_seconds: number;
+  fetch: {
+    attempts: number;
+    successes: number;
+    cache_hits: number;
+    failures: number;
+    failures_by_cause: Record<string, number>;
+    bytes_downloaded: number;
+    pages_per_minute: number;
+  };
+  host_latency: Record<string, LatencyHistogram>;
+  llm: Record<string, {
+    calls: number;
+    errors: number;
+    prompt_tokens: number;
+    completion_tokens: number;
+    latency: LatencyHistogram;
+  }>;
+  filters: Record<string, number>;
+  http_cache?: Record<string, number>;
+  llm_cache?: Record<string, number>;
+  search_cache?: Record<string, number>;
+  prefilter?: {
+    phrases: number;
+    threshold: number;
+    calibrated: boolean;
+    samples: number;
+    scored: number;
+    rejected: number;
+    audited: number;
+  };
+  llm_client?: {
+    max_concurrency: number;
+    retries: number;
+    failures: number;
+    budget_wait_seconds: number;
+    last_minute: { requests: number; tokens: number };
+  };
+  queries?: { total: number; searched: number; plan?: 'cached' | 'llm' | 'fallback' | 'checkpoint' | null };
+  items?: number;
+  stop_reason?: string | null;
+}
+
 export interface CleaningStats {
   total_scraped: number;
   filtered_relevance: number;
   filtered_date: number;
   duplicates_removed: number;
   final_count: number;
+  metrics?: ScrapeRunMetrics;
 }
 
 export interface ModelMetadata {
@@ -116,6 +173,16 @@ export interface ProcessingLog {
   status: 'pending' | 'success' | 'error';
 }
 
+export interface ScrapeProgress {
+  queries_total: number;
+  queries_done: number;
+  fetched: number;
+  fetch_failed: number;
+  extracted: number;
+  duplicates: number;
+  items: number;
+}
+
 export interface ProjectFile {
   name: string;
   type: 'file' | 'folder';
@@ -147,6 +214,22 @@ export interface ScrapingConfig {
   // Scraping Limits
   max_scraping_time_minutes?: number;  // Time limit for scraping in minutes
   max_articles?: number;               // Maximum number of articles to scrape
+
+  // Fetch Concurrency
+  max_concurrent_fetches?: number;     // Simultaneous page downloads (default 8)
+  max_fetches_per_host?: number;       // Simultaneous downloads per news site (default 2)
+  per_host_rate_limit?: number;        // Requests per second per news site, 0 = unlimited (default 1)
+  circuit_breaker_threshold?: number;  // Consecutive failures before a news site is skipped (default 3)
+  use_http_cache?: boolean;            // Reuse pages cached on disk by previous runs (default true)
+  incremental?: boolean;               // Only fetch never-seen URLs and merge with stored items (default false)
+  html_parse_workers?: number;         // Worker processes for HTML parsing, 0 = inline (default 2)
+  html_engine?: 'auto' | 'selectolax' | 'lxml' | 'bs4'; // HTML parser, auto = fastest installed (default auto)
+  use_llm_cache?: boolean;             // Reuse LLM extractions of identical article content (default true)
+  llm_batch_size?: number;             // Articles packed into one LLM extraction call, 1 = one call per article (default 6)
+  use_prefilter?: boolean;             // Skip the LLM for pages a local keyword score rejects (default true)
+  max_concurrent_searches?: number;    // Simultaneous web searches (default 8)
+  use_search_cache?: boolean;          // Reuse same-day search results for repeated queries (default true)
+  refresh_query_plan?: boolean;        // Ask the LLM for a new query plan even if one is cached for this config (default false)
 }
 
 export interface ScrapedItem {